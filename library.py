@@ -1,12 +1,57 @@
 # === IMPORT SECTION === 
+import time
+# when the program started (before the other imports), for measuring how long startup takes (see --profile-startup).
+# For a module-by-module breakdown of the imports, run Python with -X importtime.
+programStartTime = time.perf_counter()
 import tkinter as tk
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from hashlib import sha256
 from tkinter import scrolledtext
 import tkinter.filedialog as filedialog
 import os
+import sys
 import pathlib
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import csv
+import shutil
+import tempfile
+import re
+import json
+import base64
+import gzip
+import lzma
+import tarfile
+import threading
+import io
+import mmap
+import logging
+import logging.handlers
+import socket
+from collections import deque, OrderedDict
+from array import array
+import math
+import sqlite3
+import queue
+import uuid
+import random
+import urllib.request
+import urllib.parse
+import asyncio
+from http import HTTPStatus
+import subprocess
+import gc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+# file locking for the shared log works differently on Windows
+if(os.name == "nt"):
+    import msvcrt
+else:
+    import fcntl
+    import resource
+from concurrent.futures import ProcessPoolExecutor
 """
 PROGRAM SYNOPSIS: 
 This program reads from a CSV file that acts as a database for students at a school. 
@@ -32,21 +77,483 @@ When the sign-in log is exported, it will be saved to a .txt file and record the
 # This section contains chunks of code that can be reused multiple times. 
 # Reused code is called a "Function" or "Definition."
 
+# messages about what the program is doing go through this logger (see setupLogging)
+logger = logging.getLogger("library")
+
+# one line of the shared log: "#<number in the whole log> [<kiosk> #<number for that kiosk>] <sign-in text>"
+sharedLogLinePattern = re.compile(r"#(\d+) \[([^\]]*) #(\d+)\] ")
+
 def openDatabase(filename, headerLine, sortBy):
-    # Open the input CSV file
-    database = pd.read_csv(filename, header=headerLine)
+    # big roster files (or if chunked ingest is turned on) are streamed in blocks instead of being read all at once
+    if(useChunkedIngest(filename)):
+        return openDatabaseChunked(filename, headerLine, sortBy)
+    (fileColumns, wantedColumns, textColumns) = getDatabaseColumns(filename, headerLine)
+    # Open the input CSV file, but only load the columns this program uses (not addresses, guardians, etc.).
+    database = renameDatabaseColumns(pd.read_csv(filename, header=headerLine, usecols=wantedColumns, dtype={column: object for column in textColumns}))
     databaseFrame = pd.DataFrame(database)
  
-    # Sort CSV data by desired variable
-    sortedDatabase = databaseFrame.sort_values(sortBy)
+    # Sort CSV data by desired variable.
+    # Anything in that column that isn't a number is sorted to the end, so a typo in one ID can't stop the sort.
+    sortNumbers = pd.to_numeric(databaseFrame[sortBy], errors="coerce")
+    sortedDatabase = databaseFrame.loc[sortNumbers.sort_values(kind="stable", na_position="last").index]
  
     # check if the sorted version of the CSV is different from the original CSV
     if(not database.equals(sortedDatabase)):
-        # if the CSV file is not sorted, return the sorted version if it for use in this program.
-        sortedDatabase.to_csv(filename, index=False, header=True)
-        return sortedDatabase
-    # return original database frame if it's already sorted
-    return databaseFrame
+        # if the CSV file is not sorted, save the sorted version of it (rejected rows included) for use in this program.
+        # This is only done if every column in the file was loaded, since saving would otherwise erase the other columns.
+        if(len(wantedColumns) == len(fileColumns)):
+            sortedDatabase.rename(columns={column: fileColumn for (column, fileColumn) in databaseColumns.items()}).to_csv(filename, index=False, header=True)
+        databaseFrame = sortedDatabase
+    # check the rows and return only the good ones, along with a summary of the rows that were taken out
+    return validateDatabase(databaseFrame, filename, sortBy)
+
+def getDatabaseColumns(filename, headerLine):
+    global databaseColumns, databaseExtraColumns
+    # Read just the header of the CSV file first to check that every column this program needs is in it.
+    # Returns every column in the file, the columns to load, and the columns to load as plain text.
+    fileColumns = pd.read_csv(filename, header=headerLine, nrows=0).columns.tolist()
+    wantedColumns = list(databaseColumns.values()) + databaseExtraColumns
+    missingColumns = [column for column in wantedColumns if column not in fileColumns]
+    if(len(missingColumns) > 0):
+        raise ValueError(f"{getDatabaseNames([filename])} is missing the column(s): {', '.join(missingColumns)}")
+    # The names and extra columns are read as plain text, so the names can be shared between students
+    # with the same name later and an extra column like a homeroom number shows exactly as it is in the file.
+    textColumns = [databaseColumns["Last Name"], databaseColumns["First Name"]] + databaseExtraColumns
+    return (fileColumns, wantedColumns, textColumns)
+
+def renameDatabaseColumns(database):
+    global databaseColumns, databaseExtraColumns
+    # rename the file's columns to the names used everywhere in this program, in the same order every time
+    database = database.rename(columns={fileColumn: column for (column, fileColumn) in databaseColumns.items()})
+    return database[list(databaseColumns) + databaseExtraColumns]
+
+def getRejectsFileName(filename):
+    # the rejects file goes next to the roster, e.g. "Grade 9.csv" (or "Grade 9.csv.gz") -> "Grade 9 REJECTED ROWS.csv"
+    global rejectsFileEnding
+    if(filename.endswith(".gz")):
+        filename = filename[:-3]
+    return f"{os.path.splitext(filename)[0]}{rejectsFileEnding}"
+
+def findBadRows(database, sortBy):
+    # This method checks every row of the roster at once (instead of one row at a time) for data that would
+    # cause problems at sign-in: IDs that aren't whole numbers or have the wrong number of digits, IDs that are
+    # in the roster more than once, blank names, and grades that aren't numbers or are out of range.
+    # It returns a True/False column of the rows to reject and a List of (problem text, True/False column) for each check.
+    global minDigits, maxDigits, minGrade, maxGrade, duplicateIDProblemText
+    ids = pd.to_numeric(database[sortBy], errors="coerce")
+    grades = pd.to_numeric(database["Grade"], errors="coerce")
+    # each check is a True/False column with one value per row
+    badID = ids.isna() | (ids != ids.round())
+    badDigits = ~badID & ((ids < 10 ** (minDigits - 1)) | (ids >= 10 ** maxDigits))
+    missingName = (database["Last Name"].isna() | database["First Name"].isna()
+        | (database["Last Name"].astype(str).str.strip() == "") | (database["First Name"].astype(str).str.strip() == ""))
+    badGrade = grades.isna() | (grades < minGrade) | (grades > maxGrade) | (grades != grades.round())
+    # an ID only counts as repeated if an earlier row with that ID passed every other check
+    otherwiseGood = ~(badID | badDigits | missingName | badGrade)
+    duplicateID = otherwiseGood & ids.where(otherwiseGood).duplicated(keep="first")
+    rejected = badID | badDigits | duplicateID | missingName | badGrade
+    problems = [("ID is not a whole number", badID), (f"ID is not {minDigits}-{maxDigits} digits", badDigits),
+        (duplicateIDProblemText, duplicateID), ("Name is blank", missingName),
+        (f"Grade is not a number from {minGrade} to {maxGrade}", badGrade)]
+    return (rejected, problems)
+
+def saveRejectedRows(rejectsFileName, database, rejected, problems, problemCounts):
+    # This method adds the rejected rows to the rejects file (creating it if needed) with the reasons each one
+    # was rejected, and adds to the running count of each problem in the problemCounts dictionary.
+    rejects = database[rejected].copy()
+    rejects["Problem"] = ""
+    for (problemText, problemRows) in problems:
+        rejects.loc[problemRows[rejected], "Problem"] += f"{problemText}; "
+        problemCounts[problemText] = problemCounts.get(problemText, 0) + int(problemRows.sum())
+    rejects["Problem"] = rejects["Problem"].str.rstrip("; ")
+    fileExists = os.path.isfile(rejectsFileName)
+    rejects.to_csv(rejectsFileName, index=False, header=not fileExists, mode="a" if fileExists else "w")
+
+def summarizeRejectedRows(filename, problemCounts):
+    # write up how many rows were left out of the roster file and why (None if nothing was left out)
+    global reportRejectedRowsText
+    totalRejected = sum(problemCounts.values())
+    if(totalRejected == 0):
+        return None
+    counts = ", ".join([f"{problemText}: {count}" for (problemText, count) in problemCounts.items() if count > 0])
+    return f"{reportRejectedRowsText}rows left out of {getDatabaseNames([filename])} ({counts}). See {getDatabaseNames([getRejectsFileName(filename)])}"
+
+def validateDatabase(database, filename, sortBy):
+    # This method checks the whole roster for bad rows (see findBadRows).
+    # Bad rows are saved to a "rejects" CSV next to the roster and left out of the returned roster.
+    # It returns the good rows and a summary of what was rejected (None if nothing was).
+    (rejected, problems) = findBadRows(database, sortBy)
+    rejectsFileName = getRejectsFileName(filename)
+    # remove an old rejects file so it doesn't look like there are still problems
+    if(os.path.isfile(rejectsFileName)):
+        os.remove(rejectsFileName)
+    problemCounts = {}
+    if(rejected.any()):
+        saveRejectedRows(rejectsFileName, database, rejected, problems, problemCounts)
+    return (compactDatabase(database[~rejected], sortBy), summarizeRejectedRows(filename, problemCounts))
+
+def useChunkedIngest(filename):
+    # decide whether to stream the roster file in blocks.
+    # "auto" streams the file if loading it all at once would likely take more than the memory budget
+    # (pandas needs a few times the file's size while reading and sorting, and a .gz file is about 5 times smaller).
+    global databaseChunkedIngest, databaseMemoryBudgetMB
+    if(databaseChunkedIngest != "auto"):
+        return databaseChunkedIngest
+    estimatedSize = os.path.getsize(filename) * (5 if filename.endswith(".gz") else 1)
+    return estimatedSize * 3 > databaseMemoryBudgetMB * 1048576
+
+def openDatabaseChunked(filename, headerLine, sortBy):
+    # This method reads the roster file (plain or .gz) in blocks of rows instead of all at once,
+    # so only one block of the full file is in memory at a time. Each block is checked and shrunk
+    # (see findBadRows and compactDatabase) and added to the roster as it's read.
+    # If the file isn't sorted by ID, each block is sorted and saved to a temporary "run" file instead,
+    # and the runs are merged back together in ID order at the end (an external merge sort).
+    # The file itself is never re-saved in this mode.
+    # It returns the good rows and a summary of what was rejected (None if nothing was).
+    (fileColumns, wantedColumns, textColumns) = getDatabaseColumns(filename, headerLine)
+    textTypes = {column: object for column in textColumns}
+    chunkRows = getChunkRows(filename, headerLine, wantedColumns, textTypes)
+    rejectsFileName = getRejectsFileName(filename)
+    if(os.path.isfile(rejectsFileName)):
+        os.remove(rejectsFileName)
+    problemCounts = {}
+    # the roster is built up as a List of checked, sorted blocks that are joined together at the end
+    roster = []
+    runFolder = None
+    runs = []
+    for chunk in pd.read_csv(filename, header=headerLine, usecols=wantedColumns, dtype=textTypes, chunksize=chunkRows):
+        chunk = renameDatabaseColumns(chunk)
+        (rejected, problems) = findBadRows(chunk, sortBy)
+        if(rejected.any()):
+            saveRejectedRows(rejectsFileName, chunk, rejected, problems, problemCounts)
+        chunk = compactDatabase(chunk[~rejected], sortBy)
+        lastID = roster[-1][sortBy].iloc[-1] if len(roster) > 0 else None
+        if(len(runs) == 0 and chunk[sortBy].is_monotonic_increasing and (lastID is None or len(chunk) == 0 or chunk[sortBy].iloc[0] >= lastID)):
+            # still in ID order, so this block can go straight into the roster
+            addChunkToRoster(roster, chunk, sortBy, rejectsFileName, problemCounts)
+            continue
+        # the file isn't sorted, so switch to saving sorted runs (starting with what was read so far)
+        if(runFolder is None):
+            runFolder = tempfile.mkdtemp(prefix="roster runs ")
+            if(len(roster) > 0):
+                runs.append(saveRun(runFolder, pd.concat(roster)))
+                roster = []
+        runs.append(saveRun(runFolder, chunk.sort_values(sortBy, kind="stable")))
+    if(runFolder is not None):
+        # merge the runs by always taking the next smallest ID out of all of them, a block of rows at a time
+        columns = list(databaseColumns) + databaseExtraColumns
+        merged = []
+        for row in heapq.merge(*[readRun(run) for run in runs], key=lambda row: row[0]):
+            merged.append(row)
+            if(len(merged) >= chunkRows):
+                addChunkToRoster(roster, compactDatabase(pd.DataFrame(merged, columns=columns), sortBy), sortBy, rejectsFileName, problemCounts)
+                merged = []
+        if(len(merged) > 0):
+            addChunkToRoster(roster, compactDatabase(pd.DataFrame(merged, columns=columns), sortBy), sortBy, rejectsFileName, problemCounts)
+        shutil.rmtree(runFolder, ignore_errors=True)
+    if(len(roster) == 0):
+        roster = [compactDatabase(pd.DataFrame(columns=list(databaseColumns) + databaseExtraColumns), sortBy)]
+    return (pd.concat(roster, ignore_index=True), summarizeRejectedRows(filename, problemCounts))
+
+def getChunkRows(filename, headerLine, wantedColumns, textTypes):
+    # work out how many rows to read per block so a block (and the few copies made while checking
+    # and sorting it) fits in the memory budget, by measuring the size of the first thousand rows
+    global databaseMemoryBudgetMB
+    sample = pd.read_csv(filename, header=headerLine, usecols=wantedColumns, dtype=textTypes, nrows=1000)
+    bytesPerRow = max(1, sample.memory_usage(deep=True).sum() / max(1, len(sample)))
+    return max(1000, int(databaseMemoryBudgetMB * 1048576 / (bytesPerRow * 4)))
+
+def addChunkToRoster(roster, chunk, sortBy, rejectsFileName, problemCounts):
+    # add a sorted block to the end of the roster, rejecting any ID that's repeated in the block
+    # or that's the same as the last ID already in the roster
+    global duplicateIDProblemText
+    repeated = chunk[sortBy].duplicated()
+    if(len(roster) > 0):
+        repeated = repeated | (chunk[sortBy] == roster[-1][sortBy].iloc[-1])
+    if(repeated.any()):
+        saveRejectedRows(rejectsFileName, chunk, repeated, [(duplicateIDProblemText, repeated)], problemCounts)
+        chunk = chunk[~repeated]
+    if(len(chunk) > 0):
+        roster.append(chunk)
+
+def saveRun(runFolder, chunk):
+    # save a sorted block to a temporary CSV file and return its file name
+    runName = os.path.join(runFolder, f"run {len(os.listdir(runFolder))}.csv")
+    chunk.to_csv(runName, index=False, header=False)
+    return runName
+
+def readRun(runName):
+    # read a run file back one row at a time as (ID, last name, first name, grade, extra columns...),
+    # so merging the runs only keeps one row from each run in memory
+    with open(runName, newline="") as file:
+        for row in csv.reader(file):
+            yield tuple([int(row[0]), row[1], row[2], int(row[3])] + [value if value != "" else None for value in row[4:]])
+
+def compactDatabase(database, sortBy):
+    # This method shrinks the checked roster in memory:
+    # the IDs are stored as the smallest whole number type that fits maxDigits digits,
+    # the grades as a category (one small number per student pointing at a short list of grades),
+    # and every repeated first or last name is stored once and shared by all the students with that name.
+    global maxDigits, minGrade, maxGrade, databaseExtraColumns
+    database = database.copy()
+    if(10 ** maxDigits <= 2 ** 31):
+        database[sortBy] = database[sortBy].astype("int32")
+    else:
+        database[sortBy] = database[sortBy].astype("int64")
+    gradeType = pd.CategoricalDtype(categories=list(range(minGrade, maxGrade + 1)))
+    database["Grade"] = pd.to_numeric(database["Grade"]).astype("int64").astype(gradeType)
+    for column in ["Last Name", "First Name"]:
+        database[column] = pd.Series([sys.intern(str(name).strip()) for name in database[column]], index=database.index, dtype=object)
+    for column in databaseExtraColumns:
+        database[column] = database[column].astype(object)
+    return database
+
+def reportDatabaseMemory(filenames, headerLine, sortBy):
+    # This method prints how much memory each roster file takes when every column is loaded
+    # compared to only loading the mapped columns in their compact form (what this program does).
+    for filename in filenames:
+        fullLoad = pd.read_csv(filename, header=headerLine).memory_usage(deep=True).sum()
+        (roster, summary) = openDatabase(filename, headerLine, sortBy)
+        compactLoad = roster.memory_usage(deep=True).sum()
+        print(f"{getDatabaseNames([filename])}: full load {fullLoad / 1048576:.1f} MB, "
+            f"compact load {compactLoad / 1048576:.1f} MB, saved {(fullLoad - compactLoad) / 1048576:.1f} MB "
+            f"({100 * (fullLoad - compactLoad) / max(fullLoad, 1):.0f}%)")
+
+def openRosterFile(filename, headerLine, sortBy):
+    # This method opens one roster file, but reuses the copy opened last time if the file hasn't changed since.
+    # That way, when only one of several roster files is updated, only that one is read again.
+    # It returns the roster and the summary of any rows that were rejected.
+    global rosterCache
+    fileInfo = os.stat(filename)
+    fileVersion = (fileInfo.st_mtime, fileInfo.st_size)
+    if(filename in rosterCache and rosterCache[filename][0] == fileVersion):
+        return rosterCache[filename][1]
+    result = openDatabase(filename, headerLine, sortBy)
+    # openDatabase may have re-saved the file in sorted order, so get its new version afterwards
+    fileInfo = os.stat(filename)
+    rosterCache[filename] = ((fileInfo.st_mtime, fileInfo.st_size), result)
+    return result
+
+def openDatabases(filenames, headerLine, sortBy):
+    # This method opens every roster file at the same time and combines them into one roster sorted by ID.
+    # Each file is already sorted by ID once it is opened, so they are combined with a k-way merge
+    # (always taking the smallest next ID out of all the files) instead of sorting everything again.
+    # If the same ID is in more than one file, the student from the first file in the list is kept.
+    # It returns the combined roster, a List of (ID, [file names]) for every duplicated ID,
+    # and a List of the summaries of rows rejected from each file.
+    global rosterCache
+    # forget any cached file that is no longer one of the roster files
+    for cachedName in list(rosterCache):
+        if(cachedName not in filenames):
+            del rosterCache[cachedName]
+    with ThreadPoolExecutor(max_workers=max(1, len(filenames))) as pool:
+        results = list(pool.map(lambda filename: openRosterFile(filename, headerLine, sortBy), filenames))
+    rosters = [roster for (roster, summary) in results]
+    summaries = [summary for (roster, summary) in results if summary is not None]
+    if(len(rosters) == 1):
+        return (rosters[0], [], summaries)
+    # label every ID with the file it came from and its row in that file, then merge the sorted files together
+    sortedFiles = []
+    for fileNumber in range(len(rosters)):
+        ids = rosters[fileNumber][sortBy].tolist()
+        sortedFiles.append(zip(ids, [fileNumber] * len(ids), range(len(ids))))
+    # the combined roster is every file stacked on top of each other, so each file's rows start at an offset
+    offsets = [0]
+    for roster in rosters:
+        offsets.append(offsets[-1] + len(roster))
+    order = []
+    duplicates = []
+    previousID = None
+    previousFile = None
+    for (studentID, fileNumber, row) in heapq.merge(*sortedFiles):
+        if(studentID == previousID):
+            # this ID was already taken from an earlier file, so record which files it was repeated in
+            if(len(duplicates) == 0 or duplicates[-1][0] != studentID):
+                duplicates.append((studentID, [filenames[previousFile]]))
+            duplicates[-1][1].append(filenames[fileNumber])
+            continue
+        previousID = studentID
+        previousFile = fileNumber
+        order.append(offsets[fileNumber] + row)
+    combined = pd.concat(rosters, ignore_index=True).take(order).reset_index(drop=True)
+    return (combined, duplicates, summaries)
+
+def findMappedRowEnd(mapped, start):
+    # return where the CSV row starting at start ends (its newline, or the end of the file).
+    # A name in quotes can have a newline in it, so the row keeps going until its quotes are balanced.
+    end = mapped.find(b"\n", start)
+    while(end != -1 and mapped[start:end].count(b'"') % 2 == 1):
+        end = mapped.find(b"\n", end + 1)
+    return len(mapped) if end == -1 else end
+
+def splitMappedRow(line):
+    # split one CSV row from a memory-mapped roster into its text values
+    return next(csv.reader([line.decode("utf-8", errors="replace").rstrip("\r")]))
+
+def scanMappedRoster(filename, mapped, headerLine, idColumn):
+    global minDigits, maxDigits, duplicateIDProblemText
+    # This method reads through a memory-mapped roster file once, looking only at the ID of each row.
+    # It returns the IDs and where each row starts in the file (both sorted by ID, keeping the first row of a repeated ID),
+    # and how many rows were left out for each problem, as (ID is not a whole number, wrong number of digits, repeated ID).
+    if(mapped.find(b'"') == -1):
+        (ids, offsets, badIDs, badDigits) = scanUnquotedRoster(filename, mapped, headerLine, idColumn)
+    else:
+        (ids, offsets, badIDs, badDigits) = scanQuotedRoster(mapped, headerLine, idColumn)
+    # sort by ID, keeping rows with the same ID in file order so the first one is kept
+    order = np.argsort(ids, kind="stable")
+    (ids, offsets) = (ids[order], offsets[order])
+    firsts = np.ones(len(ids), dtype=bool)
+    firsts[1:] = ids[1:] != ids[:-1]
+    return (ids[firsts], offsets[firsts], np.array([badIDs, badDigits, len(ids) - int(firsts.sum())], dtype="int64"))
+
+def scanUnquotedRoster(filename, mapped, headerLine, idColumn):
+    global minDigits, maxDigits
+    # When there are no quotes in the file, every newline ends a row, so all the row starts are found at once
+    # and only the ID column is read with pandas. Returns the IDs and row starts in file order, and the problem counts.
+    newlines = np.flatnonzero(np.frombuffer(mapped, dtype="uint8") == ord("\n"))
+    starts = np.concatenate([[0], newlines + 1])
+    ends = np.concatenate([newlines, [len(mapped)]])
+    (starts, ends) = (starts[headerLine + 1:], ends[headerLine + 1:])
+    # blank lines (and the end of the file after its last newline) aren't rows, just like pandas skips them
+    lengths = ends - starts
+    carriageReturns = np.frombuffer(mapped, dtype="uint8")[np.maximum(ends - 1, 0)] == ord("\r")
+    rows = (lengths > 1) | ((lengths == 1) & ~carriageReturns)
+    values = pd.read_csv(filename, header=None, skiprows=headerLine + 1, usecols=[idColumn], dtype=str, skip_blank_lines=True)[idColumn].str.strip()
+    if(len(values) != rows.sum()):
+        # the rows didn't line up with the newlines, so go through it one row at a time instead
+        return scanQuotedRoster(mapped, headerLine, idColumn)
+    starts = starts[rows]
+    wholeNumbers = values.str.fullmatch(r"\d+").fillna(False).to_numpy(dtype=bool)
+    numbers = pd.to_numeric(values.where(wholeNumbers, "0")).to_numpy(dtype="int64")
+    rightDigits = wholeNumbers & (numbers >= 10 ** (minDigits - 1)) & (numbers < 10 ** maxDigits)
+    return (numbers[rightDigits], starts[rightDigits], int((~wholeNumbers).sum()), int((wholeNumbers & ~rightDigits).sum()))
+
+def scanQuotedRoster(mapped, headerLine, idColumn):
+    global minDigits, maxDigits
+    # This method goes through the file one row at a time, for files with quotes (a quoted name can have a newline in it).
+    # Returns the IDs and row starts in file order, and the problem counts.
+    position = 0
+    for line in range(headerLine + 1):
+        position = findMappedRowEnd(mapped, position) + 1
+    ids = []
+    offsets = []
+    badIDs = 0
+    badDigits = 0
+    while(position < len(mapped)):
+        end = findMappedRowEnd(mapped, position)
+        line = mapped[position:end]
+        # most rows have no quotes, so the ID can be cut out without the csv module
+        fields = splitMappedRow(line) if b'"' in line else line.split(b",", idColumn + 1)
+        value = fields[idColumn].strip() if len(fields) > idColumn else ""
+        if(len(line.strip()) == 0):
+            pass
+        elif(not value.isdigit()):
+            badIDs += 1
+        elif(not 10 ** (minDigits - 1) <= int(value) < 10 ** maxDigits):
+            badDigits += 1
+        else:
+            ids.append(int(value))
+            offsets.append(position)
+        position = end + 1
+    return (np.array(ids, dtype="int64"), np.array(offsets, dtype="int64"), badIDs, badDigits)
+
+def openMappedRosterFile(filename, headerLine, sortBy):
+    global databaseColumns, databaseExtraColumns, rosterIndexCacheDirectory, minDigits, maxDigits
+    # This method memory-maps one roster file and returns (the map, {column name: position in a row}, IDs, row starts,
+    # problem counts) (see scanMappedRoster). The IDs and row starts are saved in rosterIndexCacheDirectory,
+    # named after the file's size and when it was last changed, so they're only worked out again when the file changes.
+    # an empty file can't be memory-mapped, so it gets the same error as any other roster file without the columns needed
+    fileInfo = os.stat(filename)
+    if(fileInfo.st_size == 0):
+        raise ValueError(f"{getDatabaseNames([filename])} is empty")
+    (fileColumns, wantedColumns, textColumns) = getDatabaseColumns(filename, headerLine)
+    columns = {column: fileColumns.index(databaseColumns.get(column, column)) for column in list(databaseColumns) + databaseExtraColumns}
+    with open(filename, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    cacheName = sha256(f"{os.path.abspath(filename)}|{headerLine}|{databaseColumns[sortBy]}|{minDigits}|{maxDigits}".encode("utf-8")).hexdigest()[:16]
+    cacheFile = os.path.join(rosterIndexCacheDirectory, f"{cacheName} {fileInfo.st_size} {fileInfo.st_mtime_ns}.npz")
+    if(os.path.isfile(cacheFile)):
+        with np.load(cacheFile) as cached:
+            return (mapped, columns, cached["ids"], cached["offsets"], cached["problems"])
+    (ids, offsets, problems) = scanMappedRoster(filename, mapped, headerLine, columns[sortBy])
+    try:
+        os.makedirs(rosterIndexCacheDirectory, exist_ok=True)
+        # remove the saved index from before the file changed
+        for oldFile in os.listdir(rosterIndexCacheDirectory):
+            if(oldFile.startswith(f"{cacheName} ")):
+                os.remove(os.path.join(rosterIndexCacheDirectory, oldFile))
+        with open(f"{cacheFile}.part", "wb") as file:
+            np.savez(file, ids=ids, offsets=offsets, problems=problems)
+        os.replace(f"{cacheFile}.part", cacheFile)
+    except OSError as error:
+        logger.warning("Couldn't save the roster index for %s: %s", filename, error)
+    return (mapped, columns, ids, offsets, problems)
+
+def openMappedRosters(filenames, headerLine, sortBy):
+    global minDigits, maxDigits, duplicateIDProblemText, reportRejectedRowsText
+    # This method opens every roster file memory-mapped (see openMappedRosterFile) and combines their indexes into one
+    # memory-mapped roster, a dictionary with the sorted "ID" array, and for each ID, which file ("fileNumbers")
+    # and where in it ("offsets") the student's row is. Rows are only read when they're looked up (see readMappedRow).
+    # Like openDatabases, it returns the roster, a List of (ID, [file names]) for every ID in more than one file
+    # (the first file's row is kept), and a List of the summaries of rows left out of each file.
+    with ThreadPoolExecutor(max_workers=max(1, len(filenames))) as pool:
+        results = list(pool.map(lambda filename: openMappedRosterFile(filename, headerLine, sortBy), filenames))
+    summaries = []
+    problemTexts = ["ID is not a whole number", f"ID is not {minDigits}-{maxDigits} digits", duplicateIDProblemText]
+    for (filename, (mapped, columns, ids, offsets, problems)) in zip(filenames, results):
+        if(problems.sum() > 0):
+            counts = ", ".join([f"{problemText}: {count}" for (problemText, count) in zip(problemTexts, problems.tolist()) if count > 0])
+            summaries.append(f"{reportRejectedRowsText}rows left out of {getDatabaseNames([filename])} ({counts})")
+    ids = np.concatenate([result[2] for result in results])
+    offsets = np.concatenate([result[3] for result in results])
+    fileNumbers = np.concatenate([np.full(len(result[2]), fileNumber, dtype="int16") for (fileNumber, result) in enumerate(results)])
+    # the files are stacked in order, so a stable sort keeps the first file's row first for a repeated ID
+    order = np.argsort(ids, kind="stable")
+    (ids, offsets, fileNumbers) = (ids[order], offsets[order], fileNumbers[order])
+    firsts = np.ones(len(ids), dtype=bool)
+    firsts[1:] = ids[1:] != ids[:-1]
+    duplicates = []
+    for position in np.flatnonzero(~firsts).tolist():
+        if(len(duplicates) == 0 or duplicates[-1][0] != int(ids[position])):
+            duplicates.append((int(ids[position]), [filenames[fileNumbers[position - 1]]]))
+        duplicates[-1][1].append(filenames[fileNumbers[position]])
+    roster = {"ID": ids[firsts], "offsets": offsets[firsts], "fileNumbers": fileNumbers[firsts],
+        "maps": [result[0] for result in results], "columns": [result[1] for result in results], "filenames": list(filenames)}
+    return (roster, duplicates, summaries)
+
+def isMappedRoster(roster):
+    # whether the roster is memory-mapped (see openMappedRosters)
+    return isinstance(roster, dict) and "offsets" in roster
+
+def readMappedRow(roster, position):
+    global minGrade, maxGrade, databaseExtraColumns
+    # This method reads the student at a row position of a memory-mapped roster straight out of the file,
+    # as {column name: value}. The rest of a row is only checked now, so a row with a blank name or a bad grade
+    # returns None (and is logged) as if the student wasn't in the roster.
+    fileNumber = int(roster["fileNumbers"][position])
+    mapped = roster["maps"][fileNumber]
+    start = int(roster["offsets"][position])
+    row = splitMappedRow(mapped[start:findMappedRowEnd(mapped, start)])
+    values = {column: (row[index].strip() if index < len(row) else "") for (column, index) in roster["columns"][fileNumber].items()}
+    # if the file was changed after it was opened, the row may not be where it was anymore
+    if(not values["ID"].isdigit() or int(values["ID"]) != int(roster["ID"][position])):
+        logger.warning("%s changed since it was opened, so ID #%d can't be read. Reload the roster files", roster["filenames"][fileNumber], int(roster["ID"][position]))
+        return None
+    try:
+        grade = float(values["Grade"])
+    except ValueError:
+        grade = None
+    if(values["Last Name"] == "" or values["First Name"] == "" or grade is None or grade != int(grade) or not minGrade <= grade <= maxGrade):
+        logger.warning("The row for ID #%d in %s has a blank name or a bad grade, so it was left out", int(roster["ID"][position]), roster["filenames"][fileNumber])
+        return None
+    student = {"ID": int(roster["ID"][position]), "Last Name": sys.intern(values["Last Name"]), "First Name": sys.intern(values["First Name"]), "Grade": int(grade)}
+    for column in databaseExtraColumns:
+        student[column] = values[column] if values[column] != "" else None
+    return student
+
+def getDatabaseNames(filenames):
+    # turn the List of roster file paths into a short list of just the file names for the labels
+    return ", ".join([filename[ filename.rfind("/")+1 :] for filename in filenames])
  
 def openPreferences(filename):
     # Use Open in append+ mode to create the preferences file just in case it doesn't exist.
@@ -58,7 +565,7 @@ def openPreferences(filename):
     # set these values to defaults
     encPass = ""
     prevDir = ""
-    database = ""
+    database = []
     # print(len(prefFile))
     if(len(prefFile) == 0):
         # do nothing to the variables if the file is empty
@@ -70,94 +577,614 @@ def openPreferences(filename):
         encPass = prefFile[0]
         prevDir = prefFile[1]
     else:
-        # overwrite both the encoded password and directory variables if they both exist in the file
+        # overwrite both the encoded password and directory variables if they both exist in the file.
+        # every line after that is a roster file
         encPass = prefFile[0]
         prevDir = prefFile[1]
-        database = prefFile[2]
+        database = prefFile[2:]
     # return as tuple to be unpacked later
     return (encPass, prevDir, database)
  
  
+def getScreen(name):
+    global screenBuilders, builtScreens
+    # return the frame for a screen, building it first if this is the first time it's needed.
+    # A new frame is put behind the others, so building it (e.g. to print a message on it) doesn't change
+    # which screen is showing. showScreen brings it to the front.
+    if(name not in builtScreens):
+        builtScreens[name] = screenBuilders[name]()
+        builtScreens[name].lower()
+    return builtScreens[name]
+
+def isScreenBuilt(name):
+    global builtScreens
+    # screens that haven't been built yet have nothing on them to update or clear
+    return name in builtScreens
+
+def showScreen(name):
+    # bring a screen to the front (building it first if needed)
+    getScreen(name).tkraise()
+
 def printMessageToUser(printText):
     # replace the Error Report text in the Sign-In screen with the input text
+    getScreen("signin")
     lbl_err.config(text=printText)
  
 def printMessageToPasswordCreate(printText):
     # replace the Error Report text in the Create Password screen with the input text
-    lbl_newPassErr.config(text=printText)
+    if(isScreenBuilt("passwdCreate")):
+        lbl_newPassErr.config(text=printText)
  
 def printMessageToPassword(printText):
     # replace the Error Report text in the Enter Password screen with the input text
-    lbl_passErr.config(text=printText)
+    if(isScreenBuilt("passwd")):
+        lbl_passErr.config(text=printText)
 
 def printMessageToInitalSetup(printText):
     # replace the Error Report text in the Create Password screen with the input text
-    lbl_initPrintText.config(text=printText)
+    if(isScreenBuilt("initSetup")):
+        lbl_initPrintText.config(text=printText)
  
 def printMessageToError(printText):
     # replace the Error Report text in the Create Password screen with the input text
-    lbl_errorSetupText.config(text=printText)
+    if(isScreenBuilt("error")):
+        lbl_errorSetupText.config(text=printText)
 
  
 def displaySignInScreen():
     # bring up the sign in screen
-    frame_signin.tkraise()
+    showScreen("signin")
  
 def displayConfirmationScreen():
-    global currentFName, currentLName, currentSID, currentGrade
-    # write the name, ID, and grade into the labels on the Confirmation screen
+    global currentFName, currentLName, currentSID, currentGrade, currentExtras
+    # write the name, ID, grade, and any extra info into the labels on the Confirmation screen
+    getScreen("confirm")
     lbl_name.config(text=f"Name: {currentFName} {currentLName}")
     lbl_sID.config(text=f"ID #{currentSID}")
     lbl_grade.config(text=f"Grade {currentGrade}")
+    lbl_extra.config(text="\n".join(currentExtras))
+    showStudentPhoto(currentSID)
     # display the Confirmation screen
-    frame_confirm.tkraise()
+    showScreen("confirm")
  
 def displayLibrarianPasswordScreen():
     # bring up the Librarian Password screen
-    frame_passwd.tkraise()
+    showScreen("passwd")
  
 def displayPasswordResetScreen():
     # bring up the Create Password screen
-    frame_passwdCreate.tkraise()
+    showScreen("passwdCreate")
  
 def displayExportReportScreen():
     # reset the file name to have the current date/time included in it
+    getScreen("saveReport")
     ent_fileName.delete(0, "end")
     instant = datetime.now()
     instantF = instant.strftime("%m-%d ")
     ent_fileName.insert(0, f"{defaultFileNameStart}{instantF}Period _")
     # bring up the Export Report screen
-    frame_saveReport.tkraise()
+    showScreen("saveReport")
  
  
+def buildIDIndex(roster):
+    # The roster is sorted by ID when it is opened, so the ID column can be binary searched.
+    # This returns the ID column as an array of numbers for fast searching (or an empty list if there's no roster).
+    if(roster is None):
+        return []
+    # (a memory-mapped roster's IDs are already an array of numbers)
+    if(isMappedRoster(roster)):
+        return roster["ID"]
+    return roster["ID"].to_numpy(dtype="int64")
+
+def compactRoster(roster, rosterIDs):
+    global minGrade, databaseExtraColumns
+    # This method turns the roster into plain columns once the search indexes are built, so the pandas table
+    # (and everything pandas keeps for each row) can be let go: the IDs are the same number array the ID index
+    # already uses (rosterIDs, see buildIDIndex), the names are Lists of shared (interned) strings,
+    # and each grade takes one byte. The roster is then a dictionary of {column name: column}.
+    # A memory-mapped roster (see openMappedRosters) is already as small as it gets, so it's left as it is.
+    if(roster is None or isMappedRoster(roster)):
+        return roster
+    compact = {"ID": rosterIDs,
+        "Last Name": [sys.intern(str(name)) for name in roster["Last Name"].tolist()],
+        "First Name": [sys.intern(str(name)) for name in roster["First Name"].tolist()],
+        "Grade": roster["Grade"].astype("int64").to_numpy().astype("int8" if minGrade < 0 else "uint8")}
+    for column in databaseExtraColumns:
+        compact[column] = roster[column].tolist()
+    return compact
+
+def getRosterRow(roster, position):
+    # return the student at a row position as {column name: value}, whether the roster is a pandas table, compact (see compactRoster),
+    # or memory-mapped (see readMappedRow, which returns None for a row that can't be used)
+    if(isMappedRoster(roster)):
+        return readMappedRow(roster, position)
+    if(isinstance(roster, dict)):
+        student = {column: values[position] for (column, values) in roster.items()}
+        student["ID"] = int(student["ID"])
+        student["Grade"] = int(student["Grade"])
+        return student
+    return roster.iloc[position]
+
+def getRosterColumn(roster, column):
+    # return one column of the roster as a List, whether the roster is a pandas table or compact (see compactRoster).
+    # For a memory-mapped roster, every row is read to get anything but the IDs (so that's slow, and rows that can't be used are None)
+    if(isMappedRoster(roster) and column != "ID"):
+        return [student[column] if student is not None else None for student in [readMappedRow(roster, position) for position in range(len(roster["ID"]))]]
+    values = roster[column]
+    return values if isinstance(values, list) else values.tolist()
+
+def getResidentMemoryMB():
+    # This method returns how much memory this program is using right now (its resident set size) in megabytes.
+    # Linux keeps this in /proc. Elsewhere the most it has used so far is the closest there is (and nothing on Windows).
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576
+    except (OSError, ValueError, AttributeError):
+        pass
+    if(os.name == "nt"):
+        return None
+    peakMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS counts in bytes, everywhere else in kilobytes
+    return peakMemory / (1048576 if sys.platform == "darwin" else 1024)
+
+def measureRosterMemory(studentCount, mode):
+    global database, databaseIDs, nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames, rosterCache, mappedRosterMode, rosterIndexCacheDirectory
+    # This method runs in its own process (see reportRosterMemory). It makes up a roster of studentCount students,
+    # loads it and builds the search indexes like the program does at startup ("table", "compact", or "mapped" mode),
+    # and prints how much memory the process used before and after, and how long loading took, as JSON.
+    # A memory-mapped roster is loaded a second time to time it with its saved index.
+    testFolder = tempfile.mkdtemp()
+    try:
+        rosterFile = os.path.join(testFolder, "Memory Test Roster.csv")
+        makeTestRoster(rosterFile, studentCount, seed=1)
+        mappedRosterMode = mode == "mapped"
+        rosterIndexCacheDirectory = os.path.join(testFolder, "index cache")
+        gc.collect()
+        memoryBefore = getResidentMemoryMB()
+        startTime = time.perf_counter()
+        (database, databaseReportLines) = loadDatabases([rosterFile])
+        databaseIDs = buildIDIndex(database)
+        (nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames) = buildNameIndex(database)
+        if(mode == "compact"):
+            database = compactRoster(database, databaseIDs)
+            rosterCache.clear()
+        loadTime = time.perf_counter() - startTime
+        cachedLoadTime = None
+        if(mode == "mapped"):
+            startTime = time.perf_counter()
+            (database, databaseReportLines) = loadDatabases([rosterFile])
+            databaseIDs = buildIDIndex(database)
+            cachedLoadTime = time.perf_counter() - startTime
+        gc.collect()
+        print(json.dumps({"before": memoryBefore, "after": getResidentMemoryMB(), "load": loadTime, "cachedLoad": cachedLoadTime}))
+    finally:
+        database = None
+        shutil.rmtree(testFolder, ignore_errors=True)
+
+def reportRosterMemory(studentCounts):
+    # This method prints how much memory a made-up roster of each size takes once it's loaded and indexed,
+    # as a pandas table, in compact mode, and memory-mapped, along with how long it took to load.
+    # Each one is measured in a new process, so memory left over from one measurement can't count towards the next.
+    # (A memory-mapped roster's file is in the system's file cache instead, which isn't counted.)
+    print(f"{'Students':>10}{'Mode':>10}{'Total (MB)':>12}{'Roster (MB)':>13}{'Load (s)':>10}{'Cached (s)':>12}")
+    for studentCount in studentCounts:
+        for mode in ("table", "compact", "mapped"):
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), "--roster-rss-child", str(studentCount), mode], capture_output=True, text=True)
+            if(child.returncode != 0):
+                print(f"{studentCount:>10}{mode:>10}  failed: {child.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            if(result["after"] is None):
+                print(f"{studentCount:>10}{mode:>10}  (memory use can't be measured here)")
+                continue
+            cachedLoad = f"{result['cachedLoad']:>12.2f}" if result["cachedLoad"] is not None else f"{'-':>12}"
+            print(f"{studentCount:>10}{mode:>10}{result['after']:>12.1f}{result['after'] - result['before']:>13.1f}{result['load']:>10.2f}{cachedLoad}")
+
 def getDetailsAboutStudent(id):
     # This method will search the Student Database CSV file for a student with the input ID number. 
     # It will return False if no student can be found, and will return the following data if found:
     # The student's first and last name, and their grade.
-    global database, invalidInputText
+    global database, databaseIDs, databaseExtraColumns, invalidInputText
  
-    # Search the database for any entries that match the input ID
-    student = database.loc[database["ID"] == id]
-    if(student.empty):
-        # If the .loc() function doesn't find anything, it will have the .empty parameter. 
-        # If the student variable has .empty, the student with that ID wasn't found.
+    # Binary search the sorted ID column for the input ID
+    position = int(databaseIDs.searchsorted(id)) if len(databaseIDs) > 0 else 0
+    if(position >= len(databaseIDs) or databaseIDs[position] != id):
+        # If the search lands on a different ID (or past the end of the roster), 
+        # the student with that ID wasn't found.
         # In this case, return False.
         return False
     else:
-        # convert the student data with the matching ID to a List to be easier to export to the rest of the program.
-        studList = student.values.tolist()
-        # return the last name, first name, and grade using the second, third, and fourth entries
-        # in the converted Student list
-        return (studList[0][1], studList[0][2], studList[0][3])
+        # get the student data with the matching ID
+        student = getRosterRow(database, position)
+        if(student is None):
+            return False
+        # return the last name, first name, grade, and a List of (column name, value) for any extra columns to display
+        extras = [(column, student[column]) for column in databaseExtraColumns]
+        return (student["Last Name"], student["First Name"], student["Grade"], extras)
 
-def confirmID():
-    global minDigits, maxDigits, currentFName, currentLName, currentSID, currentGrade, noStudentFoundText1, noStudentFoundText2, invalidInputText
-    # get the current text inside the ID entry box. Check if it is only a number
-    studentIDraw = str(ent_sID.get()).strip()
+def normalizeName(name):
+    # lowercase the name and squash any extra spaces so "  McDonald " and "mcdonald" are the same key
+    return " ".join(str(name).lower().split())
+
+def buildNameIndex(roster):
+    # This method builds a prefix index over the Last Name and First Name columns of the roster.
+    # Every name is stored as a (name, row position) pair in a List sorted by name,
+    # so all names starting with the same letters sit next to each other and can be found with bisect.
+    # It returns the sorted name keys, the row position of each key, the sorted list of unique names,
+    # and the (last, first) names of every row so results can be ranked without touching the roster again.
+    # Each name is only kept once however many students share it (interned), and the row positions are kept
+    # as one array of numbers, since the name index is most of the memory the roster takes.
+    # A memory-mapped roster doesn't read its rows until they're looked up, so it has no name index (or name search).
+    if(roster is None or isMappedRoster(roster)):
+        return ([], [], [], [])
+    entries = []
+    lastNames = [sys.intern(normalizeName(name)) for name in getRosterColumn(roster, "Last Name")]
+    firstNames = [sys.intern(normalizeName(name)) for name in getRosterColumn(roster, "First Name")]
+    for row in range(len(lastNames)):
+        entries.append((lastNames[row], row))
+        entries.append((firstNames[row], row))
+    entries.sort()
+    keys = [entry[0] for entry in entries]
+    rows = array("i", [entry[1] for entry in entries])
+    # the unique names are used for the typo search, since the same name can belong to many students
+    uniqueKeys = sorted(set(keys))
+    return (keys, rows, uniqueKeys, list(zip(lastNames, firstNames)))
+
+def boundedEditDistance(query, name, limit):
+    # This method returns how many single-letter edits (insert, delete, replace) it takes to turn the query
+    # into the START of the name, so "magn" matches "magnus" with a distance of 0.
+    # It gives up early and returns limit + 1 once every path is already over the limit.
+    previousRow = list(range(len(name) + 1))
+    for i in range(1, len(query) + 1):
+        currentRow = [i] + [0] * len(name)
+        for j in range(1, len(name) + 1):
+            cost = 0 if query[i - 1] == name[j - 1] else 1
+            currentRow[j] = min(previousRow[j] + 1, currentRow[j - 1] + 1, previousRow[j - 1] + cost)
+        if(min(currentRow) > limit):
+            return limit + 1
+        previousRow = currentRow
+    # the smallest value in the last row is the best match against any prefix of the name
+    return min(previousRow)
+
+def findCloseNames(token, limit, start, end, rowsLeft):
+    # This method walks the sorted List of unique names (from position start up to end) like a trie and returns
+    # a List of (edit distance, name) for every name that starts with (or nearly starts with) the token,
+    # and how many of the rowsLeft edit distance rows it's allowed to work out are still left.
+    # Names next to each other in the sorted List share their first letters, so the edit distance rows
+    # worked out for those letters are reused, and as soon as every row is over the limit
+    # all the names starting with those letters are skipped at once using bisect.
+    # Once rowsLeft rows have been worked out it stops, so a search can't take too long.
+    global nameIndexUnique
+    matches = []
+    # rows[i] is the edit distance row after the first i letters of the current name.
+    # bests[i] is the best distance between the whole token and any of the first i letters of the current name.
+    rows = [list(range(len(token) + 1))]
+    bests = [len(token)]
+    previousName = ""
+    maxDepth = len(token) + limit
+    position = start
+    while(position < end and rowsLeft > 0):
+        name = nameIndexUnique[position]
+        # keep the rows for the letters this name shares with the previous one
+        common = 0
+        while(common < len(rows) - 1 and common < len(name) and name[common] == previousName[common]):
+            common += 1
+        del rows[common + 1:]
+        del bests[common + 1:]
+        previousName = name
+        skipped = False
+        for i in range(common + 1, min(len(name), maxDepth) + 1):
+            letter = name[i - 1]
+            previousRow = rows[i - 1]
+            # only the cells within "limit" of the diagonal can ever be close enough, so the rest stay over the limit
+            row = [min(i, limit + 1)] + [limit + 1] * len(token)
+            for j in range(max(1, i - limit), min(len(token), i + limit) + 1):
+                row[j] = min(previousRow[j] + 1, row[j - 1] + 1, previousRow[j - 1] + (token[j - 1] != letter))
+            rows.append(row)
+            bests.append(min(bests[-1], row[-1]))
+            rowsLeft -= 1
+            if(min(row) > limit):
+                # no more letters can make a name starting with these letters any closer, so jump past all of them
+                # (adding them all if the letters up to here were already close enough)
+                skipTo = bisect_left(nameIndexUnique, name[:i] + "\uffff", position + 1, end)
+                if(bests[-1] <= limit):
+                    matches.extend([(bests[-1], skippedName) for skippedName in nameIndexUnique[position:skipTo]])
+                position = skipTo
+                skipped = True
+                break
+        if(skipped):
+            continue
+        if(bests[-1] <= limit):
+            matches.append((bests[-1], name))
+        position += 1
+    return (matches, rowsLeft)
+
+def findNameCandidates(token, limit):
+    # This method returns a dictionary of {row position: edit distance} for the students
+    # with a first or last name that starts with (or nearly starts with) the token, closest names first.
+    # It stops collecting once there are nameSearchMaxCandidates so a very common name stays fast.
+    global nameIndexKeys, nameIndexRows, nameIndexUnique, nameSearchMaxCandidates, nameSearchMaxRows
+    candidates = {}
+    # exact prefix matches are one contiguous range in the sorted keys, so check those first
+    start = bisect_left(nameIndexKeys, token)
+    end = bisect_left(nameIndexKeys, token + "\uffff")
+    for position in range(start, min(end, start + nameSearchMaxCandidates)):
+        candidates[nameIndexRows[position]] = 0
+    # only look for typos if there aren't already plenty of exact matches
+    if(len(candidates) >= nameSearchMaxCandidates or limit == 0):
+        return candidates
+    # the names starting with the same letter are checked first, since most typos aren't in the first letter,
+    # then the rest of the names until nameSearchMaxRows edit distance rows have been worked out
+    letterStart = bisect_left(nameIndexUnique, token[0])
+    letterEnd = bisect_left(nameIndexUnique, token[0] + "\uffff")
+    closeNames = []
+    rowsLeft = nameSearchMaxRows
+    for (start, end) in [(letterStart, letterEnd), (0, letterStart), (letterEnd, len(nameIndexUnique))]:
+        (matches, rowsLeft) = findCloseNames(token, limit, start, end, rowsLeft)
+        closeNames.extend(matches)
+    for (distance, name) in sorted(closeNames):
+        if(len(candidates) >= nameSearchMaxCandidates):
+            break
+        # every student with this exact name is one contiguous range in the sorted keys
+        keyStart = bisect_left(nameIndexKeys, name)
+        keyEnd = bisect_left(nameIndexKeys, name + "\x00")
+        for position in range(keyStart, min(keyEnd, keyStart + nameSearchMaxCandidates - len(candidates))):
+            row = nameIndexRows[position]
+            if(row not in candidates):
+                candidates[row] = distance
+    return candidates
+
+def searchStudentsByName(query):
+    # This method searches the roster for students matching a typed name such as "Magnus", "ademir m" or "Magnus Ademir".
+    # It returns a List of up to nameSearchMaxResults (row position, total edit distance) tuples, best matches first.
+    global database, nameIndexRowNames, nameSearchMaxTypos, nameSearchMaxResults
+    tokens = normalizeName(query).split()
+    if(len(tokens) == 0 or database is None):
+        return []
+    # use the longest word to find candidates, since it narrows down the roster the most
+    mainToken = max(tokens, key=len)
+    otherTokens = list(tokens)
+    otherTokens.remove(mainToken)
+    limit = min(nameSearchMaxTypos, len(mainToken) // 3)
+    candidates = findNameCandidates(mainToken, limit)
+    results = []
+    # many students share a name, so remember the distances that were already worked out
+    knownDistances = {}
+    for row, distance in candidates.items():
+        score = distance
+        # every other word typed must also match one of this student's names
+        rowNames = nameIndexRowNames[row]
+        for token in otherTokens:
+            tokenLimit = min(nameSearchMaxTypos, len(token) // 3)
+            for name in rowNames:
+                if((token, name) not in knownDistances):
+                    knownDistances[(token, name)] = boundedEditDistance(token, name[:len(token) + tokenLimit], tokenLimit)
+            score += min(knownDistances[(token, name)] for name in rowNames)
+            if(score > nameSearchMaxTypos * len(tokens)):
+                break
+        if(score <= nameSearchMaxTypos * len(tokens)):
+            results.append((row, score))
+    # sort by the closest match first, then alphabetically by last name for a stable order
+    results.sort(key=lambda result: (result[1], nameIndexRowNames[result[0]]))
+    return results[:nameSearchMaxResults]
+
+def findStudentByName():
+    global candidateIDs, nameSearchMinChars, nameSearchTooShortText, noNameMatchText
+    # get the text inside the name search box
+    query = ent_nameSearch.get().strip()
+    lst_candidates.delete(0, "end")
+    candidateIDs = []
+    if(len(query.replace(" ", "")) < nameSearchMinChars):
+        printMessageToUser(nameSearchTooShortText)
+        return
+    results = searchStudentsByName(query)
+    if(len(results) == 0):
+        printMessageToUser(noNameMatchText)
+        return
+    # fill the candidate list with the matching students so the student can pick themselves out
+    showCandidates([row for (row, score) in results])
+    printMessageToUser(pickYourNameText)
+
+def showCandidates(rows):
+    global candidateIDs
+    # replace the contents of the candidate list with the students at the given roster row positions
+    lst_candidates.delete(0, "end")
+    candidateIDs = []
+    for row in rows:
+        student = getRosterRow(database, row)
+        if(student is None):
+            continue
+        candidateIDs.append(int(student["ID"]))
+        # start reading their photo now, so it's ready if they pick themselves
+        prefetchPhoto(int(student["ID"]))
+        lst_candidates.insert("end", f"#{student['ID']}  {student['First Name']} {student['Last Name']} (Grade {student['Grade']})")
+
+def findPhotoFile(studentID):
+    global photoDirectory
+    # student photos are named by Student ID (e.g. 12345.png or 12345.gif). Returns None if there isn't one.
+    for ending in (".png", ".gif"):
+        filename = os.path.join(photoDirectory, f"{studentID}{ending}")
+        if(os.path.isfile(filename)):
+            return filename
+    return None
+
+def readPhotoFile(studentID):
+    global photoBytes, photoLock, photoPrefetchLimit, photoRequests
+    # This method runs on the photo thread. It reads the photo file (but doesn't decode it, that has to happen in the window)
+    # and keeps the bytes for the next photoPrefetchLimit students, oldest dropped first.
+    # A dropped student isn't being read anymore, so their photo is read again if it's asked for later.
+    data = None
+    try:
+        filename = findPhotoFile(studentID)
+        if(filename is not None):
+            with open(filename, "rb") as file:
+                data = file.read()
+    except OSError as error:
+        # (counts as no photo for now, see photoMissSeconds)
+        logger.warning("Couldn't read the photo for student #%s: %s", studentID, error)
+    with photoLock:
+        photoBytes[studentID] = data
+        while(len(photoBytes) > photoPrefetchLimit):
+            (droppedID, droppedData) = photoBytes.popitem(last=False)
+            photoRequests.discard(droppedID)
+
+def prefetchPhoto(studentID):
+    global photoDirectory, photoCache, photoRequests, photoPool
+    # start reading a student's photo in the background, unless it's already ready or being read
+    if(photoDirectory is None or studentID in photoCache or isRecentPhotoMiss(studentID)):
+        return
+    with photoLock:
+        if(studentID in photoRequests):
+            return
+        photoRequests.add(studentID)
+    photoPool.put(studentID)
+
+def startPhotoReader():
+    # start the thread that reads photos from disk. It's a daemon thread, so a photo folder on a network drive
+    # that stops answering can't keep the program from closing.
+    threading.Thread(target=runPhotoReader, daemon=True).start()
+
+def runPhotoReader():
+    global photoPool
+    # read the photos asked for by prefetchPhoto, one at a time
+    while(True):
+        readPhotoFile(photoPool.get())
+
+def cancelPhotoReads():
+    global photoPool
+    # forget the photos still waiting to be read (called when the program closes)
+    while(True):
+        try:
+            photoPool.get_nowait()
+        except queue.Empty:
+            return
+
+def isRecentPhotoMiss(studentID):
+    global photoMisses, photoMissSeconds
+    # a student found to have no photo (or one that couldn't be read) isn't looked for again for photoMissSeconds,
+    # so a photo added to the folder later still shows up
+    return studentID in photoMisses and time.monotonic() - photoMisses[studentID] < photoMissSeconds
+
+def getStudentPhoto(studentID):
+    global photoCache, photoCacheBytes, photoCacheMB, photoBytes, photoLock, photoRequests, photoMaxSize, photoMisses
+    # This method returns (the student's photo or None if they don't have one, True) if it's ready,
+    # or (None, False) if it's still being read from disk (it never waits on the disk itself).
+    # Decoded photos are shrunk to fit photoMaxSize pixels and kept in a cache, dropping the least recently shown
+    # ones once the cache takes more than photoCacheMB megabytes. Missing photos aren't cached (see isRecentPhotoMiss).
+    if(studentID in photoCache):
+        photoCache.move_to_end(studentID)
+        return (photoCache[studentID][0], True)
+    if(isRecentPhotoMiss(studentID)):
+        return (None, True)
+    with photoLock:
+        ready = studentID in photoBytes
+        data = photoBytes.pop(studentID, None)
+        if(ready):
+            photoRequests.discard(studentID)
+    if(not ready):
+        prefetchPhoto(studentID)
+        return (None, False)
+    photo = None
+    if(data is not None):
+        try:
+            photo = tk.PhotoImage(data=base64.b64encode(data))
+            # shrink it by a whole number so the longest side fits in photoMaxSize
+            shrink = math.ceil(max(photo.width(), photo.height()) / photoMaxSize)
+            if(shrink > 1):
+                photo = photo.subsample(shrink)
+            size = photo.width() * photo.height() * 4
+        except tk.TclError:
+            logger.warning("Couldn't read the photo for student #%s", studentID)
+            photo = None
+    if(photo is None):
+        photoMisses[studentID] = time.monotonic()
+        return (None, True)
+    photoMisses.pop(studentID, None)
+    photoCache[studentID] = (photo, size)
+    photoCacheBytes += size
+    while(photoCacheBytes > photoCacheMB * 1048576 and len(photoCache) > 1):
+        (oldID, (oldPhoto, oldSize)) = photoCache.popitem(last=False)
+        photoCacheBytes -= oldSize
+    return (photo, True)
+
+def showStudentPhoto(studentID):
+    global currentSID, currentPhoto, photoCheckDelay, photoDirectory
+    # put the student's photo on the Confirmation screen. If it isn't read from disk yet,
+    # check again in photoCheckDelay milliseconds (as long as the same student is still on the screen).
+    if(photoDirectory is None or studentID != currentSID):
+        return
+    (photo, ready) = getStudentPhoto(studentID)
+    # keep a reference to the photo being shown, so it isn't deleted while it's on the screen
+    currentPhoto = photo
+    lbl_photo.config(image=photo if photo is not None else "")
+    if(not ready):
+        root.after(photoCheckDelay, showStudentPhoto, studentID)
+
+def findIDCompletions(prefix):
+    # This method returns the roster row positions of up to autocompleteMaxResults students
+    # whose ID starts with the typed digits, shortest IDs first.
+    # Because the IDs are sorted numbers, every ID starting with "808" and having 5 digits
+    # is between 80800 and 80899, so each possible ID length is one binary searched range.
+    global databaseIDs, minDigits, maxDigits, autocompleteMaxResults
+    rows = []
+    if(len(databaseIDs) == 0 or not prefix.isdecimal() or prefix.startswith("0")):
+        return rows
+    for length in range(max(len(prefix), minDigits), maxDigits + 1):
+        scale = 10 ** (length - len(prefix))
+        start = int(databaseIDs.searchsorted(int(prefix) * scale))
+        end = int(databaseIDs.searchsorted((int(prefix) + 1) * scale))
+        rows.extend(range(start, min(end, start + autocompleteMaxResults - len(rows))))
+        if(len(rows) >= autocompleteMaxResults):
+            break
+    return rows
+
+def scheduleIDCompletions(event=None):
+    global autocompleteJob, autocompleteDelay
+    # wait until the student stops typing for a moment before searching,
+    # so holding a key down or typing fast only runs one search
+    if(autocompleteJob is not None):
+        root.after_cancel(autocompleteJob)
+    autocompleteJob = root.after(autocompleteDelay, updateIDCompletions)
+
+def updateIDCompletions():
+    global autocompleteJob, minDigits
+    autocompleteJob = None
+    typed = ent_sID.get().strip()
+    # don't suggest anything until enough digits are typed to narrow the roster down
+    if(len(typed) < minDigits or not typed.isdecimal()):
+        lst_candidates.delete(0, "end")
+        return
+    showCandidates(findIDCompletions(typed))
+
+def selectCandidate(event=None):
+    global candidateIDs, autocompleteJob
+    # get the student picked from the candidate list, if any
+    selection = lst_candidates.curselection()
+    if(len(selection) == 0):
+        return
+    studentID = candidateIDs[selection[0]]
+    # put the ID into the ID entry box and sign in as if the student typed it themselves
+    ent_sID.delete(0, "end")
+    ent_sID.insert(0, str(studentID))
+    ent_nameSearch.delete(0, "end")
+    lst_candidates.delete(0, "end")
+    candidateIDs = []
+    # stop any suggestion search that was still waiting to run
+    if(autocompleteJob is not None):
+        root.after_cancel(autocompleteJob)
+        autocompleteJob = None
+    confirmID()
+
+def checkStudentID(studentIDraw):
+    global minDigits, maxDigits, noStudentFoundText1, noStudentFoundText2, invalidInputText
+    global tooFewDigitsStartText, tooManyDigitsStartText, invalidDigitCountSharedText
+    # This method checks typed-in text for a real Student ID, without touching the window.
+    # It returns (the student's (ID, last name, first name, grade, extras), None) if the student was found,
+    # or (None, the error message for the user) if not.
+    studentIDraw = str(studentIDraw).strip()
     # if the text inside cannot be converted to decimal, print error to user
     if(not studentIDraw.isdecimal()):
-        printMessageToUser(invalidInputText)
-        return
+        return (None, invalidInputText)
     # convert the entry text into a number and get the number of digits
     studentID = int(studentIDraw)
     idDigits = len(str(studentID))
@@ -168,34 +1195,40 @@ def confirmID():
         plural = ""
     youEnteredXDigitsText = f"(You entered {idDigits} digit{plural}.)"
     if(minDigits > idDigits):
-        printMessageToUser(f"{tooFewDigitsStartText} {invalidDigitCountSharedText}\n{youEnteredXDigitsText}")
-        return
+        return (None, f"{tooFewDigitsStartText} {invalidDigitCountSharedText}\n{youEnteredXDigitsText}")
     elif(idDigits > maxDigits):
-        printMessageToUser(f"{tooManyDigitsStartText} {invalidDigitCountSharedText}\n{youEnteredXDigitsText}")
-        return
+        return (None, f"{tooManyDigitsStartText} {invalidDigitCountSharedText}\n{youEnteredXDigitsText}")
     # The ID is valid and the database CSV will now be checked for a student with this ID
-    else:
-        # Check if this is a real student ID
-        studentData = getDetailsAboutStudent(studentID)
-        # the getDetailsAboutStudent method returns False if no student can be found. 
-        # If this is the case, print out appropriate error message.
-        if(studentData is False):
-            printMessageToUser(f"{noStudentFoundText1}{studentID}{noStudentFoundText2}")
-            return
-        else:
-            # the getDetailsAboutStudent method returns a tuple if the student is found. 
-            # Save the tuple contents to appropriate variables 
-            # and convert them to strings and ints accordingly
-            (lName, fName, grade) = studentData
-            currentFName = str(fName)
-            currentLName = str(lName)
-            currentSID = int(studentID)
-            currentGrade = int(grade)
-            # display the confirmation screen with appropriate information
-            displayConfirmationScreen()
+    # Check if this is a real student ID
+    studentData = getDetailsAboutStudent(studentID)
+    # the getDetailsAboutStudent method returns False if no student can be found. 
+    # If this is the case, print out appropriate error message.
+    if(studentData is False):
+        return (None, f"{noStudentFoundText1}{studentID}{noStudentFoundText2}")
+    (lName, fName, grade, extras) = studentData
+    return ((studentID, lName, fName, grade, extras), None)
+
+def confirmID():
+    global currentFName, currentLName, currentSID, currentGrade, currentExtras
+    # get the current text inside the ID entry box and check it for a real student
+    (student, errorText) = checkStudentID(ent_sID.get())
+    if(student is None):
+        printMessageToUser(errorText)
+        return
+    # the student was found. Save their details to appropriate variables 
+    # and convert them to strings and ints accordingly
+    (studentID, lName, fName, grade, extras) = student
+    currentFName = str(fName)
+    currentLName = str(lName)
+    currentSID = int(studentID)
+    currentGrade = int(grade)
+    currentExtras = [f"{column}: {value}" for (column, value) in extras if not pd.isna(value)]
+    # display the confirmation screen with appropriate information
+    displayConfirmationScreen()
  
 def updatePassword(useOldPass = True, pass1RAW = None , pass2RAW = None):
     global preferencesFileName, encPass, librarianPassUpdateText, oldPasswordIncorrectText, newPasswordIncorrectText
+    # returns True if the password was changed, False if there was something wrong with what was entered.
     # if no password in the preferences file can be found, 
     # old password is made blank. 
     if(pass1RAW is None):
@@ -217,7 +1250,6 @@ def updatePassword(useOldPass = True, pass1RAW = None , pass2RAW = None):
     pass2 = sha256(pass2RAW.encode('utf-8')).hexdigest()
     length = len(pass1RAW.strip())
 
-    print(pass1RAW)
     # if the new encoded passwords match and the old entered password matches the one from the file
     if(pass1 == pass2 and pass0 == oldPass and length >= 4):
         # print("Passwords match! Updating password in file...")
@@ -233,18 +1265,23 @@ def updatePassword(useOldPass = True, pass1RAW = None , pass2RAW = None):
         signinTime = datetime.now()
         signinTimeFormatted = signinTime.strftime("%I:%M %p")
         currentRecords.append(f"{reportChangePassword}{signinTimeFormatted}")
+        fireEvent("admin", {"change": "password", "time": signinTime.isoformat()})
         # print out confirmation message
         printMessageToUser(librarianPassUpdateText)
-        # erase all the data inside the entry boxes
-        ent_pass0.delete(0, 'end')
-        ent_pass1.delete(0, 'end')
-        ent_pass2.delete(0, 'end')
-        ent_passInit1.delete(0, 'end')
-        ent_passInit2.delete(0, 'end')
-        ent_passError1.delete(0, 'end')
-        ent_passError2.delete(0, 'end')
+        # erase all the data inside the entry boxes (on the screens that have been built)
+        if(isScreenBuilt("passwdCreate")):
+            ent_pass0.delete(0, 'end')
+            ent_pass1.delete(0, 'end')
+            ent_pass2.delete(0, 'end')
+        if(isScreenBuilt("initSetup")):
+            ent_passInit1.delete(0, 'end')
+            ent_passInit2.delete(0, 'end')
+        if(isScreenBuilt("error")):
+            ent_passError1.delete(0, 'end')
+            ent_passError2.delete(0, 'end')
         # return to base sign-in screen
         displaySignInScreen()
+        return True
     # if the entered password doesn't match the one in the file, report error
     elif(pass0 != oldPass):
         printMessageToPasswordCreate(oldPasswordIncorrectText)
@@ -253,50 +1290,172 @@ def updatePassword(useOldPass = True, pass1RAW = None , pass2RAW = None):
         printMessageToInitalSetup(createPasswordIncorrectText)
         printMessageToPasswordCreate(newPasswordIncorrectText)
         printMessageToError(newPasswordIncorrectText)
-    elif(len(ent_pass1.get()) < 4):
+    elif(length < 4):
         printMessageToInitalSetup(passwordTooShortText)
         printMessageToPasswordCreate(passwordTooShortText)
         printMessageToError(passwordTooShortText)
+    return False
 
 def changeDatabasePath():
-    global databasePath, databaseBeginningText, databasePopupText, lbl_currDir, database, currentRecords, reportChangeDatabase
-    # open a directory window to choose where to save the file
-    newData = filedialog.askopenfilename(title=databasePopupText,filetypes=[("CSV files", "*.csv")]) # shows dialog box and return the path
-    # update the variable and space in the file that represent the directory, ONLY if the new directory was picked.
-    # Also handles an issue where closing the directory window causes it to have an empty directory.
-    if(newData != ""):
-        databasePath = newData
-    filename = databasePath[ databasePath.rfind("/")+1 :]
-    txt = f"{databaseBeginningText}\n{filename}"  
-    database = openDatabase(databasePath, databaseHeaderLine, databaseSortBy)
+    global databasePaths, databaseBeginningText, databasePopupText, database, rosterLoading, rosterLoadingText, rosterCheckDelay, rosterLoadingPaths
+    # only one roster change at a time
+    if(rosterLoading):
+        return
+    # open a file window to choose the roster files (more than one can be picked, e.g. one per grade)
+    newData = filedialog.askopenfilenames(title=databasePopupText,filetypes=[("CSV files", "*.csv *.csv.gz")]) # shows dialog box and return the paths
+    # Closing the window without picking anything just reloads the current files (only the ones that changed are read again).
+    # The variables and the preferences file only change to the new files once they've loaded (see checkRosterLoaded).
+    rosterLoadingPaths = list(newData) if len(newData) > 0 else list(databasePaths)
+    if(len(rosterLoadingPaths) == 0):
+        return
+    # load the new roster files in the background so the window keeps working (sign-ins use the old roster until it's done).
+    # checkRosterLoaded swaps in the new roster when it's ready.
+    rosterLoading = True
+    if(isScreenBuilt("saveReport")):
+        lbl_database.config(text=f"{databaseBeginningText}\n{getDatabaseNames(rosterLoadingPaths)}\n{rosterLoadingText}")
+    threading.Thread(target=loadDatabasesInBackground, args=(list(rosterLoadingPaths), database), daemon=True).start()
+    root.after(rosterCheckDelay, checkRosterLoaded)
+
+def loadDatabasesInBackground(filenames, oldDatabase):
+    global rosterLoadResults, compactRosterMode, rosterCache
+    # This method runs on its own thread. It loads the roster files, builds the search indexes,
+    # and compares the new roster to the old one, then hands everything back to the window through rosterLoadResults.
+    try:
+        (newDatabase, databaseReportLines) = loadDatabases(filenames)
+        newIDs = buildIDIndex(newDatabase)
+        nameIndex = buildNameIndex(newDatabase)
+        changes = diffRosters(oldDatabase, newDatabase)
+        if(compactRosterMode):
+            newDatabase = compactRoster(newDatabase, newIDs)
+            rosterCache.clear()
+        rosterLoadResults.put((newDatabase, databaseReportLines, newIDs, nameIndex, changes))
+    except Exception as error:
+        logger.exception("Couldn't load the roster files %s", filenames)
+        rosterLoadResults.put(error)
+
+def checkRosterLoaded():
+    global databaseName, databaseBeginningText, database, currentRecords, reportChangeDatabase, databasePaths, rosterLoading, rosterCheckDelay, rosterLoadResults
+    global nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames, databaseIDs, rosterLoadFailedText, rosterLoadingPaths
+    # called every rosterCheckDelay milliseconds by the window until the roster files finish loading
+    try:
+        result = rosterLoadResults.get_nowait()
+    except queue.Empty:
+        root.after(rosterCheckDelay, checkRosterLoaded)
+        return
+    rosterLoading = False
+    txt = f"{databaseBeginningText}\n{databaseName}"  
+    if(isinstance(result, Exception)):
+        # keep using the old roster (and the old files in the preferences file)
+        printMessageToUser(rosterLoadFailedText)
+        if(isScreenBuilt("saveReport")):
+            lbl_database.config(text=f"{txt}\n{rosterLoadFailedText}")
+        return
+    # switch to the new roster files, roster, and search indexes all at once
+    databasePaths = rosterLoadingPaths
+    databaseName = getDatabaseNames(databasePaths)
+    txt = f"{databaseBeginningText}\n{databaseName}"
+    (database, databaseReportLines, databaseIDs, (nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames), changes) = result
     signinTime = datetime.now()
     signinTimeFormatted = signinTime.strftime("%I:%M %p")
     currentRecords.append(f"{reportChangeDatabase}{signinTimeFormatted}")
+    currentRecords.extend(databaseReportLines)
+    # write down who was added, removed, or changed in the report
+    currentRecords.extend(describeRosterChanges(changes))
+    fireEvent("admin", {"change": "roster", "time": signinTime.isoformat(), "files": list(databasePaths)})
     
-    print(txt)
+    logger.info("Roster files changed to %s (%d added, %d removed, %d changed)", databaseName, len(changes[0]), len(changes[1]), len(changes[2]))
     # UPDATE TO HAVE THE LIBRARIAN SCREEN UPDATE AS WELL
     # lbl_data.config(text=txt)
-    lbl_currData.config(text=txt)
-    lbl_errData.config(text=txt)
-    lbl_database.config(text=txt)
+    # (screens that haven't been built yet will show the new files when they are)
+    if(isScreenBuilt("initSetup")):
+        lbl_currData.config(text=txt)
+    if(isScreenBuilt("error")):
+        lbl_errData.config(text=txt)
+    if(isScreenBuilt("saveReport")):
+        lbl_database.config(text=txt)
     updateDatabaseInFile()
 
+def diffRosters(oldRoster, newRoster):
+    # This method finds the students added, removed, and changed (different name or grade) between two rosters.
+    # Both rosters are sorted by ID, so it walks through them side by side once, like merging two sorted lists.
+    # Returns the Lists of (added IDs, removed IDs, changed IDs).
+    # (either roster can be a pandas table or compact, see compactRoster).
+    # A memory-mapped roster's rows aren't read until they're looked up, so with one of those only the IDs are compared.
+    columns = ["Last Name", "First Name", "Grade"]
+    if(isMappedRoster(oldRoster) or isMappedRoster(newRoster)):
+        columns = []
+    (oldIDs, oldRows) = ([], []) if oldRoster is None else (getRosterColumn(oldRoster, "ID"), list(zip(*[getRosterColumn(oldRoster, "ID")] + [getRosterColumn(oldRoster, column) for column in columns])))
+    (newIDs, newRows) = ([], []) if newRoster is None else (getRosterColumn(newRoster, "ID"), list(zip(*[getRosterColumn(newRoster, "ID")] + [getRosterColumn(newRoster, column) for column in columns])))
+    added = []
+    removed = []
+    changed = []
+    i = 0
+    j = 0
+    while(i < len(oldIDs) and j < len(newIDs)):
+        if(oldIDs[i] == newIDs[j]):
+            if(oldRows[i] != newRows[j]):
+                changed.append(newIDs[j])
+            i += 1
+            j += 1
+        elif(oldIDs[i] < newIDs[j]):
+            # this ID is only in the old roster
+            removed.append(oldIDs[i])
+            i += 1
+        else:
+            # this ID is only in the new roster
+            added.append(newIDs[j])
+            j += 1
+    removed.extend(oldIDs[i:])
+    added.extend(newIDs[j:])
+    return (added, removed, changed)
+
+def describeRosterChanges(changes):
+    global reportRosterChangesText, rosterChangeReportLimit
+    # turn the roster changes (see diffRosters) into lines for the report, listing up to rosterChangeReportLimit IDs of each
+    (added, removed, changed) = changes
+    lines = [f"{reportRosterChangesText}{len(added)} added, {len(removed)} removed, {len(changed)} changed"]
+    for (label, studentIDs) in [("Added", added), ("Removed", removed), ("Changed", changed)]:
+        if(len(studentIDs) > 0):
+            idList = ", ".join([f"#{studentID}" for studentID in studentIDs[:rosterChangeReportLimit]])
+            if(len(studentIDs) > rosterChangeReportLimit):
+                idList += f", and {len(studentIDs) - rosterChangeReportLimit} more"
+            lines.append(f"    {label}: {idList}")
+    return lines
+
+def loadDatabases(filenames):
+    global databaseHeaderLine, databaseSortBy, reportDuplicateIDsText, duplicateIDReportLimit, mappedRosterMode
+    # open and combine all the roster files, and write up any rejected rows and any student ID
+    # that is in more than one file for the report.
+    # returns the combined roster and a List of lines to add to the report
+    if(mappedRosterMode and any([filename.endswith(".gz") for filename in filenames])):
+        logger.warning("Compressed roster files can't be memory-mapped, so the rosters are loaded normally")
+    if(mappedRosterMode and not any([filename.endswith(".gz") for filename in filenames])):
+        (combined, duplicates, reportLines) = openMappedRosters(filenames, databaseHeaderLine, databaseSortBy)
+    else:
+        (combined, duplicates, reportLines) = openDatabases(filenames, databaseHeaderLine, databaseSortBy)
+    if(len(duplicates) > 0):
+        duplicateList = "; ".join([f"#{studentID} ({getDatabaseNames(files)})" for (studentID, files) in duplicates[:duplicateIDReportLimit]])
+        if(len(duplicates) > duplicateIDReportLimit):
+            duplicateList += f"; and {len(duplicates) - duplicateIDReportLimit} more"
+        reportLines.append(f"{reportDuplicateIDsText}{duplicateList}")
+    for line in reportLines:
+        logger.warning("%s", line)
+    return (combined, reportLines)
+
 def updateDatabaseInFile():
-    global databasePath, preferencesFileName
+    global databasePaths, preferencesFileName
     with open(preferencesFileName, 'r') as file:
         # save the contents of the file into a List data structure
         data = file.readlines()
  
-    # update the file to include new directory. 
-    # If it is blank, save it with a space above it.
-    # Otherwise, just save it as normal.
-    if(len(data) < 3):
-        while(len(data) <= 3):
-            data.append("")
-        data.append(f'\n{databasePath}')
-    else:
-        data[2] = f'{databasePath}\n'
-    print(data)
+    # update the file to include the roster files, one per line after the password and directory lines.
+    # If the password or directory lines are missing, save them blank.
+    while(len(data) < 2):
+        data.append("\n")
+    if(not data[1].endswith("\n")):
+        data[1] = f"{data[1]}\n"
+    data = data[:2] + [f"{filename}\n" for filename in databasePaths]
+    logger.debug("Preferences file now lists: %s", data[1:])
     # write everything back to the file
     with open(preferencesFileName, 'w') as file:
         file.writelines( data )
@@ -315,7 +1474,7 @@ def updateDirectoryInFile():
         data.append(f'\n{saveDirectory}')
     else:
         data[1] = f'{saveDirectory}\n'
-    print(data)
+    logger.debug("Preferences file now lists: %s", data[1:])
     # write everything back to the file
     with open(preferencesFileName, 'w') as file:
         file.writelines( data )
@@ -332,18 +1491,24 @@ def changeSaveDirectory():
     signinTime = datetime.now()
     signinTimeFormatted = signinTime.strftime("%I:%M %p")
     currentRecords.append(f"{reportChangeSave}{signinTimeFormatted}")
-    print(txt)
-    lbl_dir.config(text=txt)
-    lbl_currDir.config(text=txt)
-    lbl_errDir.config(text=txt)
+    fireEvent("admin", {"change": "saveDirectory", "time": signinTime.isoformat(), "directory": str(saveDirectory)})
+    logger.info("Save directory changed to %s", saveDirectory)
+    if(isScreenBuilt("saveReport")):
+        lbl_dir.config(text=txt)
+    if(isScreenBuilt("initSetup")):
+        lbl_currDir.config(text=txt)
+    if(isScreenBuilt("error")):
+        lbl_errDir.config(text=txt)
     updateDirectoryInFile()
  
  # A simplified command for the initial setup screen to setup the password and directory in one button
 
 def updatePassAndDir():
-    updatePassword(False, ent_passInit1.get(), ent_passInit2.get())
+    passwordSaved = updatePassword(False, ent_passInit1.get(), ent_passInit2.get())
     updateDirectoryInFile()
-    printMessageToUser("Inital setup completed")
+    # (if the passwords didn't match, the setup screen stays up showing what's wrong)
+    if(passwordSaved):
+        printMessageToUser("Inital setup completed")
 
 def fixPassword():
     updatePassword(False, ent_passError1.get(), ent_passError2.get())
@@ -356,30 +1521,49 @@ def fixDatabase():
     updateDatabaseInFile()
     displaySignInScreen()
 
-def confirmYes():
-    global currentRecords, currentFName, currentLName, currentSID, currentGrade, signInSuccessfulText
+def recordSignin(studentID, fName, lName, grade):
+    global currentRecords, sharedLogEnabled, kioskName, syncEnabled
+    # This method records a confirmed sign-in, without touching the window.
     # get the datetime that the user confirmed their identity and format it to be the time only
     signinTime = datetime.now()
     signinTimeFormatted = signinTime.strftime("%I:%M %p")
     # print out the sign-in log text and append it to the records list
-    text = f"{currentFName} {currentLName} (ID #{currentSID}, Grade {currentGrade}) signed in at {signinTimeFormatted}."
-    print(text)
+    text = f"{fName} {lName} (ID #{studentID}, Grade {grade}) signed in at {signinTimeFormatted}."
+    logger.info("%s", text)
     currentRecords.append(text)
+    addToQueryIndex(signinTime, studentID, fName, lName, grade)
+    # in shared log mode, also queue it up to be added to the log shared by every kiosk
+    if(sharedLogEnabled):
+        addToSharedLog(signinTime, text)
+    signin = {"id": int(studentID), "firstName": fName, "lastName": lName, "grade": int(grade),
+        "time": signinTime.isoformat(), "kiosk": kioskName}
+    # hand it to the attendance server sync directly (not as a hook, since hook calls can be dropped when they pile up)
+    if(syncEnabled):
+        queueSigninForSync(signin)
+    # let anything else listening for sign-ins know, without waiting for them
+    fireEvent("signin", signin)
+
+def confirmYes():
+    global currentFName, currentLName, currentSID, currentGrade, signInSuccessfulText
+    recordSignin(currentSID, currentFName, currentLName, currentGrade)
     # reset all the data on the screen and replace the error reporting text with a confirmation message
     confirmNo()
     printMessageToUser(signInSuccessfulText)
  
 def confirmNo():
-    global currentFName, currentLName, currentSID, currentGrade
+    global currentFName, currentLName, currentSID, currentGrade, currentExtras
     # reset the variables tied to the signed-in user, reset the error message space on the sign-in screen, and return to the sign-in screen 
     currentFName = ""
     currentLName = ""
     currentSID = 0
     currentGrade = 0
+    currentExtras = []
     printMessageToUser("")
-    lbl_name.config(text="")
-    lbl_sID.config(text="")
-    lbl_grade.config(text="")
+    if(isScreenBuilt("confirm")):
+        lbl_name.config(text="")
+        lbl_sID.config(text="")
+        lbl_grade.config(text="")
+        lbl_extra.config(text="")
     ent_sID.delete(0, 'end')
     displaySignInScreen()
  
@@ -392,8 +1576,8 @@ def confirmLibPass():
     if(entPass == encPass):
         # print("Password is correct. Bringing up screen.")
         displayExportReportScreen()
-        # update the report display label with the current report
-        lbl_report.config(text=f"{reportPreviewHeadingText}\n{compileSigninList()}")
+        # show the current report in the preview box, starting from the top
+        showReportPreview(0)
         # clear out the important entry spaces and labels to ensure security
         clearEntriesAndPrints()
     else:
@@ -401,15 +1585,64 @@ def confirmLibPass():
         printMessageToPassword(incorrectPasswordText)
  
  
+def getReportPreviewLine(lineNumber):
+    global currentRecords, reportPreviewHeadingText
+    # the preview is the heading followed by every line of the current report
+    if(lineNumber == 0):
+        return reportPreviewHeadingText
+    return currentRecords[lineNumber - 1]
+
+def showReportPreview(topLine):
+    global currentRecords, reportPreviewLines, reportPreviewTop
+    # put only the lines of the report that fit in the preview box into it, starting at topLine.
+    # This takes the same time no matter how long the report is.
+    lineCount = len(currentRecords) + 1
+    reportPreviewTop = max(0, min(topLine, lineCount - reportPreviewLines))
+    visibleLines = [getReportPreviewLine(i) for i in range(reportPreviewTop, min(lineCount, reportPreviewTop + reportPreviewLines))]
+    txt_report.config(state="normal")
+    txt_report.delete("1.0", "end")
+    txt_report.insert("1.0", "\n".join(visibleLines))
+    txt_report.config(state="disabled")
+    updateReportScrollbar()
+
+def updateReportScrollbar(*args):
+    global currentRecords, reportPreviewLines, reportPreviewTop
+    # size and place the scrollbar handle for the whole report instead of the few lines in the box
+    lineCount = len(currentRecords) + 1
+    txt_report.vbar.set(reportPreviewTop / lineCount, min(1, (reportPreviewTop + reportPreviewLines) / lineCount))
+
+def scrollReportPreview(action, amount, unit=None):
+    global currentRecords, reportPreviewLines, reportPreviewTop
+    # called by the preview scrollbar, either to jump to a spot ("moveto", fraction of the report)
+    # or to move by lines or pages ("scroll", count, "units" or "pages")
+    if(action == "moveto"):
+        showReportPreview(int(float(amount) * (len(currentRecords) + 1)))
+    elif(unit == "pages"):
+        showReportPreview(reportPreviewTop + int(amount) * reportPreviewLines)
+    else:
+        showReportPreview(reportPreviewTop + int(amount))
+
+def scrollReportPreviewWheel(event):
+    global reportPreviewTop
+    # scroll the preview 3 lines per mouse wheel step (Windows/Mac use delta, Linux uses buttons 4 and 5)
+    if(event.num == 4 or event.delta > 0):
+        showReportPreview(reportPreviewTop - 3)
+    else:
+        showReportPreview(reportPreviewTop + 3)
+    # stop the text box from also scrolling the few lines inside it
+    return "break"
+
 def clearEntriesAndPrints():
-    # erase the contents of the important entry spaces to ensure security
-    ent_pass0.delete(0, 'end')
-    ent_pass1.delete(0, 'end')
-    ent_pass2.delete(0, 'end')
-    ent_libPass.delete(0, 'end')
-    ent_sID.delete(0, 'end')
     # erase all the error prints
     printMessageToUser("")
+    # erase the contents of the important entry spaces to ensure security
+    if(isScreenBuilt("passwdCreate")):
+        ent_pass0.delete(0, 'end')
+        ent_pass1.delete(0, 'end')
+        ent_pass2.delete(0, 'end')
+    if(isScreenBuilt("passwd")):
+        ent_libPass.delete(0, 'end')
+    ent_sID.delete(0, 'end')
     printMessageToPassword("")
     printMessageToPasswordCreate("")
  
@@ -431,6 +1664,8 @@ def compileSigninList():
  
 def saveFile(windowClosed=False):
     global saveDirectory, currentRecords, reportStartExportText, signInExportSuccessfulText, reportExportLibrarianText, reportExportShutdownText, defaultFileNameStart
+    global reportCompression, reportCompressionLevel, reportFileEndings, exportBackupDirectory, exportDestinations, exportTimeout, signInExportBackupOnlyText
+    global reportGroupBy, exportCheckDelay, signInExportSavingText
     
     # get the time of the export and format it
     exportTime = datetime.now()
@@ -449,219 +1684,1544 @@ def saveFile(windowClosed=False):
     
     if(saveName.endswith(".txt")):
         saveName = saveName[:-4]
-    # get the full file path and name using the save directory and name
-    completePathName = os.path.join(saveDirectory, f"{saveName}.txt")
+    # compressed reports end in .txt.gz or .txt.xz instead of .txt
+    extension = reportFileEndings[reportCompression]
+    # save the report on this computer first (the backup folder), so it's safe even if the save directory is down
+    os.makedirs(exportBackupDirectory, exist_ok=True)
+    localCopy = getUniqueFileName(exportBackupDirectory, saveName, extension)
+    logger.info("Saving report to %s", localCopy)
+    # print(f"Full Report: {fullReport}")
+    # create the file via open(), write to it one line at a time (compressing as it goes if turned on), and close.
+    with openReportForWriting(localCopy, reportCompression, reportCompressionLevel) as file:
+        for line in fullReport.splitlines(keepends=True):
+            file.write(line)
+    # then copy it to the save directory and any other destinations at the same time, on a background thread so the
+    # window doesn't wait for them (when the program is closing, it waits for them here instead).
+    # Destinations that don't finish in time are copied to later (see retryPendingExports).
+    destinations = [str(saveDirectory)] + [directory for directory in exportDestinations if directory != str(saveDirectory)]
+    exportArguments = (localCopy, destinations, saveName, extension, fullReport, list(currentRecords), f"{reason}{exportTimeFormatted}.", windowClosed, exportTime)
+    if(windowClosed):
+        finishExport(*exportArguments)
+        return
+    threading.Thread(target=finishExport, args=exportArguments, daemon=True).start()
+    root.after(exportCheckDelay, checkExportFinished)
+    # print("Report successfully exported. Clearing report from program and resetting...")
+    # reset the records list and set it to new values accordingly
+    currentRecords.clear()
+    currentRecords = [f"{reportStartExportText}{exportTimeFormatted}."]
+    # bring up the login screen and display a message to the user (checkExportFinished says how the copies went)
+    clearAndDisplayLogin()
+    printMessageToUser(signInExportSavingText)
+
+def finishExport(localCopy, destinations, saveName, extension, fullReport, records, exportLine, windowClosed, exportTime):
+    global exportTimeout, exportBackupDirectory, reportGroupBy, exportResults
+    # This method runs on its own thread (or while the program is closing). It copies a report that's already saved in the
+    # backup folder to every destination (the save directory first), along with its grouped reports if turned on,
+    # then hands back whether the save directory copy failed through exportResults.
+    savedFiles = {}
+    failedDestinations = list(destinations)
+    try:
+        (savedFiles, failedDestinations, unlistedFiles) = exportToDestinations(localCopy, destinations, saveName, extension, fullReport, exportTimeout)
+        for directory in failedDestinations:
+            addPendingExport(localCopy, directory, saveName, extension)
+        # (copies that were made but aren't in the manifest only need to be added to it)
+        for (directory, filename) in unlistedFiles.items():
+            addPendingExport(localCopy, directory, saveName, extension, filename)
+        # if reports are split up by grade, period, or hour, save those as a folder next to the full report the same way
+        if(reportGroupBy is not None):
+            groupFolder = saveGroupedReports(exportBackupDirectory, saveName, extension, records, exportLine, reportGroupBy)
+            groupFolderName = os.path.basename(groupFolder)
+            (savedGroupFolders, failedGroupDestinations, unlistedGroupFolders) = exportToDestinations(groupFolder, destinations, groupFolderName, "", None, exportTimeout)
+            for directory in failedGroupDestinations:
+                addPendingExport(groupFolder, directory, groupFolderName, "")
+        pruneExportBackups()
+    except Exception:
+        logger.exception("Couldn't finish saving the report %s", localCopy)
+    finally:
+        if(not windowClosed):
+            exportResults.put(destinations[0] in failedDestinations)
+    fireEvent("export", {"file": savedFiles.get(destinations[0], localCopy), "automatic": windowClosed, "records": len(records), "time": exportTime.isoformat()})
+
+def checkExportFinished():
+    global exportResults, exportCheckDelay, signInExportSuccessfulText, signInExportBackupOnlyText
+    # called every exportCheckDelay milliseconds by the window until the report has been copied (see finishExport)
+    try:
+        saveDirectoryFailed = exportResults.get_nowait()
+    except queue.Empty:
+        root.after(exportCheckDelay, checkExportFinished)
+        return
+    if(saveDirectoryFailed):
+        printMessageToUser(signInExportBackupOnlyText)
+    else:
+        printMessageToUser(signInExportSuccessfulText)
+ 
+def getUniqueFileName(directory, saveName, extension):
+    # get the full file path and name using the directory and name
+    completePathName = os.path.join(directory, f"{saveName}{extension}")
     # check if the starting file name is valid and not already taken
     nameValid = False
     offsetNumber = 0
     # loop until a valid file name is found
     while not nameValid:
-        # check if a file with the current file name exists
-        if(os.path.isfile(completePathName)):
+        # check if a file (or folder) with the current file name exists
+        if(os.path.exists(completePathName)):
             # add one to the offset number and set the file save name to have the offset number tailing the file name
             offsetNumber += 1
-            completePathName = os.path.join(saveDirectory, f"{saveName} ({offsetNumber}).txt")
+            completePathName = os.path.join(directory, f"{saveName} ({offsetNumber}){extension}")
         else:
             # the file with this name doesn't exist, so set the variable to true to end the loop
             nameValid = True
-    print(completePathName)
-    # print(f"Full Report: {fullReport}")
-    # create the file via open(), write to it, and close.
-    with open(completePathName, "w") as file:
-        file.write(fullReport)
-    # print("Report successfully exported. Clearing report from program and resetting...")
-    if(not windowClosed): 
-        # if the program hasn't shut down, reset the records list and set it to new values accordingly
-        currentRecords.clear()
-        currentRecords = [f"{reportStartExportText}{exportTimeFormatted}."]
-        # bring up the login screen and display a message to the user
-        clearAndDisplayLogin()
-        printMessageToUser(signInExportSuccessfulText)
- 
-#Define function to hide the widget
-def hide_widget(widget):
-   widget.grid_remove()
+    return completePathName
 
+def getReportGroup(grade, signinTimeText, groupBy):
+    global periodStartTimes
+    # This method returns which group a sign-in goes in, as (a number for putting the groups in order, the group's name).
+    if(groupBy == "grade"):
+        return (int(grade), f"Grade {grade}")
+    else:
+        signinTime = datetime.strptime(signinTimeText, "%I:%M %p")
+        if(groupBy == "hour"):
+            return (signinTime.hour, signinTime.strftime("%I %p"))
+        else:
+            # the period is the last one that started at or before the sign-in time
+            minutes = signinTime.hour * 60 + signinTime.minute
+            startMinutes = [int(start[:2]) * 60 + int(start[3:]) for (period, start) in periodStartTimes]
+            position = bisect_left(startMinutes, minutes + 1) - 1
+            return (position, f"Period {periodStartTimes[position][0]}" if position >= 0 else "Before School")
 
-# === GUI SETUP AND MAIN CODE SECTION === 
-if __name__ == "__main__":
-    # The variable declarations below is just setting up the fundamentals of the sign-in window. The variables above are simply for ease of locating.
-    # The window dimensions and padding (space  between screen elements) are measured in pixels.
-    windowWidth = 1440
-    windowHeight = 810
-    universalFont = "Arial"
-    
-    # these numbers represent the minimum and maximum amount of numbers to allow for an ID
-    minDigits = 4
-    maxDigits = 7
- 
-    # Easy place to access most the text used in the program
-    # Title strings
-    windowTitle = "Study Hall Sign-in"
-    confirmTitle = "Is this you?"
-    libPassText = "Enter Librarian Password to continue"
-    libPassCreateText = "Create a Librarian Password"
-    initSetupText = "Initial Setup Screen"
-    errorText = "An error occured"
-    exportTitleText = "Export Report"
- 
-    
-    signInInstructionText = "Type in your Student ID below to sign into Study Hall"
-    libPassCreateDescText = "This will be entered by the librarian\nto authorize the exporting of the sign-in report."
-    initSetupDescText = "Please have the librarian/operator set up the program."
-    errorDescDefaultText = "DEFAULT ERROR MESSAGE."
-    errorDescPasswordText = "The password could not be found.\nPlease recreate the password below."
-    errorDescSaveText = "The saving directory for reports has been moved or deleted.\nPlease relocate the directory or specify a new one below."
-    errorDescDatabaseText = "The Student Database file has been moved or deleted.\nPlease relocate the database or specify a new one below."
+def saveGroupedReports(directory, saveName, extension, records, exportLine, groupBy):
+    global reportCompression, reportCompressionLevel
+    # This method splits the report into one file per group ("grade", "period", or "hour") in a new folder,
+    # going through the records once and writing each sign-in straight to its group's file.
+    # Each group's file starts with the report's start line and ends with the export line.
+    # An index file lists every group with how many sign-ins it has, plus the other lines of the report
+    # (like roster changes). Returns the folder.
+    # Sign-in lines always end with "(ID #..., Grade ...) signed in at hh:mm AM.", so the grade and time are cut
+    # straight out of the end of the line (going through signinLinePattern for every line is most of the time this takes).
+    # The group for each grade or time is only worked out once, and lines are written to the files in batches.
+    folder = getUniqueFileName(directory, f"{saveName} by {groupBy}", "")
+    os.makedirs(folder)
+    files = {}
+    batches = {}
+    counts = {}
+    otherLines = []
+    groupCache = {}
+    startLine = records[0] if len(records) > 0 else ""
+    try:
+        for line in records[1:]:
+            gradeStart = line.rfind(", Grade ") + 8
+            if(line[-23:-9] != " signed in at " or gradeStart == 7 or not line[gradeStart:-24].isdigit()):
+                otherLines.append(line)
+                continue
+            cacheKey = line[gradeStart:-24] if groupBy == "grade" else line[-9:-1]
+            group = groupCache.get(cacheKey)
+            if(group is None):
+                group = groupCache[cacheKey] = getReportGroup(line[gradeStart:-24], line[-9:-1], groupBy)
+            batch = batches.get(group)
+            if(batch is None):
+                files[group] = openReportForWriting(os.path.join(folder, f"{saveName} - {group[1]}{extension}"), reportCompression, reportCompressionLevel)
+                files[group].write(f"{startLine}\n")
+                batch = batches[group] = []
+                counts[group] = 0
+            batch.append(line)
+            if(len(batch) >= 1000):
+                files[group].write("\n".join(batch) + "\n")
+                counts[group] += len(batch)
+                batch.clear()
+    finally:
+        for (group, file) in files.items():
+            if(len(batches[group]) > 0):
+                file.write("\n".join(batches[group]) + "\n")
+                counts[group] += len(batches[group])
+            file.write(exportLine)
+            file.close()
+    # write the index of the groups, in order
+    with open(os.path.join(folder, f"{saveName} - Index.txt"), "w") as file:
+        file.write(f"{startLine}\nSign-ins by {groupBy}:\n")
+        for group in sorted(counts):
+            file.write(f"    {group[1]}: {counts[group]} sign-in(s) ({saveName} - {group[1]}{extension})\n")
+        file.write(f"Total: {sum(counts.values())} sign-in(s)\n")
+        for line in otherLines:
+            file.write(f"{line}\n")
+        file.write(exportLine)
+    return folder
 
-    exportNoticeText = "Saving this file will restart the sign-in log"
- 
-    enterPassOldText = "Enter old password"
-    enterPassNewText = "Enter new password twice"
-    enterPassCreateText = "Create password (type it twice)"
-    saveDirectoryBeginningText = "Current saving directory:"
-    databaseBeginningText = "Current database file:"
-    currentFileNameLabelText = "Current file name: (type to change)"
-    directoryPopupText = "Select Folder to Save Report to"
-    databasePopupText = "Select Database File"
-    reportPreviewHeadingText = "Preview of Report:"
- 
-    signInExportSuccessfulText = "Sign in report successfully exported"
-    librarianPassUpdateText = "Librarian password updated successfully"
-    signInSuccessfulText = "Successfully signed in. Enjoy your time in study hall!"
-    oldPasswordBlankText = "Leave \"old password\" space blank"
- 
-    incorrectPasswordText = "Incorrect password"
-    oldPasswordIncorrectText = "Incorrect old password"
-    newPasswordIncorrectText = "New passwords do not match"
-    createPasswordIncorrectText = "Passwords do not match"
-    passwordTooShortText = "Password too short. It must be more than 4 characters."
-    invalidInputText = "Couldn't get an ID from that.\nRemove any letters and/or spaces and try again."
-    noStudentFoundText1 = "No student with ID #"
-    noStudentFoundText2 = " was found.\nCheck for typos or ask for assistance."
-    tooManyDigitsStartText = "Too many digits."
-    tooFewDigitsStartText = "Too few digits."
-    invalidDigitCountSharedText = f"Student ID's must be {minDigits}-{maxDigits} digits long."
- 
-    signInButtonText = "Sign in"
-    confirmYesButtonText = "Yes"
-    confirmNoButtonText = "No"
-    backButtonText = "Back"
-    finishSetupButtonText = "Complete Setup"
-    fixErrorButtonText = "Continue"
-    changePasswordButtonText = "Change Password"
-    librarianPasswordEnterButtonText = "Continue"
-    changeDirectoryText = "Change Directory"
-    changeDatabaseText = "Change Database File"
-    saveFileButtonText = "Save File"
-    updatePasswordButtonText = "Change"
-    exportReportButtonText = "Librarian Mode"
- 
-    reportStartExportText = "Report START from PREVIOUS REPORT EXPORT on "
-    reportStartProgramText = "Report START from PROGRAM START on "
-    reportExportStart = "Report exported "
-    reportExportManualText = "MANUALLY by librarian "
-    reportExportAutomaticText = "AUTOMATICALLY due to program shutdown "
-    reportChangePassword = "Password was UPDATED at "
-    reportChangeSave = "Report save location was UPDATED at "
-    reportChangeDatabase = "Student Database was UPDATED at "
+def benchmarkGroupedExport(recordCount):
+    global reportStartProgramText, reportExportStart, reportExportManualText, reportCompression, reportCompressionLevel, currentRecords
+    # This method times exporting a made-up day of recordCount sign-ins the way saveFile does (put the report together,
+    # save it, and copy it to the save directory with its manifest entry), then split up by each kind of group
+    # (save the folder and copy it), so the two can be compared.
+    generator = random.Random(1)
+    records = [f"{reportStartProgramText}10/19/26 at 07:30 AM."]
+    for i in range(recordCount):
+        minutes = 7 * 60 + 30 + i * 540 // recordCount
+        records.append(f"Student Number{i} (ID #{10000 + i}, Grade {generator.randint(6, 12)}) signed in at {datetime(2000, 1, 1, minutes // 60, minutes % 60).strftime('%I:%M %p')}.")
+    exportLine = f"{reportExportStart}{reportExportManualText}on 10/19/26 at 04:30 PM."
+    # (this only runs as a command line tool, so the records it makes up can just replace the current ones)
+    currentRecords = records
+    testFolder = tempfile.mkdtemp()
+    os.makedirs(os.path.join(testFolder, "copies"))
+    try:
+        startTime = time.perf_counter()
+        fullReport = f"{compileSigninList()}\n{exportLine}"
+        with openReportForWriting(os.path.join(testFolder, "Report.txt"), reportCompression, reportCompressionLevel) as file:
+            for line in fullReport.splitlines(keepends=True):
+                file.write(line)
+        copyReportTo(os.path.join(testFolder, "Report.txt"), os.path.join(testFolder, "copies"), "Report", ".txt", fullReport, {})
+        fullTime = time.perf_counter() - startTime
+        print(f"{'full export':<14}{fullTime * 1000:>10.1f} ms")
+        for groupBy in ("grade", "period", "hour"):
+            startTime = time.perf_counter()
+            folder = saveGroupedReports(testFolder, "Report", ".txt", records, exportLine, groupBy)
+            copyReportTo(folder, os.path.join(testFolder, "copies"), os.path.basename(folder), "", None, {})
+            groupTime = time.perf_counter() - startTime
+            print(f"{'by ' + groupBy:<14}{groupTime * 1000:>10.1f} ms  ({len(os.listdir(folder)) - 1} groups, {groupTime / fullTime:.2f}x the full export)")
+    finally:
+        shutil.rmtree(testFolder, ignore_errors=True)
 
-    
-    defaultFileNameStart = "SH Signin Report "
-    initalSetup = False
- 
-    # set up various font configurations
-    titleFont = (universalFont, 50, "bold")
-    largeFont = (universalFont, 35)
-    dataFont = (universalFont, 25, "bold")
-    entryFont = (universalFont, 25)
-    smallFont = (universalFont, 20)
-    smallBoldFont = (universalFont, 20, "bold")
+def copyReportTo(localCopy, directory, saveName, extension, reportText, result):
+    # This method runs on its own thread. It copies the saved report into another folder (under a name not already taken)
+    # and adds it to that folder's manifest. The copy is made under a temporary name first,
+    # so a copy that's cut off partway is never mistaken for a report.
+    # A folder of grouped reports (see saveGroupedReports) is copied the same way, but isn't added to the manifest.
+    try:
+        # copytree would make a missing folder (like an unplugged USB drive) on this computer, so that counts as failing
+        if(not os.path.isdir(directory)):
+            raise FileNotFoundError(f"The folder {directory} isn't there")
+        completePathName = getUniqueFileName(directory, saveName, extension)
+        if(os.path.isdir(localCopy)):
+            shutil.copytree(localCopy, f"{completePathName}.part")
+        else:
+            shutil.copyfile(localCopy, f"{completePathName}.part")
+        os.replace(f"{completePathName}.part", completePathName)
+        # the copy is made now, even if adding it to the manifest fails (then there's a "file" and an "error")
+        result["file"] = completePathName
+        if(reportText is not None):
+            appendToManifest(directory, makeManifestEntry(completePathName, reportText))
+    except OSError as error:
+        result["error"] = error
 
- 
-    # variables used for files
-    preferencesFileName = "preferences.ini"
-    if(os.path.isfile(preferencesFileName)):
-        (encPass, saveDirectory, databasePath) = openPreferences(preferencesFileName)
-        encPass = encPass.strip()
-        saveDirectory = saveDirectory.strip()
-        databasePath = databasePath.strip()
-        databaseName = databasePath[ databasePath.rfind("/")+1 :]
-        initialSetup = False
-        
-        noPass = False
-        noSave = False
-        noData = False
-        if(encPass is ""):
-            noPass = True
-        if(not os.path.isdir(saveDirectory)):
-            noSave = True
-        if(not os.path.isfile(databasePath)):
-            noData = True
+def exportToDestinations(localCopy, directories, saveName, extension, reportText, timeout):
+    global exportsInProgress, pendingExportsLock
+    # This method copies the report to every folder at the same time, one thread each, and waits up to timeout seconds
+    # for all of them (so it takes as long as the slowest folder that works, not all of them added up).
+    # The threads don't keep the program open, so a folder that hangs can't stop it from closing.
+    # A copy that doesn't finish in time keeps going, so it's remembered in exportsInProgress and the retry checks on it
+    # instead of making a second copy.
+    # Returns a Dictionary of the copies made by folder, a List of the folders that failed or didn't finish in time,
+    # and a Dictionary by folder of the copies that were made but couldn't be added to the manifest.
+    copies = []
+    for directory in directories:
+        result = {}
+        thread = threading.Thread(target=copyReportTo, args=(localCopy, directory, saveName, extension, reportText, result), daemon=True)
+        thread.start()
+        copies.append((directory, thread, result))
+    deadline = time.monotonic() + timeout
+    savedFiles = {}
+    failedDestinations = []
+    unlistedFiles = {}
+    for (directory, thread, result) in copies:
+        thread.join(max(0, deadline - time.monotonic()))
+        if("file" in result):
+            savedFiles[directory] = result["file"]
+            if("error" in result):
+                unlistedFiles[directory] = result["file"]
+                logger.warning("Saved the report to %s but couldn't add it to the manifest (%s), will try again later", directory, result["error"])
+        else:
+            if(thread.is_alive()):
+                with pendingExportsLock:
+                    exportsInProgress[(localCopy, directory)] = (thread, result)
+            failedDestinations.append(directory)
+            logger.warning("Couldn't save the report to %s (%s), will try again later", directory, result.get("error", "timed out"))
+    return (savedFiles, failedDestinations, unlistedFiles)
 
-    else:
-        (encPass, saveDirectory, databasePath) = openPreferences(preferencesFileName)
-        encPass = None
-        saveDirectory = None
-        databasePath = None
-        databaseName = None
-        initialSetup = True
-        noPass = False
-        noSave = False
-        noData = False
+def addPendingExport(localCopy, directory, saveName, extension, copiedFile=None):
+    global pendingExports, pendingExportsLock
+    # remember a copy that still has to be made, in a file next to the backups so it's remembered after a restart.
+    # copiedFile is the copy if it was made but still has to be added to the manifest.
+    with pendingExportsLock:
+        pendingExports.append({"localCopy": localCopy, "directory": directory, "saveName": saveName, "extension": extension, "copied": copiedFile})
+        savePendingExports()
 
-    # print(noPass, noSave, noData)
+def pruneExportBackups():
+    global exportBackupDirectory, exportBackupKeep, pendingExports, pendingExportsLock, pendingExportsFileName
+    # keep only the newest exportBackupKeep reports (and grouped report folders) in the backup folder,
+    # but never one that still has to be copied somewhere
+    with pendingExportsLock:
+        stillNeeded = set([job["localCopy"] for job in pendingExports])
+    try:
+        backups = [entry for entry in os.scandir(exportBackupDirectory)
+            if entry.name != pendingExportsFileName and not entry.name.endswith(".part") and entry.path not in stillNeeded]
+        backups.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in backups[exportBackupKeep:]:
+            if(entry.is_dir()):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+            logger.debug("Removed the old backup %s", entry.path)
+    except OSError as error:
+        logger.warning("Couldn't clean up the backup folder %s: %s", exportBackupDirectory, error)
 
-    # print(encPass, saveDirectory, databasePath)
-    databaseHeaderLine = 0
-    databaseSortBy = "ID"
- 
-    # visual padding standard
-    pad = 15
-    
-    # get data from all the files needed (student database and preferences file)
-    if(databasePath is not "" and not noData and not initialSetup ):
-        database = openDatabase(databasePath, databaseHeaderLine, databaseSortBy)
+def savePendingExports():
+    global pendingExports, exportBackupDirectory, pendingExportsFileName
+    # write the list of copies still to be made (call while holding pendingExportsLock)
+    with open(os.path.join(exportBackupDirectory, pendingExportsFileName), "w") as file:
+        json.dump(pendingExports, file)
+
+def loadPendingExports():
+    global exportBackupDirectory, pendingExportsFileName
+    # read the list of copies still to be made from the last time the program ran
+    filename = os.path.join(exportBackupDirectory, pendingExportsFileName)
+    if(not os.path.isfile(filename)):
+        return []
+    try:
+        with open(filename, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError) as error:
+        # a damaged list shouldn't stop the kiosk from starting (the reports are still in the backup folder)
+        logger.warning("Couldn't read the list of reports still to be copied %s: %s", filename, error)
+        return []
+
+def retryPendingExports():
+    global pendingExports, pendingExportsLock, exportTimeout, exportRetryLock
+    # This method runs on its own thread. It tries again to copy saved reports to the folders that failed before.
+    # If the last try is still going (e.g. a folder is hanging), don't start another one.
+    if(not exportRetryLock.acquire(blocking=False)):
+        return
+    try:
+        retryPendingExportJobs()
+    finally:
+        exportRetryLock.release()
+
+def retryPendingExportJobs():
+    global pendingExports, pendingExportsLock, exportTimeout, exportsInProgress
+    # try each copy that still has to be made once
+    with pendingExportsLock:
+        waiting = list(pendingExports)
+    for job in waiting:
+        # if the last copy timed out, it may still be going (check again next time) or may have finished after all
+        with pendingExportsLock:
+            lastCopy = exportsInProgress.get((job["localCopy"], job["directory"]))
+            if(lastCopy is not None and not lastCopy[0].is_alive()):
+                del exportsInProgress[(job["localCopy"], job["directory"])]
+        if(lastCopy is not None and lastCopy[0].is_alive()):
+            continue
+        finished = False
+        copiedFile = job.get("copied")
+        if(lastCopy is not None and "file" in lastCopy[1]):
+            # the copy got made after all (and added to the manifest, unless that's what failed)
+            copiedFile = lastCopy[1]["file"]
+            finished = "error" not in lastCopy[1]
+        if(finished or not os.path.exists(job["localCopy"])):
+            finished = True
+        elif(copiedFile is not None):
+            # the copy is already there, it only has to be added to the manifest
+            try:
+                appendToManifest(job["directory"], makeManifestEntry(copiedFile, readReportText(job["localCopy"])))
+                finished = True
+            except OSError as error:
+                logger.warning("Couldn't add %s to the manifest (%s), will try again later", copiedFile, error)
+        else:
+            reportText = readReportText(job["localCopy"]) if os.path.isfile(job["localCopy"]) else None
+            (savedFiles, failedDestinations, unlistedFiles) = exportToDestinations(job["localCopy"], [job["directory"]], job["saveName"], job["extension"], reportText, exportTimeout)
+            copiedFile = unlistedFiles.get(job["directory"])
+            finished = len(failedDestinations) == 0 and copiedFile is None
+        if(finished):
+            logger.info("Saved the report %s to %s", os.path.basename(job["localCopy"]), job["directory"])
+            with pendingExportsLock:
+                pendingExports.remove(job)
+                savePendingExports()
+        elif(copiedFile is not None and job.get("copied") != copiedFile):
+            # remember the copy was made, so next time only the manifest is tried again
+            with pendingExportsLock:
+                job["copied"] = copiedFile
+                savePendingExports()
+
+def scheduleExportRetries():
+    global pendingExports, exportRetryDelay
+    # every exportRetryDelay milliseconds, try again to copy any reports that couldn't be saved everywhere
+    if(len(pendingExports) > 0):
+        threading.Thread(target=retryPendingExports, daemon=True).start()
+    root.after(exportRetryDelay, scheduleExportRetries)
+
+# the sign-in lines in a report look like "First Last (ID #8085, Grade 9) signed in at 08:05 AM."
+signinLinePattern = re.compile(r"^(?P<name>.+) \(ID #(?P<id>\d+), Grade (?P<grade>\d+)\) signed in at (?P<time>\d{1,2}:\d\d [AP]M)\.$")
+# the start and export lines end with a date and time like "03/14/23 at 08:01 AM."
+reportDatePattern = re.compile(r"(?P<date>\d\d/\d\d/\d\d) at (?P<time>\d{1,2}:\d\d [AP]M)\.$")
+
+def lockFile(file, wait):
+    # lock an open file so no other kiosk can write to it at the same time.
+    # If wait is False and another kiosk has the lock, give up right away and return False.
+    try:
+        if(os.name == "nt"):
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if wait else msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.lockf(file.fileno(), fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def unlockFile(file):
+    # let other kiosks write to the file again
+    if(os.name == "nt"):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
     else:
-        database = None
-  
-    print(database)
- 
-    # if there's nothing recorded for the save directory, set it to the user's Desktop by default
-    if(saveDirectory == ""):
-        #set default to desktop
-        # saveDirectory = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
-        saveDirectory = pathlib.Path.home()
-        updateDirectoryInFile()
- 
-    # initialize the sign-in record list with a report timestamp
-    bootupDateTime = datetime.now()
-    bootupDateTimeFormatted = bootupDateTime.strftime("%m/%d/%y at %I:%M %p")
-    initRecordText = f"{reportStartProgramText}{bootupDateTimeFormatted}."
-    # print(initRecordText)
-    currentRecords = [initRecordText]
- 
-    # reformat the program startup time to be shorter and used for the default report file name 
-    bootupTimeFormat2 = bootupDateTime.strftime("%m-%d ")
-    saveFileName = f"{defaultFileNameStart}{bootupTimeFormat2}Period _"
- 
-    # variables used for displaying the name of the user signing in
-    currentFName = ""
-    currentLName = ""
-    currentSID = 0
-    currentGrade = 0
-    
+        fcntl.lockf(file.fileno(), fcntl.LOCK_UN)
 
+def getSharedLogPath(day):
+    global saveDirectory, sharedLogFileNameStart
+    # every kiosk writes the sign-ins for a day to the same file in the (shared) save directory
+    return os.path.join(saveDirectory, f"{sharedLogFileNameStart}{day.strftime('%m-%d-%y')}.txt")
 
-    # INITIALIZE THE WINDOW
-    root = tk.Tk()
-    root.wm_geometry(f"{windowWidth}x{windowHeight}")
-    root.title(windowTitle)
-    root.columnconfigure(2, weight=10)
-    
-    #### THE SIGN IN SCREEN                                 ####
-    #### PROGRAM NORMALLY BEGINS ON THIS SCREEN             ####
-    #### ENTER STUDENT ID OR HIT THE EXPORT REPORT BUTTON   ####
+def readLastSharedLogLine(file, pattern):
+    # return the match for the last line of the shared log (only the end of the file is read), or None if it's empty
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(max(0, size - 4096))
+    # the cut can land in the middle of a line (or of a letter like é), so that first piece of a line is dropped
+    lines = file.read().decode("utf-8", errors="replace").splitlines()
+    if(size > 4096):
+        lines = lines[1:]
+    for line in reversed(lines):
+        match = pattern.match(line)
+        if(match):
+            return match
+    return None
+
+def findLastKioskNumber(path, kiosk):
+    # return the last sign-in number this kiosk used in the shared log (0 if none), so a restarted kiosk keeps counting up
+    global sharedLogLinePattern
+    lastNumber = 0
+    if(os.path.isfile(path)):
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                match = sharedLogLinePattern.match(line)
+                if(match and match.group(2) == kiosk):
+                    lastNumber = int(match.group(3))
+    return lastNumber
+
+def addToSharedLog(signinTime, text):
+    global sharedLogBuffer, kioskName, kioskNumber
+    # number the sign-in for this kiosk and keep it in memory until the next flush (see flushSharedLog).
+    # Adding to the buffer never waits on the shared file, so signing in is never slowed down by the other kiosks.
+    kioskNumber += 1
+    sharedLogBuffer.append((signinTime, kioskNumber, text))
+
+def flushSharedLog(wait=False):
+    global sharedLogBuffer, kioskName, sharedLogLinePattern
+    # This method writes the sign-ins waiting in this kiosk's buffer to the end of the shared log.
+    # Each line gets the next number in the whole log (the order every kiosk agrees on) and this kiosk's own number.
+    # If another kiosk is writing right now (and wait is False) nothing is written, and it's tried again next time.
+    # Returns True if the buffer was emptied.
+    if(len(sharedLogBuffer) == 0):
+        return True
+    path = getSharedLogPath(sharedLogBuffer[0][0])
+    with open(path, "a+b") as file:
+        if(not lockFile(file, wait)):
+            logger.debug("Shared log %s is busy, will try again", path)
+            return False
+        try:
+            lastLine = readLastSharedLogLine(file, sharedLogLinePattern)
+            logNumber = int(lastLine.group(1)) if lastLine else 0
+            lines = []
+            # only write the sign-ins from the same day as the first one, the rest go in the next day's file
+            while(len(sharedLogBuffer) > 0 and getSharedLogPath(sharedLogBuffer[0][0]) == path):
+                (signinTime, number, text) = sharedLogBuffer.popleft()
+                logNumber += 1
+                lines.append((signinTime, number, text, f"#{logNumber} [{kioskName} #{number}] {text}\n"))
+            try:
+                file.write("".join([line[3] for line in lines]).encode("utf-8"))
+                file.flush()
+                os.fsync(file.fileno())
+            except OSError:
+                # couldn't write (e.g. the network drive dropped), so put them back to try again later
+                sharedLogBuffer.extendleft([line[:3] for line in reversed(lines)])
+                logger.warning("Couldn't write to the shared log %s, will try again", path)
+                return False
+        finally:
+            unlockFile(file)
+    logger.debug("Added %d sign-in(s) to the shared log %s", len(lines), path)
+    return len(sharedLogBuffer) == 0
+
+def runSharedLogFlush(wait=False):
+    global sharedLogFlushLock
+    # This method runs on its own thread (except when closing), so a slow or unreachable shared folder never freezes the window.
+    # If the last flush is still going, don't start another one. Returns True if the buffer was emptied.
+    if(not sharedLogFlushLock.acquire(blocking=wait, timeout=30 if wait else -1)):
+        return False
+    try:
+        return flushSharedLog(wait)
+    except OSError as error:
+        logger.warning("Couldn't open the shared log: %s", error)
+    except Exception:
+        # anything else is logged too, so the next flush still gets scheduled
+        logger.exception("Couldn't write to the shared log")
+    finally:
+        sharedLogFlushLock.release()
+    return False
+
+def scheduleSharedLogFlush():
+    global sharedLogFlushDelay, sharedLogBuffer
+    # write this kiosk's sign-ins to the shared log every sharedLogFlushDelay milliseconds (on a background thread)
+    if(len(sharedLogBuffer) > 0):
+        threading.Thread(target=runSharedLogFlush, daemon=True).start()
+    root.after(sharedLogFlushDelay, scheduleSharedLogFlush)
+
+def addHook(eventName, callback, timeout=None):
+    global eventHooks, hookDefaultTimeout, hookLock
+    # This method signs up a method to be called every time something happens in the program.
+    # eventName is one of the eventHooks names ("signin", "signout", "export", or "admin").
+    # The method is called as callback(eventName, details) on a background thread, where details is a Dictionary about the event.
+    # If it takes longer than timeout seconds it's reported, and after hookMaxTimeouts slow calls it's turned off.
+    with hookLock:
+        eventHooks[eventName].append({"callback": callback, "timeout": timeout or hookDefaultTimeout, "timeouts": 0})
+
+def fireEvent(eventName, details):
+    global eventHooks, hookPool, hookQueueLimit, hookPending, hookLock
+    # This method hands an event to every method signed up for it (see addHook) and returns right away.
+    # The hooks run on a small pool of threads. If too many are already waiting (hookQueueLimit), the event is dropped
+    # (and logged) instead of waiting, so a slow hook can never slow down signing in.
+    with hookLock:
+        hooks = list(eventHooks[eventName])
+        if(hookPending + len(hooks) > hookQueueLimit):
+            logger.warning("Dropped the %s event, %d hook call(s) are already waiting", eventName, hookPending)
+            return
+        hookPending += len(hooks)
+    for hook in hooks:
+        hookPool.put((eventName, hook, details))
+
+def startHookWorkers(count):
+    # start the background threads that run the hooks. They're daemon threads, so a hook that never
+    # finishes can't keep the program from closing (see waitForHooks).
+    for number in range(count):
+        threading.Thread(target=runHookWorker, daemon=True).start()
+
+def runHookWorker():
+    global hookPool
+    # take hook calls off the queue and run them, one at a time.
+    # If a call took so long that another thread was started to take over (see hookTimedOut), this thread stops after it.
+    while(True):
+        eventName, hook, details = hookPool.get()
+        if(runHook(eventName, hook, details)):
+            return
+
+def waitForHooks(timeout):
+    global hookPending, hookLock
+    # wait up to timeout seconds for the hook calls still waiting or running to finish. Returns True if they all did.
+    deadline = time.monotonic() + timeout
+    while(time.monotonic() < deadline):
+        with hookLock:
+            if(hookPending == 0):
+                return True
+        time.sleep(0.05)
+    with hookLock:
+        if(hookPending > 0):
+            logger.warning("Closing with %d hook call(s) still waiting or running", hookPending)
+        return hookPending == 0
+
+def runHook(eventName, hook, details):
+    global hookPending, hookLock
+    # call one hook (on a pool thread), watching how long it takes. Returns True if this thread was replaced while it ran.
+    finished = threading.Event()
+    replaced = threading.Event()
+    timer = threading.Timer(hook["timeout"], hookTimedOut, args=(eventName, hook, finished, replaced))
+    timer.daemon = True
+    timer.start()
+    try:
+        hook["callback"](eventName, details)
+    except Exception:
+        logger.exception("The %s hook %s failed", eventName, getattr(hook["callback"], "__name__", hook["callback"]))
+    finally:
+        finished.set()
+        timer.cancel()
+        with hookLock:
+            hookPending -= 1
+    return replaced.is_set()
+
+def hookTimedOut(eventName, hook, finished, replaced):
+    global eventHooks, hookMaxTimeouts, hookLock
+    # called when a hook is still running after its timeout. Threads can't be stopped from the outside,
+    # so the hook keeps its thread until it finishes, but a new thread is started to run the other hooks in the meantime,
+    # and after hookMaxTimeouts slow calls it isn't called anymore.
+    if(finished.is_set()):
+        return
+    replaced.set()
+    startHookWorkers(1)
+    name = getattr(hook["callback"], "__name__", hook["callback"])
+    with hookLock:
+        hook["timeouts"] += 1
+        if(hook["timeouts"] >= hookMaxTimeouts and hook in eventHooks[eventName]):
+            eventHooks[eventName].remove(hook)
+            logger.error("The %s hook %s was too slow %d times and was turned off", eventName, name, hook["timeouts"])
+            return
+    logger.warning("The %s hook %s is taking longer than %.1f s", eventName, name, hook["timeout"])
+
+def openSyncQueue(filename):
+    # open (or create) the file that keeps the sign-ins that haven't been sent to the attendance server yet.
+    # They stay in it until the server says it got them, so nothing is lost if the kiosk is offline or restarted.
+    connection = sqlite3.connect(filename)
+    connection.execute("CREATE TABLE IF NOT EXISTS outbox (number INTEGER PRIMARY KEY, key TEXT UNIQUE, record TEXT, queuedAt REAL, attempts INTEGER DEFAULT 0)")
+    connection.commit()
+    return connection
+
+def queueSigninForSync(signin):
+    global syncInbox
+    # hand a sign-in to the sync thread (called by recordSignin). This never waits on the queue file or the network.
+    # The key is unique to this sign-in, so the server can tell if it gets the same one twice (e.g. after a retry).
+    syncInbox.put({"key": f"{signin['kiosk']}-{uuid.uuid4().hex}", **signin})
+
+def addInboxToSyncQueue(connection, records=None):
+    global syncInbox
+    # move every sign-in handed over by the window (after any records already taken out of it) into the queue file, in one write
+    records = [] if records is None else records
+    while(True):
+        try:
+            records.append(syncInbox.get_nowait())
+        except queue.Empty:
+            break
+    if(len(records) > 0):
+        now = time.time()
+        connection.executemany("INSERT OR IGNORE INTO outbox (key, record, queuedAt) VALUES (?, ?, ?)", [(record["key"], json.dumps(record), now) for record in records])
+        connection.commit()
+    return len(records)
+
+def waitAndSaveInbox(connection, delay):
+    global syncInbox, syncStopEvent
+    # This method waits delay seconds (or until the program closes) between sends, but saves each sign-in handed over
+    # by the window into the queue file as soon as it comes in, so none are only in memory during a long wait.
+    deadline = time.monotonic() + delay
+    while(not syncStopEvent.is_set()):
+        remaining = deadline - time.monotonic()
+        if(remaining <= 0):
+            return
+        # (only wait a little at a time so closing the program isn't held up)
+        try:
+            record = syncInbox.get(timeout=min(remaining, 0.5))
+        except queue.Empty:
+            continue
+        addInboxToSyncQueue(connection, [record])
+
+def sendOverHTTP(records):
+    global syncServerURL, syncTimeout
+    # the default way to send sign-ins: POST them as JSON to the attendance server.
+    # Any error (no network, timeout, or a bad response) raises, and the sign-ins are sent again later.
+    request = urllib.request.Request(syncServerURL, data=json.dumps({"records": records}).encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=syncTimeout) as response:
+        if(response.status != 200):
+            raise OSError(f"attendance server answered {response.status}")
+
+def getSyncMetrics(connection):
+    # how many sign-ins are waiting to be sent, and how long the oldest one has waited (in seconds)
+    (depth, oldest) = connection.execute("SELECT COUNT(*), MIN(queuedAt) FROM outbox").fetchone()
+    return {"queued": depth, "oldestWait": (time.time() - oldest) if oldest else 0}
+
+def runSyncWorker():
+    global syncQueueFileName, syncBatchSize, syncTransport, syncRetryBaseDelay, syncRetryMaxDelay, syncPollDelay, syncStopEvent, syncMetrics
+    # This method runs in its own thread for as long as the program is open.
+    # It saves the sign-ins from the window into the queue file (right away, even while waiting to retry),
+    # then sends them to the attendance server in batches.
+    # Sign-ins are only removed from the file once they were sent. If sending fails, it waits twice as long
+    # as last time before trying again (up to syncRetryMaxDelay seconds, plus a little randomness so the kiosks don't all retry at once).
+    connection = openSyncQueue(syncQueueFileName)
+    failures = 0
+    while(not syncStopEvent.is_set()):
+        addInboxToSyncQueue(connection)
+        rows = connection.execute("SELECT number, record FROM outbox ORDER BY number LIMIT ?", (syncBatchSize,)).fetchall()
+        if(len(rows) == 0):
+            waitAndSaveInbox(connection, syncPollDelay)
+            continue
+        records = [json.loads(record) for (number, record) in rows]
+        try:
+            syncTransport(records)
+        except Exception as error:
+            failures += 1
+            connection.execute(f"UPDATE outbox SET attempts = attempts + 1 WHERE number IN ({','.join(['?'] * len(rows))})", [number for (number, record) in rows])
+            connection.commit()
+            delay = min(syncRetryMaxDelay, syncRetryBaseDelay * 2 ** (failures - 1)) * random.uniform(0.8, 1.2)
+            syncMetrics.update(getSyncMetrics(connection))
+            logger.warning("Couldn't send %d sign-in(s) to the attendance server (%s), trying again in %.1f s (%d waiting)", len(records), error, delay, syncMetrics["queued"])
+            waitAndSaveInbox(connection, delay)
+            continue
+        failures = 0
+        connection.execute(f"DELETE FROM outbox WHERE number IN ({','.join(['?'] * len(rows))})", [number for (number, record) in rows])
+        connection.commit()
+        # how long the newest sign-in in the batch took from the student signing in to the server having it
+        syncMetrics["lag"] = (datetime.now() - datetime.fromisoformat(records[-1]["time"])).total_seconds()
+        syncMetrics["sent"] = syncMetrics.get("sent", 0) + len(records)
+        syncMetrics.update(getSyncMetrics(connection))
+        logger.debug("Sent %d sign-in(s) to the attendance server (lag %.1f s, %d still waiting)", len(records), syncMetrics["lag"], syncMetrics["queued"])
+    # the window closed, so save anything it handed over at the last second
+    addInboxToSyncQueue(connection)
+    connection.close()
+
+def runSyncTestServer(port, directory):
+    global syncTestServerFileName
+    # This method runs a small stand-in for the attendance server on this computer, for testing the sync.
+    # It saves every sign-in it gets to a file, skipping any it already has (by key).
+    savedFile = os.path.join(directory, syncTestServerFileName)
+    seenKeys = set()
+    if(os.path.isfile(savedFile)):
+        with open(savedFile, "r") as file:
+            seenKeys = {json.loads(line)["key"] for line in file if line.strip() != ""}
+    lock = threading.Lock()
+
+    class SigninHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            records = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["records"]
+            with lock:
+                newRecords = [record for record in records if record["key"] not in seenKeys]
+                with open(savedFile, "a") as file:
+                    for record in newRecords:
+                        seenKeys.add(record["key"])
+                        file.write(f"{json.dumps(record)}\n")
+            answer = json.dumps({"accepted": len(newRecords), "duplicates": len(records) - len(newRecords)}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(answer)))
+            self.end_headers()
+            self.wfile.write(answer)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), SigninHandler)
+    logger.info("Test attendance server listening on http://127.0.0.1:%d/ and saving to %s", port, savedFile)
+    server.serve_forever()
+
+def addToQueryIndex(signinTime, studentID, fName, lName, grade):
+    global queryIndexLock, queryIndexDay, querySignins, querySigninTimes, queryLastSignin
+    # This method adds a sign-in to the indexes the query server answers from (see answerQuery),
+    # so a question never has to read through currentRecords. The indexes start over each day.
+    # querySignins is every sign-in today in order, querySigninTimes their times (for bisect),
+    # and queryLastSignin is {Student ID: position of their latest sign-in in querySignins}.
+    with queryIndexLock:
+        if(queryIndexDay != signinTime.date()):
+            queryIndexDay = signinTime.date()
+            querySignins = []
+            querySigninTimes = []
+            queryLastSignin = {}
+        queryLastSignin[int(studentID)] = len(querySignins)
+        querySigninTimes.append(signinTime.timestamp())
+        querySignins.append({"id": int(studentID), "firstName": fName, "lastName": lName, "grade": int(grade),
+            "time": signinTime.isoformat(timespec="seconds")})
+
+def parseQueryTime(text, now):
+    # turn the time in a query ("10:30", "10:30 AM", or a full date and time like "2026-10-19T10:30") into a datetime
+    for timeFormat in ("%H:%M", "%I:%M %p"):
+        try:
+            return datetime.combine(now.date(), datetime.strptime(text, timeFormat).time())
+        except ValueError:
+            pass
+    return datetime.fromisoformat(text)
+
+def answerQuery(target):
+    global queryIndexLock, queryIndexDay, querySignins, querySigninTimes, queryLastSignin, queryOccupantMinutes, querySigninsLimit
+    # This method answers one query to the query server, e.g. "/signed-in?id=12345".
+    # It returns (HTTP status number, answer to send back as JSON).
+    request = urllib.parse.urlsplit(target)
+    arguments = {name: values[-1] for (name, values) in urllib.parse.parse_qs(request.query).items()}
+    now = datetime.now()
+    with queryIndexLock:
+        # yesterday's sign-ins don't count (the indexes start over at the first sign-in of the day)
+        (signins, signinTimes, lastSignin) = (querySignins, querySigninTimes, queryLastSignin) if queryIndexDay == now.date() else ([], [], {})
+        if(request.path == "/signed-in"):
+            if(not arguments.get("id", "").isdigit()):
+                return (400, {"error": "Give the Student ID to look up, e.g. /signed-in?id=12345"})
+            position = lastSignin.get(int(arguments["id"]))
+            return (200, {"id": int(arguments["id"]), "signedIn": position is not None,
+                "lastSignin": signins[position]["time"] if position is not None else None})
+        if(request.path == "/occupants"):
+            # there's no signing out, so the students in the library are the ones who signed in recently
+            since = now.timestamp() - queryOccupantMinutes * 60
+            start = bisect_left(signinTimes, since)
+            occupants = [signins[position] for position in range(start, len(signins)) if lastSignin[signins[position]["id"]] == position]
+            return (200, {"since": datetime.fromtimestamp(since).isoformat(timespec="seconds"), "count": len(occupants), "occupants": occupants})
+        if(request.path == "/signins"):
+            try:
+                since = parseQueryTime(arguments.get("since", "00:00"), now)
+            except ValueError:
+                return (400, {"error": "Give the time as 24 hour time (10:30) or a date and time (2026-10-19T10:30)"})
+            start = bisect_left(signinTimes, since.timestamp())
+            return (200, {"since": since.isoformat(timespec="seconds"), "count": len(signins) - start,
+                "signins": signins[start:start + querySigninsLimit]})
+    return (404, {"error": f"Unknown query {request.path}. Try /signed-in?id=..., /occupants, or /signins?since=..."})
+
+async def handleQueryConnection(reader, writer):
+    # This method answers the HTTP GET requests sent on one connection to the query server,
+    # keeping the connection open for more requests unless the client asks to close it.
+    try:
+        keepOpen = True
+        while(keepOpen):
+            requestLine = await reader.readline()
+            if(requestLine == b""):
+                break
+            # read the headers, only the Connection header matters here
+            while(True):
+                header = (await reader.readline()).lower()
+                if(header.strip() == b""):
+                    break
+                if(header.startswith(b"connection:") and b"close" in header):
+                    keepOpen = False
+            parts = requestLine.decode("latin-1").split()
+            if(len(parts) != 3):
+                (status, answer) = (400, {"error": "Bad request"})
+                keepOpen = False
+            elif(parts[0] != "GET"):
+                # any body sent with it isn't read, so the connection can't be used again
+                (status, answer) = (405, {"error": "Only GET requests are answered"})
+                keepOpen = False
+            else:
+                (status, answer) = answerQuery(parts[1])
+                keepOpen = keepOpen and parts[2] != "HTTP/1.0"
+            body = json.dumps(answer).encode("utf-8")
+            writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keepOpen else 'close'}\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        # the client went away or sent a line too long to read
+        pass
+    finally:
+        writer.close()
+
+def runQueryServer(host, port, started):
+    # This method runs on its own thread with its own asyncio event loop, so the window never waits on a query.
+    # started is a queue the port being listened on is put in (or the error, if the server couldn't start).
+    async def serveQueries():
+        try:
+            server = await asyncio.start_server(handleQueryConnection, host, port)
+        except OSError as error:
+            started.put(error)
+            return
+        started.put(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    asyncio.run(serveQueries())
+
+def startQueryServer(host, port):
+    # start the query server in the background and return the port it's listening on (None if it couldn't start).
+    # Port 0 picks any free port.
+    started = queue.Queue()
+    threading.Thread(target=runQueryServer, args=(host, port, started), daemon=True).start()
+    result = started.get()
+    if(isinstance(result, Exception)):
+        logger.error("Couldn't start the query server on %s:%d: %s", host, port, result)
+        return None
+    logger.info("Query server listening on http://%s:%d/", host, result)
+    return result
+
+async def runQueryClient(port, targets, latencies):
+    # one made-up front office client for --query-load-test: sends every query in targets over one connection,
+    # one after another, and adds (query path, seconds it took) to latencies for each
+    (reader, writer) = await asyncio.open_connection("127.0.0.1", port)
+    for target in targets:
+        startTime = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        await reader.readline()
+        contentLength = 0
+        while(True):
+            header = (await reader.readline()).lower()
+            if(header.strip() == b""):
+                break
+            if(header.startswith(b"content-length:")):
+                contentLength = int(header.split(b":")[1])
+        await reader.readexactly(contentLength)
+        latencies.append((urllib.parse.urlsplit(target).path, time.perf_counter() - startTime))
+    writer.close()
+    await writer.wait_closed()
+
+def runQueryLoadTest(clientCount, requestCount, signinCount):
+    # This method fills the query indexes with signinCount made-up sign-ins from earlier today,
+    # starts the query server, and has clientCount clients send requestCount mixed queries each, all at the same time.
+    # It prints how many queries were answered per second and how long they took.
+    # (The clients run in this same process, so the times include sharing it with them.)
+    generator = random.Random(1)
+    now = datetime.now()
+    dayStart = max(now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp(), now.timestamp() - 8 * 3600)
+    studentIDs = generator.sample(range(100000, 1000000), signinCount)
+    for i in range(signinCount):
+        addToQueryIndex(datetime.fromtimestamp(dayStart + (now.timestamp() - dayStart) * i / signinCount), studentIDs[i], "Student", f"Number{i}", generator.randint(6, 12))
+    port = startQueryServer("127.0.0.1", 0)
+    if(port is None):
+        return
+    sinceTime = datetime.fromtimestamp(now.timestamp() - 1800).strftime("%H:%M")
+    queries = [lambda: f"/signed-in?id={generator.choice(studentIDs)}", lambda: f"/signed-in?id={generator.randint(100000, 999999)}",
+        lambda: "/occupants", lambda: f"/signins?since={sinceTime}"]
+    latencies = []
+    async def runClients():
+        await asyncio.gather(*[runQueryClient(port, [generator.choice(queries)() for i in range(requestCount)], latencies) for client in range(clientCount)])
+    startTime = time.perf_counter()
+    asyncio.run(runClients())
+    totalTime = time.perf_counter() - startTime
+    print(f"{clientCount} clients x {requestCount} queries against {signinCount} sign-ins: {len(latencies) / totalTime:.0f} queries/s")
+    print(f"{'Query':<12}{'Count':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'Max (ms)':>10}")
+    for path in sorted(set([latency[0] for latency in latencies])) + ["all"]:
+        times = sorted([latency[1] * 1000 for latency in latencies if path in (latency[0], "all")])
+        print(f"{path:<12}{len(times):>8}{times[len(times) // 2]:>10.2f}{times[int(len(times) * 0.95)]:>10.2f}{times[int(len(times) * 0.99)]:>10.2f}{times[-1]:>10.2f}")
+
+def parseReportText(text, reportStartTexts, reportEndText):
+    # This method reads the text of an exported report and returns a tuple of
+    # (report start time, report end time, List of sign-ins), where each sign-in is (ID, name, grade, sign-in time).
+    # The sign-in lines only have a time, so the date comes from the report's START line
+    # (or the export line at the bottom if the START line is missing).
+    # The report texts are passed in (instead of read from the globals) so this can run in another process.
+    startTime = None
+    endTime = None
+    signins = []
+    for line in text.splitlines():
+        line = line.strip()
+        signinMatch = signinLinePattern.match(line)
+        if(signinMatch is not None):
+            signins.append((int(signinMatch["id"]), signinMatch["name"], int(signinMatch["grade"]), signinMatch["time"]))
+            continue
+        dateMatch = reportDatePattern.search(line)
+        if(dateMatch is None):
+            continue
+        lineTime = datetime.strptime(f"{dateMatch['date']} {dateMatch['time']}", "%m/%d/%y %I:%M %p")
+        if(startTime is None and line.startswith(reportStartTexts)):
+            startTime = lineTime
+        elif(line.startswith(reportEndText)):
+            endTime = lineTime
+    reportDate = (startTime or endTime or datetime.now()).date()
+    # there are only so many different minutes in a report, so each time is only converted once
+    signinTimes = {signinTime: datetime.combine(reportDate, datetime.strptime(signinTime, "%I:%M %p").time()) for signinTime in set([signin[3] for signin in signins])}
+    signins = [(studentID, name, grade, signinTimes[signinTime]) for (studentID, name, grade, signinTime) in signins]
+    return (startTime, endTime, signins)
+
+def parseReportSource(source, reportStartTexts, reportEndText):
+    # This method reads and parses (see parseReportText) one report file, or every report inside a monthly archive.
+    # It returns a List of (report name, parsed report), where a report inside an archive is named "archive::report".
+    # The sources were already picked out by findReportSources, so an archive is told apart by its ending alone
+    # (isReportArchive needs archiveFileNameStart, which isn't set in the processes this runs in on Windows).
+    if(source.endswith((".tar.gz", ".tar.xz"))):
+        with tarfile.open(source, "r:*") as archive:
+            return [(f"{source}::{member.name}", parseReportText(archive.extractfile(member).read().decode("utf-8"), reportStartTexts, reportEndText))
+                for member in archive.getmembers() if member.isfile()]
+    return [(source, parseReportText(readReportText(source), reportStartTexts, reportEndText))]
+
+def isReportArchive(filename):
+    # monthly archives are .tar.gz or .tar.xz files starting with the archive name
+    global archiveFileNameStart
+    return os.path.basename(filename).startswith(archiveFileNameStart) and filename.endswith((".tar.gz", ".tar.xz"))
+
+def readReportText(source):
+    # This method returns the text of a saved report, whether it's a plain .txt file, a compressed .txt.gz or .txt.xz file,
+    # or a report inside a monthly archive (named "archive::report").
+    if("::" in source):
+        (archiveName, memberName) = source.split("::", 1)
+        with tarfile.open(archiveName, "r:*") as archive:
+            return archive.extractfile(memberName).read().decode("utf-8")
+    if(source.endswith(".gz")):
+        with gzip.open(source, "rt") as file:
+            return file.read()
+    if(source.endswith(".xz")):
+        with lzma.open(source, "rt") as file:
+            return file.read()
+    with open(source, "r") as file:
+        return file.read()
+
+def openReportForWriting(filename, compression, level):
+    # open a new report file for writing text, compressing it as it's written if compression is "gzip" or "lzma"
+    if(compression == "gzip"):
+        return gzip.open(filename, "wt", compresslevel=level)
+    if(compression == "lzma"):
+        return lzma.open(filename, "wt", preset=level)
+    return open(filename, "w")
+
+def findReportFiles(directory):
+    # return the full path of every exported sign-in report in the directory (plain or compressed), oldest name first
+    global defaultFileNameStart
+    return sorted([os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith(defaultFileNameStart) and name.endswith((".txt", ".txt.gz", ".txt.xz"))])
+
+def findReportSources(directory):
+    # return every report file and every monthly archive of reports in the directory
+    return sorted([os.path.join(directory, name) for name in os.listdir(directory) if isReportArchive(name)]) + findReportFiles(directory)
+
+def parseAllReports(directory):
+    # This method reads every report and archive in the directory at the same time using one process per CPU core.
+    # It returns a List of (report name, parsed report) for every report (see parseReportSource).
+    global reportStartProgramText, reportStartExportText, reportExportStart
+    reportSources = findReportSources(directory)
+    reportStartTexts = (reportStartProgramText, reportStartExportText)
+    workers = os.cpu_count() or 1
+    # hand the files to the processes in batches so there's less back-and-forth per file
+    batchSize = max(1, len(reportSources) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(parseReportSource, reportSources, [reportStartTexts] * len(reportSources), [reportExportStart] * len(reportSources), chunksize=batchSize)
+        return [report for sourceReports in results for report in sourceReports]
+
+def analyzeReports(directory):
+    # This method reads every exported report in the directory (including compressed and archived ones)
+    # at the same time using one process per CPU core,
+    # then saves two attendance tables next to them: one row per student and one row per day.
+    # It returns the (per-student, per-day) tables.
+    global attendanceByStudentFileName, attendanceByDayFileName
+    reports = parseAllReports(directory)
+    signins = pd.DataFrame([signin for (reportName, (startTime, endTime, reportSignins)) in reports for signin in reportSignins], columns=["ID", "Name", "Grade", "Time"])
+    signins["Time"] = pd.to_datetime(signins["Time"])
+    signins["Date"] = signins["Time"].dt.date
+    # one row per student, using the name and grade from their latest sign-in
+    signins = signins.sort_values("Time", kind="stable")
+    byStudent = signins.groupby("ID").agg(Name=("Name", "last"), Grade=("Grade", "last"), SignIns=("Time", "size"),
+        DaysAttended=("Date", "nunique"), FirstSignIn=("Time", "min"), LastSignIn=("Time", "max"))
+    byStudent = byStudent.sort_values(["DaysAttended", "SignIns"], ascending=False).reset_index()
+    # one row per day
+    byDay = signins.groupby("Date").agg(SignIns=("ID", "size"), Students=("ID", "nunique")).reset_index()
+    byStudent.to_csv(os.path.join(directory, attendanceByStudentFileName), index=False)
+    byDay.to_csv(os.path.join(directory, attendanceByDayFileName), index=False)
+    logger.info("Read %d report(s) with %d sign-in(s) from %d student(s) over %d day(s).", len(reports), len(signins), len(byStudent), len(byDay))
+    logger.info("Saved %s and %s to %s", attendanceByStudentFileName, attendanceByDayFileName, directory)
+    return (byStudent, byDay)
+
+def encodeStudentIDs(studentIDs):
+    # This method squeezes a set of student IDs into a short piece of text for the manifest.
+    # The IDs are sorted and only the difference from the previous ID is kept (e.g. 1001, 1004, 1010 -> 1001, 3, 6),
+    # each difference is written in as few bytes as it needs (7 bits per byte, the top bit meaning "more bytes follow"),
+    # and the bytes are turned into plain text with base64.
+    encoded = bytearray()
+    previousID = 0
+    for studentID in sorted(set(studentIDs)):
+        difference = studentID - previousID
+        previousID = studentID
+        while(difference >= 128):
+            encoded.append((difference & 127) | 128)
+            difference >>= 7
+        encoded.append(difference)
+    return base64.b64encode(bytes(encoded)).decode("ascii")
+
+def decodeStudentIDs(text):
+    # turn the text made by encodeStudentIDs back into the sorted List of student IDs.
+    # Raises a ValueError if the text isn't base64 or stops partway through an ID (e.g. a damaged manifest line).
+    studentIDs = []
+    previousID = 0
+    difference = 0
+    shift = 0
+    for byte in base64.b64decode(text, validate=True):
+        difference |= (byte & 127) << shift
+        shift += 7
+        if(byte < 128):
+            previousID += difference
+            studentIDs.append(previousID)
+            difference = 0
+            shift = 0
+    if(shift != 0):
+        raise ValueError("the student ID list ends partway through an ID")
+    return studentIDs
+
+def makeManifestEntry(filename, reportText):
+    # This method makes the manifest line for one report: its file name, start and end time,
+    # how many sign-ins it has, and which students signed in (see encodeStudentIDs).
+    global reportStartProgramText, reportStartExportText, reportExportStart
+    (startTime, endTime, signins) = parseReportText(reportText, (reportStartProgramText, reportStartExportText), reportExportStart)
+    return makeManifestEntryFromParsed(filename, startTime, endTime, signins)
+
+def makeManifestEntryFromParsed(filename, startTime, endTime, signins):
+    # same as makeManifestEntry, but for a report that was already parsed
+    studentIDs = [signin[0] for signin in signins]
+    return {"file": os.path.basename(filename),
+        "start": startTime.isoformat() if startTime is not None else None,
+        "end": endTime.isoformat() if endTime is not None else None,
+        "records": len(signins),
+        "minID": min(studentIDs) if len(studentIDs) > 0 else None,
+        "maxID": max(studentIDs) if len(studentIDs) > 0 else None,
+        "ids": encodeStudentIDs(studentIDs)}
+
+def appendToManifest(directory, entry):
+    # add one report to the end of the manifest file in the save directory.
+    # The manifest is only ever added to (never rewritten) when a report is saved.
+    global manifestFileName, manifestLock
+    with manifestLock:
+        with open(os.path.join(directory, manifestFileName), "a") as file:
+            file.write(f"{json.dumps(entry)}\n")
+
+def readManifest(directory):
+    # read every report entry from the manifest file (an empty List if there isn't one yet)
+    global manifestFileName
+    manifestPath = os.path.join(directory, manifestFileName)
+    if(not os.path.isfile(manifestPath)):
+        return []
+    with open(manifestPath, "r") as file:
+        return [json.loads(line) for line in file if line.strip() != ""]
+
+def queryManifest(directory, studentID=None, day=None):
+    # This method returns the file names of the reports that contain the student ID (if given)
+    # and that started or ended on the day (if given, as a date), using only the manifest.
+    matches = []
+    for entry in readManifest(directory):
+        if(day is not None):
+            entryDays = [datetime.fromisoformat(entry[key]).date() for key in ("start", "end") if entry[key] is not None]
+            if(day not in entryDays):
+                continue
+        if(studentID is not None):
+            # skip decoding the IDs if the student is outside this report's lowest and highest ID
+            if(entry["minID"] is None or not (entry["minID"] <= studentID <= entry["maxID"])):
+                continue
+            try:
+                entryIDs = decodeStudentIDs(entry["ids"])
+            except ValueError as error:
+                logger.warning("Couldn't read the student IDs for %s in the manifest, so it was skipped: %s", entry["file"], error)
+                continue
+            if(studentID not in entryIDs):
+                continue
+        matches.append(entry["file"])
+    return matches
+
+def parseReportQuery(query):
+    # turn what the librarian typed into a (student ID, day) search: a number is a student ID,
+    # and a date like 03-14, 03/14 or 03-14-23 is a day (the last time it came around if no year is typed,
+    # so 12-20 typed in January is last December)
+    query = query.strip()
+    if(query.isdecimal()):
+        return (int(query), None)
+    parts = re.split(r"[-/]", query)
+    if(len(parts) == 3 and all([part.isdecimal() for part in parts])):
+        try:
+            return (None, datetime(2000 + int(parts[2]) % 100, int(parts[0]), int(parts[1])).date())
+        except ValueError:
+            pass
+    elif(len(parts) == 2 and all([part.isdecimal() for part in parts])):
+        today = datetime.now().date()
+        # (going back a few years at most, for February 29)
+        for year in range(today.year, today.year - 8, -1):
+            try:
+                day = datetime(year, int(parts[0]), int(parts[1])).date()
+            except ValueError:
+                continue
+            if(day <= today):
+                return (None, day)
+    return (None, None)
+
+def rebuildManifest(directory):
+    # This method remakes the manifest from every report already in the save directory
+    # (reading them with one process per CPU core), for archives saved before there was a manifest
+    # or after reports were moved into monthly archives.
+    global manifestFileName, manifestLock
+    # hold the manifest lock the whole time so a report saved in the meantime isn't left out
+    with manifestLock:
+        reports = parseAllReports(directory)
+        # write the new manifest to a temporary file first so the old one is never left half written
+        manifestPath = os.path.join(directory, manifestFileName)
+        with open(f"{manifestPath}.tmp", "w") as file:
+            for (reportName, (startTime, endTime, signins)) in reports:
+                file.write(f"{json.dumps(makeManifestEntryFromParsed(reportName, startTime, endTime, signins))}\n")
+        os.replace(f"{manifestPath}.tmp", manifestPath)
+    logger.info("Rebuilt %s from %d report(s) in %s", manifestFileName, len(reports), directory)
+
+def archiveOldReports(directory):
+    # This method rolls up every report from before this month into one compressed archive per month
+    # (e.g. "SH Signin Archive 2023-03.tar.gz"), adding to that month's archive if it already exists,
+    # then deletes the rolled-up report files and remakes the manifest with the new report names.
+    global archiveFileNameStart, archiveCompression, reportCompressionLevel, reportStartProgramText, reportStartExportText, reportExportStart
+    thisMonth = datetime.now().strftime("%Y-%m")
+    reportsByMonth = {}
+    for reportFile in findReportFiles(directory):
+        # the month of a report is the month it was started (or the month of the file if it has no START line)
+        text = readReportText(reportFile)
+        (startTime, endTime, signins) = parseReportText(text, (reportStartProgramText, reportStartExportText), reportExportStart)
+        reportTime = startTime or endTime or datetime.fromtimestamp(os.path.getmtime(reportFile))
+        month = reportTime.strftime("%Y-%m")
+        if(month < thisMonth):
+            reportsByMonth.setdefault(month, []).append(reportFile)
+    archiveMode = "xz" if archiveCompression == "lzma" else "gz"
+    for (month, reportFiles) in sorted(reportsByMonth.items()):
+        archiveName = os.path.join(directory, f"{archiveFileNameStart}{month}.tar.{archiveMode}")
+        # write the archive to a temporary file first, streaming each report through the compressor
+        compressionOption = {"preset": reportCompressionLevel} if archiveMode == "xz" else {"compresslevel": reportCompressionLevel}
+        with tarfile.open(f"{archiveName}.tmp", f"w:{archiveMode}", **compressionOption) as newArchive:
+            if(os.path.isfile(archiveName)):
+                # copy over the reports already archived for this month
+                with tarfile.open(archiveName, "r:*") as oldArchive:
+                    for member in oldArchive.getmembers():
+                        newArchive.addfile(member, oldArchive.extractfile(member) if member.isfile() else None)
+            for reportFile in reportFiles:
+                reportBytes = readReportText(reportFile).encode("utf-8")
+                # archived reports are always stored as plain .txt inside the archive
+                memberName = os.path.basename(reportFile)
+                for ending in (".gz", ".xz"):
+                    if(memberName.endswith(ending)):
+                        memberName = memberName[:-len(ending)]
+                member = tarfile.TarInfo(memberName)
+                member.size = len(reportBytes)
+                member.mtime = os.path.getmtime(reportFile)
+                newArchive.addfile(member, io.BytesIO(reportBytes))
+        os.replace(f"{archiveName}.tmp", archiveName)
+        # the reports are safely in the archive now, so remove the loose copies
+        for reportFile in reportFiles:
+            os.remove(reportFile)
+        logger.info("Archived %d report(s) into %s", len(reportFiles), os.path.basename(archiveName))
+    if(len(reportsByMonth) > 0):
+        rebuildManifest(directory)
+
+def makeTestRoster(filename, studentCount, seed):
+    global databaseColumns, minDigits, maxDigits, minGrade, maxGrade
+    # This method makes up a roster of studentCount students with random unique IDs and names,
+    # using the same columns as the real roster file (see databaseColumns), for testing with lots of students.
+    generator = random.Random(seed)
+    syllables = ["an", "bel", "car", "da", "el", "fin", "gra", "ho", "is", "jo", "ka", "li", "mar", "no", "ol", "pe", "ra", "sa", "ta", "vi"]
+    studentIDs = generator.sample(range(10 ** (minDigits - 1), 10 ** maxDigits), studentCount)
+    with open(filename, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(databaseColumns.values())
+        for studentID in studentIDs:
+            names = {"ID": studentID, "Grade": generator.randint(max(minGrade, 6), maxGrade)}
+            for column in ("Last Name", "First Name"):
+                names[column] = "".join(generator.choice(syllables) for i in range(generator.randint(2, 3))).capitalize()
+            writer.writerow([names[column] for column in databaseColumns])
+    return studentIDs
+
+def makeTestArrivals(studentIDs, seconds, rate, seed):
+    global minDigits, maxDigits, loadTestMistakeRates, loadTestSigninSeconds, loadTestErrorSeconds
+    # This method makes up what gets typed into the kiosk during a bell rush of the given length (in seconds).
+    # Students arrive at random (a Poisson process) at rate per second on average, so every run with the same
+    # rate and length has about the same number of students. Some of the typed IDs are mistakes or repeats,
+    # at the loadTestMistakeRates chances. Each student keeps the kiosk busy for a while: about loadTestSigninSeconds
+    # to type their ID and press Yes on the confirmation screen, or about loadTestErrorSeconds to read an error.
+    # It returns a List of (arrival time in seconds, typed text, kind of input, seconds at the kiosk), in order of arrival.
+    generator = random.Random(seed)
+    unusedIDs = list(studentIDs)
+    generator.shuffle(unusedIDs)
+    knownIDs = set(studentIDs)
+    usedIDs = []
+    arrivals = []
+    arrivalTime = generator.expovariate(rate)
+    while(arrivalTime < seconds):
+        kind = generator.choices(list(loadTestMistakeRates) + ["signin"], list(loadTestMistakeRates.values()) + [1 - sum(loadTestMistakeRates.values())])[0]
+        if(kind == "signin" and len(unusedIDs) == 0) or (kind == "repeat" and len(usedIDs) == 0):
+            kind = "repeat" if len(usedIDs) > 0 else "unknown"
+        if(kind == "signin"):
+            typed = str(unusedIDs.pop())
+            usedIDs.append(typed)
+        elif(kind == "repeat"):
+            typed = generator.choice(usedIDs)
+        elif(kind == "invalid"):
+            typed = generator.choice(["12a45", "", "abc", "12 345", "#12345", "1234.5"])
+        elif(kind == "tooFew"):
+            typed = str(generator.randint(1, 10 ** (minDigits - 1) - 1))
+        elif(kind == "tooMany"):
+            typed = str(generator.randint(10 ** maxDigits, 10 ** (maxDigits + 2)))
+        else:
+            typed = str(generator.randint(10 ** (minDigits - 1), 10 ** maxDigits - 1))
+            while(int(typed) in knownIDs):
+                typed = str(generator.randint(10 ** (minDigits - 1), 10 ** maxDigits - 1))
+        # (somewhere between half and one and a half times as long as usual)
+        busyTime = generator.uniform(0.5, 1.5) * (loadTestSigninSeconds if kind in ("signin", "repeat") else loadTestErrorSeconds)
+        arrivals.append((arrivalTime, typed, kind, busyTime))
+        arrivalTime += generator.expovariate(rate)
+    return arrivals
+
+def runLoadTest(arrivals, queueLimit):
+    # This method plays the made-up arrivals (see makeTestArrivals) through the same ID check and sign-in
+    # recording that the window uses, one at a time like the window does. The arrival times and the time each student
+    # spends at the kiosk are simulated, but each input really runs, and its real run time is added on to work out
+    # how long later students would have waited. Anyone who arrives while queueLimit students are already waiting
+    # (or at the kiosk) gives up (is dropped).
+    # It returns a Dictionary of the results.
+    finishTimes = deque()
+    waits = []
+    runTimes = []
+    outcomes = {}
+    dropped = 0
+    kioskFreeAt = 0
+    for (arrivalTime, typed, kind, busyTime) in arrivals:
+        while(len(finishTimes) > 0 and finishTimes[0] <= arrivalTime):
+            finishTimes.popleft()
+        if(len(finishTimes) >= queueLimit):
+            dropped += 1
+            continue
+        startTime = time.perf_counter()
+        (student, errorText) = checkStudentID(typed)
+        if(student is not None):
+            (studentID, lName, fName, grade, extras) = student
+            recordSignin(studentID, fName, lName, grade)
+        runTime = time.perf_counter() - startTime
+        # the student waits for everyone ahead of them, then uses the kiosk (and waits for their own input to run)
+        kioskFreeAt = max(kioskFreeAt, arrivalTime) + busyTime + runTime
+        finishTimes.append(kioskFreeAt)
+        waits.append(kioskFreeAt - arrivalTime)
+        runTimes.append(runTime)
+        result = "signed in" if student is not None else "rejected"
+        outcomes[(kind, result)] = outcomes.get((kind, result), 0) + 1
+    return {"inputs": len(arrivals), "dropped": dropped, "waits": waits, "runTimes": runTimes, "outcomes": outcomes}
+
+def printLoadTestResults(results, seconds):
+    # print the throughput, how long students waited, and what happened to each kind of input
+    waits = pd.Series(results["waits"]) * 1000
+    runTimes = pd.Series(results["runTimes"]) * 1000
+    handled = len(runTimes)
+    print(f"{results['inputs']} inputs over {seconds} s ({results['inputs'] / seconds:.1f} per second), {handled} handled, {results['dropped']} dropped")
+    if(handled == 0):
+        return
+    print(f"Throughput: {handled / (runTimes.sum() / 1000):.0f} inputs per second of program time")
+    print(f"Wait + time at the kiosk (ms): p50 {waits.quantile(0.5):.2f}, p95 {waits.quantile(0.95):.2f}, p99 {waits.quantile(0.99):.2f}, max {waits.max():.2f}")
+    print(f"Sign-in time only (ms): p50 {runTimes.quantile(0.5):.3f}, p95 {runTimes.quantile(0.95):.3f}, p99 {runTimes.quantile(0.99):.3f}")
+    for ((kind, result), count) in sorted(results["outcomes"].items()):
+        print(f"    {kind:<10}{result:<12}{count:>8}")
+
+def runLoadTestCommand(studentCount, seconds, rate):
+    global database, databaseIDs, currentRecords, databaseHeaderLine, databaseSortBy, loadTestQueueLimit
+    # make up a roster and a bell rush, load the roster like the program normally does, and run the rush against it
+    testFolder = tempfile.mkdtemp()
+    try:
+        rosterFile = os.path.join(testFolder, "Load Test Roster.csv")
+        studentIDs = makeTestRoster(rosterFile, studentCount, seed=1)
+        (database, duplicates, reportLines) = openDatabases([rosterFile], databaseHeaderLine, databaseSortBy)
+        databaseIDs = buildIDIndex(database)
+        currentRecords = []
+        arrivals = makeTestArrivals(studentIDs, seconds, rate, seed=2)
+        # don't log every made-up sign-in
+        logLevel = logger.level
+        logger.setLevel(logging.WARNING)
+        results = runLoadTest(arrivals, loadTestQueueLimit)
+        logger.setLevel(logLevel)
+        print(f"Roster of {len(database)} students")
+        printLoadTestResults(results, seconds)
+    finally:
+        shutil.rmtree(testFolder, ignore_errors=True)
+
+def benchmarkNameSearch(studentCount, queryCount):
+    global database, databaseIDs, databaseHeaderLine, databaseSortBy, nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames, nameSearchBudgetMS
+    # This method times the name search on a made-up roster of studentCount students with queryCount made-up searches
+    # of each kind (a whole name, the start of a name, a name with a typo, first and last name, and a name no one has),
+    # and prints the typical and slowest times compared to nameSearchBudgetMS.
+    generator = random.Random(3)
+    testFolder = tempfile.mkdtemp()
+    try:
+        rosterFile = os.path.join(testFolder, "Name Search Roster.csv")
+        makeTestRoster(rosterFile, studentCount, seed=1)
+        (database, duplicates, reportLines) = openDatabases([rosterFile], databaseHeaderLine, databaseSortBy)
+        databaseIDs = buildIDIndex(database)
+        (nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames) = buildNameIndex(database)
+    finally:
+        shutil.rmtree(testFolder, ignore_errors=True)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    def addTypo(name):
+        spot = generator.randrange(len(name))
+        typo = generator.choice(["replace", "delete", "insert", "swap"])
+        if(typo == "replace"):
+            return name[:spot] + generator.choice(letters) + name[spot + 1:]
+        if(typo == "delete"):
+            return name[:spot] + name[spot + 1:]
+        if(typo == "insert"):
+            return name[:spot] + generator.choice(letters) + name[spot:]
+        spot = min(spot, len(name) - 2)
+        return name[:spot] + name[spot + 1] + name[spot] + name[spot + 2:]
+    queryKinds = {"whole name": [], "start of name": [], "typo": [], "first and last": [], "no match": []}
+    for i in range(queryCount):
+        (lastName, firstName) = nameIndexRowNames[generator.randrange(len(nameIndexRowNames))]
+        queryKinds["whole name"].append(lastName)
+        queryKinds["start of name"].append(firstName[:generator.randint(2, max(2, len(firstName) - 1))])
+        queryKinds["typo"].append(addTypo(lastName))
+        queryKinds["first and last"].append(f"{addTypo(firstName)} {lastName}")
+        queryKinds["no match"].append("".join(generator.choice(letters) for j in range(generator.randint(4, 9))))
+    print(f"Roster of {len(nameIndexRowNames)} students ({len(nameIndexUnique)} different names), budget {nameSearchBudgetMS} ms")
+    print(f"{'Search':<16}{'Median (ms)':>12}{'95% (ms)':>10}{'Slowest (ms)':>14}{'Over budget':>13}")
+    for (kind, queries) in queryKinds.items():
+        times = []
+        for query in queries:
+            startTime = time.perf_counter()
+            searchStudentsByName(query)
+            times.append((time.perf_counter() - startTime) * 1000)
+        times.sort()
+        print(f"{kind:<16}{times[len(times) // 2]:>12.2f}{times[int(len(times) * 0.95)]:>10.2f}{times[-1]:>14.2f}{sum(1 for t in times if t > nameSearchBudgetMS):>13}")
+
+def benchmarkCompression(directory):
+    # This method prints how small and how fast each compression level is for writing reports,
+    # using the reports in the save directory (or a made-up report if there aren't any yet).
+    sampleText = "".join([readReportText(reportFile) for reportFile in findReportFiles(directory)[:200]])
+    if(sampleText == ""):
+        sampleText = "\n".join([f"Student Number{i % 500} (ID #{1000 + i % 500}, Grade {6 + i % 7}) signed in at 0{i % 10}:{i % 60:02d} AM." for i in range(20000)])
+    print(f"{'Compression':<14}{'Level':>6}{'Size (KB)':>12}{'Ratio':>8}{'Write (ms)':>12}")
+    for (compression, levels) in [(None, [0]), ("gzip", [1, 6, 9]), ("lzma", [0, 6, 9])]:
+        for level in levels:
+            testFile = os.path.join(tempfile.gettempdir(), f"compression test{reportFileEndings[compression]}")
+            startTime = time.perf_counter()
+            with openReportForWriting(testFile, compression, level) as file:
+                for line in sampleText.splitlines(keepends=True):
+                    file.write(line)
+            writeTime = time.perf_counter() - startTime
+            size = os.path.getsize(testFile)
+            os.remove(testFile)
+            print(f"{str(compression):<14}{level:>6}{size / 1024:>12.1f}{len(sampleText.encode('utf-8')) / max(size, 1):>8.1f}{writeTime * 1000:>12.1f}")
+
+def findReports():
+    global saveDirectory, reportSearchInvalidText, reportSearchNoneText, reportSearchResultLimit
+    # search the manifest for the student ID or date typed in the report search box
+    (studentID, day) = parseReportQuery(ent_reportSearch.get())
+    if(studentID is None and day is None):
+        lbl_reportSearchResults.config(text=reportSearchInvalidText)
+        return
+    matches = queryManifest(saveDirectory, studentID, day)
+    if(len(matches) == 0):
+        lbl_reportSearchResults.config(text=reportSearchNoneText)
+        return
+    # show the newest reports first, and only so many of them
+    matches = matches[::-1]
+    resultText = "\n".join(matches[:reportSearchResultLimit])
+    if(len(matches) > reportSearchResultLimit):
+        resultText += f"\n(and {len(matches) - reportSearchResultLimit} more)"
+    lbl_reportSearchResults.config(text=resultText)
+
+def setupLogging(directory):
+    global logLevel, logFileNameStart, logFileMaxKB, logFileBackups, kioskName
+    # send log messages at logLevel and above to the terminal and to a log file in the save directory.
+    # When the log file gets bigger than logFileMaxKB it's renamed (keeping logFileBackups old ones) and a new one is started.
+    # The file is named after the kiosk, since only one program can safely rename a log file, and kiosks can share a save directory.
+    logger.setLevel(logLevel)
+    logFormat = logging.Formatter("%(asctime)s %(levelname)s %(message)s", "%m/%d/%y %I:%M:%S %p")
+    handlers = [logging.StreamHandler()]
+    try:
+        handlers.append(logging.handlers.RotatingFileHandler(os.path.join(directory, f"{logFileNameStart}{kioskName}.txt"), maxBytes=logFileMaxKB * 1024, backupCount=logFileBackups))
+    except OSError:
+        # the save directory is missing (the error screen will ask for a new one), so only log to the terminal
+        pass
+    for handler in handlers:
+        handler.setFormatter(logFormat)
+        logger.addHandler(handler)
+
+def markStartupPhase(phaseName):
+    global startupPhases
+    # record that a part of startup just finished (the time it took is from the end of the part before it)
+    startupPhases.append((phaseName, time.perf_counter()))
+
+def finishStartupProfile():
+    global programStartTime, startupPhases, builtScreens, startupBudgetMS, startupProfileFileName, saveDirectory
+    # called once the window is up and waiting for the user
+    markStartupPhase("first paint")
+    totalMS = (startupPhases[-1][1] - programStartTime) * 1000
+    logger.info("Window ready %.0f ms after startup (screens built: %s)", totalMS, ", ".join(builtScreens))
+    if(totalMS > startupBudgetMS):
+        logger.warning("Startup took %.0f ms, over the budget of %d ms", totalMS, startupBudgetMS)
+    # with --profile-startup, add how long each part of startup took to the profile file in the save directory
+    if("--profile-startup" in sys.argv):
+        lines = [f"Startup on {datetime.now().strftime('%m/%d/%y at %I:%M:%S %p')} ({totalMS:.1f} ms total, budget {startupBudgetMS} ms)\n"]
+        phaseStart = programStartTime
+        for (phaseName, phaseEnd) in startupPhases:
+            lines.append(f"    {phaseName:<16}{(phaseEnd - phaseStart) * 1000:>10.1f} ms{(phaseEnd - programStartTime) * 1000:>10.1f} ms\n")
+            phaseStart = phaseEnd
+        profilePath = os.path.join(saveDirectory if saveDirectory else pathlib.Path.home(), startupProfileFileName)
+        try:
+            with open(profilePath, "a") as file:
+                file.writelines(lines)
+            logger.info("Startup profile saved to %s", profilePath)
+        except OSError as error:
+            # (e.g. the save directory is missing, and the error screen is asking for a new one)
+            logger.warning("Couldn't save the startup profile to %s: %s", profilePath, error)
+
+def getRunningCallback():
+    # This method returns the name of the method of this program the window is running right now (like saveFile),
+    # or None if it's waiting for something to happen. It looks at what the window's thread is doing from the outside,
+    # so nothing in tkinter has to be changed to find out.
+    frame = sys._current_frames().get(threading.main_thread().ident)
+    names = []
+    while(frame is not None):
+        if(frame.f_code.co_filename == __file__):
+            names.append(frame.f_code.co_name)
+        frame = frame.f_back
+    # the outermost one is the main program (which called mainloop), so the one inside it is the method the window called
+    return names[-2] if len(names) >= 2 else None
+
+def watchdogHeartbeat(expectedTime):
+    global watchdogInterval, watchdogStallMS, watchdogLock, watchdogLags, watchdogStalls, watchdogState
+    # This method is called by the window every watchdogInterval milliseconds. How late it runs is how long
+    # the window was too busy to respond (the event loop lag). A gap over watchdogStallMS is written down as a stall.
+    now = time.perf_counter()
+    lag = max(0.0, (now - expectedTime) * 1000)
+    with watchdogLock:
+        watchdogLags.append(lag)
+        stall = watchdogState["stall"]
+        if(stall is None and lag > watchdogStallMS):
+            # a stall too short for the monitor thread to catch while it was happening
+            # was most likely the method the monitor thread last saw the window busy with
+            stall = {"start": datetime.fromtimestamp(time.time() - lag / 1000).isoformat(timespec="seconds"), "callback": watchdogState["slowCallback"]}
+        if(stall is not None):
+            stall["seconds"] = round(lag / 1000, 2)
+            watchdogStalls.append(stall)
+            watchdogState["stall"] = None
+            watchdogState["stallCount"] += 1
+        watchdogState["expected"] = now + watchdogInterval / 1000
+    if(stall is not None):
+        logger.warning("The window was frozen for %.1f s (running %s)", stall["seconds"], stall["callback"])
+    root.after(watchdogInterval, watchdogHeartbeat, now + watchdogInterval / 1000)
+
+def getHealthReport(closing):
+    global watchdogLock, watchdogLags, watchdogStalls, watchdogState, kioskName, pendingExports
+    # put together what the health file says (see writeHealthFile)
+    running = getRunningCallback()
+    with watchdogLock:
+        lags = sorted(watchdogLags)
+        return {"kiosk": kioskName, "updated": datetime.now().isoformat(timespec="seconds"), "processID": os.getpid(),
+            "uptimeSeconds": round(time.perf_counter() - programStartTime), "closed": closing,
+            "responding": watchdogState["stall"] is None, "currentStall": watchdogState["stall"],
+            "runningCallback": running,
+            "lagMS": {"last": round(watchdogLags[-1], 1) if len(lags) > 0 else None,
+                "p95": round(lags[int(len(lags) * 0.95)], 1) if len(lags) > 0 else None,
+                "max": round(lags[-1], 1) if len(lags) > 0 else None},
+            "stallCount": watchdogState["stallCount"], "recentStalls": list(watchdogStalls),
+            "pendingExports": len(pendingExports)}
+
+def writeHealthFile(closing=False):
+    global saveDirectory, healthFileNameStart, kioskName, watchdogState, healthWriteLock
+    # This method writes the health report as JSON to healthFileNameStart plus the kiosk's name in the save directory,
+    # for monitoring to read (so kiosks sharing a save directory each have their own).
+    # It's written under a temporary name first, so it's never read half-written, and only one write happens at a time
+    # (the watchdog thread and closing the program can both write it).
+    healthPath = os.path.join(saveDirectory if saveDirectory else pathlib.Path.home(), f"{healthFileNameStart}{kioskName}.json")
+    with healthWriteLock:
+        try:
+            with open(f"{healthPath}.part", "w") as file:
+                json.dump(getHealthReport(closing), file, indent=1)
+            os.replace(f"{healthPath}.part", healthPath)
+            watchdogState["writeFailed"] = False
+        except OSError as error:
+            # only log the first failure, not one every few seconds while the save directory is down
+            if(not watchdogState["writeFailed"]):
+                logger.warning("Couldn't write the health file %s: %s", healthPath, error)
+            watchdogState["writeFailed"] = True
+
+def runWatchdogMonitor():
+    global watchdogInterval, watchdogStallMS, watchdogHealthDelay, watchdogLock, watchdogState
+    # This method runs on its own thread, so it keeps going while the window is frozen. If the heartbeat is more than
+    # watchdogStallMS late, it writes down the stall with the method the window is stuck in and updates the health file
+    # right away. Otherwise the health file is updated every watchdogHealthDelay seconds.
+    lastWrite = 0
+    while(True):
+        time.sleep(watchdogInterval / 1000)
+        now = time.perf_counter()
+        # while the heartbeat is late, remember which method the window is busy with, in case the stall is too short
+        # to be caught below (see watchdogHeartbeat)
+        running = getRunningCallback() if (now - watchdogState["expected"]) * 1000 > watchdogInterval else None
+        with watchdogLock:
+            behind = (now - watchdogState["expected"]) * 1000
+            if(running is not None):
+                watchdogState["slowCallback"] = running
+            stallStarted = behind > watchdogStallMS and watchdogState["stall"] is None
+            if(stallStarted):
+                stuckCallback = running
+                watchdogState["stall"] = {"start": datetime.fromtimestamp(time.time() - behind / 1000).isoformat(timespec="seconds"),
+                    "callback": stuckCallback}
+        # (the heartbeat can clear the stall as soon as the lock is let go, so use the copy taken while holding it)
+        if(stallStarted):
+            logger.warning("The window has stopped responding (running %s)", stuckCallback)
+        if(stallStarted or now - lastWrite >= watchdogHealthDelay):
+            writeHealthFile()
+            lastWrite = now
+
+#Define function to hide the widget
+def hide_widget(widget):
+   widget.grid_remove()
+
+
+# === SCREEN BUILDERS ===
+# Each screen is only built the first time it's shown (see getScreen), so a normal start only builds the sign-in screen.
+
+#### THE SIGN IN SCREEN                                 ####
+#### PROGRAM NORMALLY BEGINS ON THIS SCREEN             ####
+#### ENTER STUDENT ID OR HIT THE EXPORT REPORT BUTTON   ####
+def buildSigninScreen():
+    global frame_signin, lbl_title, lbl_signinInstructions, ent_sID, btn_signin, lbl_err, lbl_nameSearchInstructions, ent_nameSearch, btn_nameSearch, lst_candidates, btn_exportReport
     frame_signin = tk.Frame(root)
     frame_signin.grid(row=0, column=2, sticky='news')
     frame_signin.columnconfigure(2, weight=5)
@@ -675,6 +3235,7 @@ if __name__ == "__main__":
     # Entry box for ID
     ent_sID = tk.Entry(frame_signin, bd=5, font=entryFont)
     ent_sID.grid(row=9, column=2)
+    ent_sID.bind("<KeyRelease>", scheduleIDCompletions)
  
     # Enter button for ID entry box
     btn_signin = tk.Button(frame_signin, text=signInButtonText, font=smallBoldFont, command=confirmID).grid(row=10,column=2)
@@ -683,13 +3244,31 @@ if __name__ == "__main__":
     lbl_err = tk.Label(frame_signin, font=entryFont, fg="red", pady=pad*5)
     lbl_err.grid(row=12,column=2)
  
+    # Instructional box for the name search
+    lbl_nameSearchInstructions = tk.Label(frame_signin, text=nameSearchInstructionText, font=smallFont, pady=pad).grid(row=20,column=2)
+
+    # Entry box for the name search
+    ent_nameSearch = tk.Entry(frame_signin, bd=5, font=smallFont)
+    ent_nameSearch.grid(row=21, column=2)
+
+    # Search button for name entry box
+    btn_nameSearch = tk.Button(frame_signin, text=nameSearchButtonText, font=smallFont, command=findStudentByName).grid(row=22,column=2)
+
+    # List of students matching the name search or the ID typed so far. Picking one signs in with their ID.
+    lst_candidates = tk.Listbox(frame_signin, font=smallFont, height=nameSearchMaxResults, width=40)
+    lst_candidates.grid(row=23, column=2)
+    lst_candidates.bind("<<ListboxSelect>>", selectCandidate)
+
     # Enter button for ID entry box
     btn_exportReport = tk.Button(frame_signin, text=exportReportButtonText, font=smallFont, command=displayLibrarianPasswordScreen).grid(row=30,column=2)
- 
- 
-    #### THE USER CONFIRMATION SCREEN                   ####
-    #### DISPLAYED WHEN VALID STUDENT ID IS ENTERED     ####
-    #### MUST HIT YES OR NO TO CONFIRM/DENY IDENTITY    ####
+    return frame_signin
+
+
+#### THE USER CONFIRMATION SCREEN                   ####
+#### DISPLAYED WHEN VALID STUDENT ID IS ENTERED     ####
+#### MUST HIT YES OR NO TO CONFIRM/DENY IDENTITY    ####
+def buildConfirmScreen():
+    global frame_confirm, lbl_confirmTitle, lbl_photo, lbl_name, lbl_sID, lbl_grade, lbl_extra, btn_yes, btn_no
     frame_confirm = tk.Frame(root)
     frame_confirm.grid(row=0, column=2, sticky='NEWS')
     frame_confirm.columnconfigure(2, weight=5)
@@ -709,17 +3288,28 @@ if __name__ == "__main__":
     # Grade print
     lbl_grade = tk.Label(frame_confirm, text="", font=dataFont, pady=pad)
     lbl_grade.grid(row=9,column=2)
+
+    # Extra info print (any databaseExtraColumns, one per line)
+    lbl_extra = tk.Label(frame_confirm, text="", font=smallFont, pady=pad)
+    lbl_extra.grid(row=10,column=2)
+
+    # Student photo (if there's a photo directory), to the right of the name/ID/grade
+    lbl_photo = tk.Label(frame_confirm, pady=pad)
+    lbl_photo.grid(row=7,column=3, rowspan=4)
  
     # Yes button
-    btn_yes = tk.Button(frame_confirm, text=confirmYesButtonText, font=smallBoldFont, command=confirmYes).grid(row=10,column=2)
+    btn_yes = tk.Button(frame_confirm, text=confirmYesButtonText, font=smallBoldFont, command=confirmYes).grid(row=11,column=2)
  
     # No button
-    btn_no = tk.Button(frame_confirm, text=confirmNoButtonText, font=smallFont, command=confirmNo).grid(row=11,column=2)
- 
- 
-    #### THE LIBRARIAN PASSWORD SCREEN                  ####
-    #### DISPLAYED WHEN "EXPORT REPORT" BUTTON IS HIT   ####
-    #### LIBRARIAN MUST ENTER OR RESET PASSWORD         ####
+    btn_no = tk.Button(frame_confirm, text=confirmNoButtonText, font=smallFont, command=confirmNo).grid(row=12,column=2)
+    return frame_confirm
+
+
+#### THE LIBRARIAN PASSWORD SCREEN                  ####
+#### DISPLAYED WHEN "EXPORT REPORT" BUTTON IS HIT   ####
+#### LIBRARIAN MUST ENTER OR RESET PASSWORD         ####
+def buildPasswdScreen():
+    global frame_passwd, lbl_passwdTitle, lbl_passErr, ent_libPass, btn_libPassEnter, btn_back, btn_passForgot
     frame_passwd = tk.Frame(root)
     frame_passwd.grid(row=0, column=2, sticky='NEWS')
     frame_passwd.columnconfigure(2, weight=5)
@@ -744,11 +3334,14 @@ if __name__ == "__main__":
  
     # Button for forgot password
     btn_passForgot = tk.Button(frame_passwd, text=changePasswordButtonText, font=smallFont, command=displayPasswordResetScreen).grid(row=11,column=2)
- 
- 
-    #### THE REPORT PRINTOUT SCREEN                             ####
-    #### DISPLAYED WHEN LIBRARIAN ENTERS THEIR PASSWORD         ####
-    #### CONFIRM THE FILE NAME/DIRECTORY AND SAVE THE FILE      ####
+    return frame_passwd
+
+
+#### THE REPORT PRINTOUT SCREEN                             ####
+#### DISPLAYED WHEN LIBRARIAN ENTERS THEIR PASSWORD         ####
+#### CONFIRM THE FILE NAME/DIRECTORY AND SAVE THE FILE      ####
+def buildSaveReportScreen():
+    global frame_saveReport, lbl_exportTitle, txt_report, lbl_dir, btn_changeDir, lbl_fileNameLabel, ent_fileName, lbl_notice, btn_saveFile, btn_exportBack, lbl_database, btn_databaseChange, lbl_reportSearch, ent_reportSearch, btn_reportSearch, lbl_reportSearchResults
     frame_saveReport = tk.Frame(root)
     frame_saveReport.grid(row=0, column=2, sticky='NEWS')
     frame_saveReport.columnconfigure(0, weight=5)
@@ -760,8 +3353,15 @@ if __name__ == "__main__":
     lbl_exportTitle.grid(row=0,column=0)
  
     # Report preview
-    lbl_report = tk.Label(frame_saveReport, text=reportPreviewHeadingText, font=smallFont, anchor="e", pady=pad)
-    lbl_report.grid(row=0,column=2)
+    # Only the records that fit in the box are ever put in it (see showReportPreview), so long reports open instantly.
+    txt_report = scrolledtext.ScrolledText(frame_saveReport, font=reportPreviewFont, height=reportPreviewLines, width=60, wrap="none")
+    txt_report.grid(row=0,column=2, rowspan=13)
+    # the scrollbar and mouse wheel move through the whole report, not just the lines in the box
+    txt_report.vbar.config(command=scrollReportPreview)
+    txt_report.config(yscrollcommand=updateReportScrollbar)
+    txt_report.bind("<MouseWheel>", scrollReportPreviewWheel)
+    txt_report.bind("<Button-4>", scrollReportPreviewWheel)
+    txt_report.bind("<Button-5>", scrollReportPreviewWheel)
  
     # save path directory
     lbl_dir = tk.Label(frame_saveReport, text=f"{saveDirectoryBeginningText}\n{saveDirectory}", font=smallFont, pady=pad)
@@ -797,11 +3397,28 @@ if __name__ == "__main__":
     # Update database button
     btn_databaseChange = tk.Button(frame_saveReport, text=changeDatabaseText, font=smallFont, command=changeDatabasePath).grid(row=12,column=0)
 
+    # Past report search label
+    lbl_reportSearch = tk.Label(frame_saveReport, text=reportSearchLabelText, font=smallFont, pady=pad)
+    lbl_reportSearch.grid(row=1,column=1)
 
- 
-    #### THE CREATE LIBRARIAN PASSWORD SCREEN                                   ####
-    #### DISPLAYED WHEN "RESET PASSWORD" IS SELECTED OR IF NO PASSWORD IS SET   ####
-    #### LIBRARIAN MUST ENTER OLD PASSWORD AND SET NEW PASSWORD TO CHANGE       ####
+    # Entry box for the past report search
+    ent_reportSearch = tk.Entry(frame_saveReport, bd=5, font=smallFont)
+    ent_reportSearch.grid(row=2, column=1)
+
+    # Past report search button
+    btn_reportSearch = tk.Button(frame_saveReport, text=reportSearchButtonText, font=smallFont, command=findReports).grid(row=3,column=1)
+
+    # Past report search results
+    lbl_reportSearchResults = tk.Label(frame_saveReport, text="", font=smallFont, pady=pad)
+    lbl_reportSearchResults.grid(row=4,column=1, rowspan=6)
+    return frame_saveReport
+
+
+#### THE CREATE LIBRARIAN PASSWORD SCREEN                                   ####
+#### DISPLAYED WHEN "RESET PASSWORD" IS SELECTED OR IF NO PASSWORD IS SET   ####
+#### LIBRARIAN MUST ENTER OLD PASSWORD AND SET NEW PASSWORD TO CHANGE       ####
+def buildPasswdCreateScreen():
+    global frame_passwdCreate, lbl_passwdTitle, lbl_passCreateInstructions, lbl_newPassErr, lbl_passOld, ent_pass0, lbl_passNew, ent_pass1, ent_pass2, btn_libPassUpdate, btn_libPassBack
     frame_passwdCreate = tk.Frame(root)
     frame_passwdCreate.grid(row=0, column=2, sticky='NEWS')
     frame_passwdCreate.columnconfigure(2, weight=5)
@@ -840,11 +3457,13 @@ if __name__ == "__main__":
  
     # back button to return to sign-in screen
     btn_libPassBack = tk.Button(frame_passwdCreate, text=backButtonText, font=smallFont, command=clearAndDisplayLogin).grid(row=12,column=2)
- 
+    return frame_passwdCreate
 
- 
-    #### THE INITIAL SETUP SCREEN                                               ####
-    #### REQUIRES LIBRARIAN TO CREATE A PASSWORD AND DECIDE SAVE LOCATION       ####
+
+#### THE INITIAL SETUP SCREEN                                               ####
+#### REQUIRES LIBRARIAN TO CREATE A PASSWORD AND DECIDE SAVE LOCATION       ####
+def buildInitSetupScreen():
+    global frame_initSetup, lbl_initTitle, lbl_initInstructions, lbl_initPrintText, lbl_passNew, ent_passInit1, ent_passInit2, lbl_currDir, btn_currDirChange, lbl_currData, btn_currDataChange, btn_initSetupConfirm
     frame_initSetup = tk.Frame(root)
     frame_initSetup.grid(row=0, column=2, sticky='NEWS')
     frame_initSetup.columnconfigure(2, weight=5)
@@ -888,12 +3507,14 @@ if __name__ == "__main__":
 
     # back button to return to sign-in screen
     btn_initSetupConfirm = tk.Button(frame_initSetup, text=finishSetupButtonText, font=smallFont, command=updatePassAndDir).grid(row=14,column=2)
+    return frame_initSetup
 
 
-
-    #### THE ERROR FIXTURE SCREEN                       ####
-    #### ASKS LIBRARIAN TO FIX PROBLEM WITH DATA        ####
-    #### (Password, Save directory, or database file)   ####
+#### THE ERROR FIXTURE SCREEN                       ####
+#### ASKS LIBRARIAN TO FIX PROBLEM WITH DATA        ####
+#### (Password, Save directory, or database file)   ####
+def buildErrorScreen():
+    global frame_error, lbl_errorTitle, lbl_errorInstructions, lbl_errorSetupText, lbl_passError, ent_passError1, ent_passError2, lbl_errDir, btn_errDirChange, lbl_errData, btn_errDataChange, btn_errFixPass, btn_errFixSave, btn_errFixData
     frame_error = tk.Frame(root)
     frame_error.grid(row=0, column=2, sticky='NEWS')
     frame_error.columnconfigure(2, weight=5)
@@ -950,17 +3571,555 @@ if __name__ == "__main__":
     # back button to return to sign-in screen
     btn_errFixData = tk.Button(frame_error, text=fixErrorButtonText, font=smallFont, command=fixDatabase)
     btn_errFixData.grid(row=14,column=2)
+    return frame_error
+
+
+# === GUI SETUP AND MAIN CODE SECTION === 
+if __name__ == "__main__":
+    # how long each part of startup took (see markStartupPhase). Everything before this point is the imports.
+    startupPhases = []
+    markStartupPhase("imports")
+    # if the window takes longer than startupBudgetMS milliseconds to be ready, a warning is printed.
+    # Run with --profile-startup to also save how long each part took to startupProfileFileName in the save directory.
+    startupBudgetMS = 3000
+    startupProfileFileName = "SH Startup Profile.txt"
+    # The variable declarations below is just setting up the fundamentals of the sign-in window. The variables above are simply for ease of locating.
+    # The window dimensions and padding (space  between screen elements) are measured in pixels.
+    windowWidth = 1440
+    windowHeight = 810
+    universalFont = "Arial"
+    
+    # these numbers represent the minimum and maximum amount of numbers to allow for an ID
+    minDigits = 4
+    maxDigits = 7
 
+    # the lowest and highest grade a student in the database can be in (0 is kindergarten)
+    minGrade = 0
+    maxGrade = 12
 
+    # settings for the "find me by name" search on the sign-in screen.
+    # the search needs at least nameSearchMinChars letters, shows the best nameSearchMaxResults students,
+    # and forgives up to nameSearchMaxTypos typos per word (fewer for short words).
+    # To stay within nameSearchBudgetMS milliseconds on a big roster, it looks at no more than nameSearchMaxCandidates
+    # students, and the typo search gives up after nameSearchMaxRows steps (names starting with the same letter go first).
+    # Run with --benchmark-name-search to check the times.
+    nameSearchMinChars = 2
+    nameSearchMaxResults = 5
+    nameSearchMaxTypos = 2
+    nameSearchBudgetMS = 10
+    nameSearchMaxCandidates = 50
+    nameSearchMaxRows = 1000
 
+    # settings for the ID suggestions shown while typing in the ID box.
+    # suggestions appear once minDigits digits are typed, at most autocompleteMaxResults at a time,
+    # and only after no key has been pressed for autocompleteDelay milliseconds.
+    autocompleteMaxResults = 5
+    autocompleteDelay = 150
+    autocompleteJob = None
+ 
+    # Easy place to access most the text used in the program
+    # Title strings
+    windowTitle = "Study Hall Sign-in"
+    confirmTitle = "Is this you?"
+    libPassText = "Enter Librarian Password to continue"
+    libPassCreateText = "Create a Librarian Password"
+    initSetupText = "Initial Setup Screen"
+    errorText = "An error occured"
+    exportTitleText = "Export Report"
+ 
+    
+    signInInstructionText = "Type in your Student ID below to sign into Study Hall"
+    nameSearchInstructionText = "Forgot your ID? Type your name below instead"
+    libPassCreateDescText = "This will be entered by the librarian\nto authorize the exporting of the sign-in report."
+    initSetupDescText = "Please have the librarian/operator set up the program."
+    errorDescDefaultText = "DEFAULT ERROR MESSAGE."
+    errorDescPasswordText = "The password could not be found.\nPlease recreate the password below."
+    errorDescSaveText = "The saving directory for reports has been moved or deleted.\nPlease relocate the directory or specify a new one below."
+    errorDescDatabaseText = "The Student Database file has been moved or deleted.\nPlease relocate the database or specify a new one below."
 
+    exportNoticeText = "Saving this file will restart the sign-in log"
  
+    enterPassOldText = "Enter old password"
+    enterPassNewText = "Enter new password twice"
+    enterPassCreateText = "Create password (type it twice)"
+    saveDirectoryBeginningText = "Current saving directory:"
+    databaseBeginningText = "Current database file:"
+    currentFileNameLabelText = "Current file name: (type to change)"
+    directoryPopupText = "Select Folder to Save Report to"
+    databasePopupText = "Select Database File"
+    reportPreviewHeadingText = "Preview of Report:"
+    # how many lines of the report the preview box shows at a time
+    reportPreviewLines = 20
+    reportPreviewTop = 0
+    reportSearchLabelText = "Find past reports (Student ID or date like 03-14):"
+    reportSearchInvalidText = "Type a Student ID or a date like 03-14"
+    reportSearchNoneText = "No reports found"
+    reportSearchResultLimit = 10
+ 
+    signInExportSuccessfulText = "Sign in report successfully exported"
+    signInExportSavingText = "Saving the sign in report..."
+    signInExportBackupOnlyText = "Save location unavailable. Report saved to the backup folder\nand will be copied over when it's back."
+    librarianPassUpdateText = "Librarian password updated successfully"
+    signInSuccessfulText = "Successfully signed in. Enjoy your time in study hall!"
+    oldPasswordBlankText = "Leave \"old password\" space blank"
+ 
+    incorrectPasswordText = "Incorrect password"
+    oldPasswordIncorrectText = "Incorrect old password"
+    newPasswordIncorrectText = "New passwords do not match"
+    createPasswordIncorrectText = "Passwords do not match"
+    passwordTooShortText = "Password too short. It must be more than 4 characters."
+    invalidInputText = "Couldn't get an ID from that.\nRemove any letters and/or spaces and try again."
+    nameSearchTooShortText = f"Type at least {nameSearchMinChars} letters of your name to search."
+    noNameMatchText = "No student with that name was found.\nCheck for typos or ask for assistance."
+    pickYourNameText = "Pick your name from the list below."
+    noStudentFoundText1 = "No student with ID #"
+    noStudentFoundText2 = " was found.\nCheck for typos or ask for assistance."
+    tooManyDigitsStartText = "Too many digits."
+    tooFewDigitsStartText = "Too few digits."
+    invalidDigitCountSharedText = f"Student ID's must be {minDigits}-{maxDigits} digits long."
+ 
+    signInButtonText = "Sign in"
+    nameSearchButtonText = "Find me by name"
+    confirmYesButtonText = "Yes"
+    confirmNoButtonText = "No"
+    backButtonText = "Back"
+    finishSetupButtonText = "Complete Setup"
+    fixErrorButtonText = "Continue"
+    changePasswordButtonText = "Change Password"
+    librarianPasswordEnterButtonText = "Continue"
+    changeDirectoryText = "Change Directory"
+    changeDatabaseText = "Change Database File"
+    saveFileButtonText = "Save File"
+    reportSearchButtonText = "Find Reports"
+    updatePasswordButtonText = "Change"
+    exportReportButtonText = "Librarian Mode"
+ 
+    reportStartExportText = "Report START from PREVIOUS REPORT EXPORT on "
+    reportStartProgramText = "Report START from PROGRAM START on "
+    reportExportStart = "Report exported "
+    reportExportManualText = "MANUALLY by librarian "
+    reportExportAutomaticText = "AUTOMATICALLY due to program shutdown "
+    reportChangePassword = "Password was UPDATED at "
+    reportChangeSave = "Report save location was UPDATED at "
+    reportChangeDatabase = "Student Database was UPDATED at "
+    reportRosterChangesText = "Roster changes: "
+    rosterLoadingText = "(Loading...)"
+    rosterLoadFailedText = "Couldn't load those roster files. Still using the old roster."
+    reportRejectedRowsText = "Student Database check: "
+    duplicateIDProblemText = "ID is already used by an earlier row"
+    rejectsFileEnding = " REJECTED ROWS.csv"
+    reportDuplicateIDsText = "Duplicate Student IDs found in more than one database file (first file kept): "
+
+    
+    defaultFileNameStart = "SH Signin Report "
+    attendanceByStudentFileName = "SH Attendance by Student.csv"
+    attendanceByDayFileName = "SH Attendance by Day.csv"
+    manifestFileName = "SH Report Manifest.jsonl"
+    manifestLock = threading.Lock()
+    archiveFileNameStart = "SH Signin Archive "
+    # how exported reports are saved: None for plain .txt files, or "gzip" (.txt.gz) or "lzma" (.txt.xz) to compress them.
+    # Reports from past months can be rolled up into monthly archives compressed with archiveCompression ("gzip" or "lzma"),
+    # either with --archive-reports or automatically in the background at startup if archiveReportsOnStartup is True.
+    # reportCompressionLevel goes from 0 (fastest) to 9 (smallest). Run with --benchmark-compression to compare them.
+    reportCompression = None
+    archiveCompression = "lzma"
+    reportCompressionLevel = 6
+    archiveReportsOnStartup = False
+    reportFileEndings = {None: ".txt", "gzip": ".txt.gz", "lzma": ".txt.xz"}
+
+    # shared log mode, for more than one sign-in kiosk in the same study hall.
+    # Every kiosk with the same save directory (e.g. a network folder) adds its sign-ins to one log file per day,
+    # named sharedLogFileNameStart plus the date. kioskName tells the kiosks apart in the log.
+    # Sign-ins are written in batches every sharedLogFlushDelay milliseconds.
+    sharedLogEnabled = False
+    sharedLogFileNameStart = "SH Shared Signin Log "
+    kioskName = socket.gethostname()
+    sharedLogFlushDelay = 2000
+    sharedLogBuffer = deque()
+    sharedLogFlushLock = threading.Lock()
+    kioskNumber = 0
+
+    # sending sign-ins to a central attendance server.
+    # Sign-ins wait in syncQueueFileName (next to the preferences file) until the server at syncServerURL has them,
+    # so the kiosk works the same with or without a network. They're sent syncBatchSize at a time.
+    # After a failed send it waits syncRetryBaseDelay seconds, doubling each time up to syncRetryMaxDelay.
+    # syncTransport is the method that sends a batch (see sendOverHTTP); it can be swapped for another kind of server.
+    # Run with --sync-test-server to start a stand-in server on this computer, and --sync-status to see what's waiting.
+    syncEnabled = False
+    syncServerURL = "http://127.0.0.1:8765/signins"
+    syncQueueFileName = "SH Sync Queue.db"
+    syncBatchSize = 100
+    syncTimeout = 5
+    syncRetryBaseDelay = 1.0
+    syncRetryMaxDelay = 300.0
+    syncPollDelay = 1.0
+    syncTransport = sendOverHTTP
+    syncTestServerFileName = "SH Test Server Signins.jsonl"
+    syncInbox = queue.Queue()
+    syncStopEvent = threading.Event()
+    syncMetrics = {}
+
+    # a small JSON query server on this computer, so the front office can ask who's in the library:
+    #   /signed-in?id=12345    whether a student signed in today (and when they last did)
+    #   /occupants             the students who signed in within the last queryOccupantMinutes minutes (there's no signing out)
+    #   /signins?since=10:30   today's sign-ins since a time (24 hour time, or a date and time), up to querySigninsLimit of them
+    # It runs on its own thread and answers from indexes kept up as students sign in (see addToQueryIndex).
+    # Only this computer can reach it unless queryHost is changed (e.g. to "0.0.0.0").
+    # Run with --query-load-test to see how fast it answers with many clients at once.
+    queryServerEnabled = False
+    queryHost = "127.0.0.1"
+    queryPort = 8766
+    queryOccupantMinutes = 60
+    querySigninsLimit = 1000
+    queryIndexLock = threading.Lock()
+    queryIndexDay = None
+    querySignins = []
+    querySigninTimes = []
+    queryLastSignin = {}
+
+    # the watchdog checks the window keeps responding: every watchdogInterval milliseconds the window answers a heartbeat,
+    # and when it's more than watchdogStallMS late, that's written down as a stall along with the method that was running
+    # (like saveFile or changeDatabasePath). How the window is doing is written to healthFileNameStart plus kioskName
+    # in the save directory every watchdogHealthDelay seconds, and right away when a stall starts, for monitoring to read.
+    # It's off unless turned on here, since it writes a file into the (maybe shared) save directory.
+    watchdogEnabled = False
+    watchdogInterval = 250
+    watchdogStallMS = 1000
+    watchdogHealthDelay = 10
+    healthFileNameStart = "SH Kiosk Health "
+    watchdogLock = threading.Lock()
+    watchdogLags = deque(maxlen=240)
+    watchdogStalls = deque(maxlen=50)
+    watchdogState = {"expected": 0.0, "stall": None, "stallCount": 0, "slowCallback": None, "writeFailed": False}
+    healthWriteLock = threading.Lock()
+
+    # methods called when things happen in the program (see addHook), by event name:
+    # "signin" (a student confirmed their sign-in), "signout" (not sent yet, there's no way to sign out),
+    # "export" (a report was saved), and "admin" (the password, save location, or roster files were changed).
+    # Hooks run on hookWorkers background threads, with at most hookQueueLimit calls waiting.
+    # A hook that takes longer than hookDefaultTimeout seconds gets a new thread started in its place (so the others
+    # aren't held up), and one that's that slow hookMaxTimeouts times is turned off.
+    # When the program closes, it waits at most hookShutdownTimeout seconds for the last hook calls to finish.
+    eventHooks = {"signin": [], "signout": [], "export": [], "admin": []}
+    hookWorkers = 4
+    hookQueueLimit = 1000
+    hookDefaultTimeout = 2.0
+    hookMaxTimeouts = 3
+    hookShutdownTimeout = 5.0
+    hookPool = queue.Queue()
+    hookLock = threading.Lock()
+    hookPending = 0
+    startHookWorkers(hookWorkers)
+
+    # settings for the made-up bell rush in --load-test.
+    # A student takes about loadTestSigninSeconds at the kiosk to sign in (type the ID and confirm), or about
+    # loadTestErrorSeconds to read an error, and students give up if loadTestQueueLimit students are already in line.
+    # loadTestMistakeRates is the chance of each kind of mistake:
+    # a student scanning again, letters in the ID, too few or too many digits, and an ID that isn't in the roster.
+    loadTestSigninSeconds = 3.0
+    loadTestErrorSeconds = 2.0
+    loadTestQueueLimit = 10
+    loadTestMistakeRates = {"repeat": 0.05, "invalid": 0.02, "tooFew": 0.02, "tooMany": 0.02, "unknown": 0.02}
+
+    # how many student IDs of each kind of roster change to list in the report, and
+    # how often (in milliseconds) to check if new roster files are done loading in the background
+    rosterChangeReportLimit = 20
+    rosterCheckDelay = 100
+    rosterLoading = False
+    rosterLoadingPaths = []
+    rosterLoadResults = queue.Queue()
+
+    # every report is saved to exportBackupDirectory on this computer first, then copied to the save directory and
+    # any other exportDestinations (e.g. a USB drive) at the same time. Each copy gets exportTimeout seconds.
+    # Copies that fail or time out are tried again every exportRetryDelay milliseconds from the backup copy.
+    # The copies are made on a background thread, and the window checks every exportCheckDelay milliseconds if they're done.
+    # Only the newest exportBackupKeep reports are kept in the backup folder (plus any that still have to be copied).
+    exportBackupDirectory = os.path.join(pathlib.Path.home(), "SH Report Backups")
+    exportDestinations = []
+    exportTimeout = 10
+    exportRetryDelay = 60000
+    pendingExportsFileName = "SH Pending Exports.json"
+    pendingExportsLock = threading.Lock()
+    exportRetryLock = threading.Lock()
+    pendingExports = []
+    exportsInProgress = {}
+    exportCheckDelay = 200
+    exportResults = queue.Queue()
+    exportBackupKeep = 200
+
+    # split exported reports into one file per group too: None (don't), "grade", "period", or "hour".
+    # The split reports go in a folder next to the full report, with an index file. Periods start at the
+    # times in periodStartTimes (24 hour time). Run with --benchmark-grouped-export to time it.
+    reportGroupBy = None
+    periodStartTimes = [("1", "07:30"), ("2", "08:25"), ("3", "09:20"), ("4", "10:15"), ("5", "11:10"), ("6", "12:35"), ("7", "13:30"), ("8", "14:25")]
+
+    # optional student photos on the Confirmation screen, from a folder of <Student ID>.png or .gif files
+    # (None to turn them off). Photos are shrunk to fit photoMaxSize pixels, and up to photoCacheMB megabytes
+    # of them are kept ready. Photos of students suggested by the ID or name search are read ahead of time,
+    # keeping the bytes for the last photoPrefetchLimit of them. A student without a photo is looked for again
+    # after photoMissSeconds.
+    photoDirectory = None
+    photoMaxSize = 200
+    photoCacheMB = 32
+    photoPrefetchLimit = 50
+    photoCheckDelay = 50
+    photoCache = OrderedDict()
+    photoCacheBytes = 0
+    photoBytes = OrderedDict()
+    photoMissSeconds = 300
+    photoMisses = {}
+    photoRequests = set()
+    photoLock = threading.Lock()
+    photoPool = queue.Queue()
+    startPhotoReader()
+    currentPhoto = None
+    initalSetup = False
+ 
+    # set up various font configurations
+    titleFont = (universalFont, 50, "bold")
+    largeFont = (universalFont, 35)
+    dataFont = (universalFont, 25, "bold")
+    entryFont = (universalFont, 25)
+    smallFont = (universalFont, 20)
+    smallBoldFont = (universalFont, 20, "bold")
+    reportPreviewFont = (universalFont, 14)
+
+ 
+    # variables used for files
+    preferencesFileName = "preferences.ini"
+    if(os.path.isfile(preferencesFileName)):
+        (encPass, saveDirectory, databasePaths) = openPreferences(preferencesFileName)
+        encPass = encPass.strip()
+        saveDirectory = saveDirectory.strip()
+        databasePaths = [filename.strip() for filename in databasePaths if filename.strip() != ""]
+        databaseName = getDatabaseNames(databasePaths)
+        initialSetup = False
+        
+        noPass = False
+        noSave = False
+        noData = False
+        if(encPass is ""):
+            noPass = True
+        if(not os.path.isdir(saveDirectory)):
+            noSave = True
+        if(len(databasePaths) == 0 or not all([os.path.isfile(filename) for filename in databasePaths])):
+            noData = True
+
+    else:
+        (encPass, saveDirectory, databasePaths) = openPreferences(preferencesFileName)
+        encPass = None
+        saveDirectory = None
+        databasePaths = []
+        databaseName = None
+        initialSetup = True
+        noPass = False
+        noSave = False
+        noData = False
+    markStartupPhase("preferences")
+
+    # settings for the log of what the program does (see setupLogging).
+    # logLevel can be "DEBUG" (everything, including the whole roster), "INFO" (sign-ins, saves, and changes), "WARNING", or "ERROR".
+    logLevel = "INFO"
+    logFileNameStart = "SH Signin Log "
+    logFileMaxKB = 1024
+    logFileBackups = 3
+    setupLogging(saveDirectory if saveDirectory else pathlib.Path.home())
+
+    # print(noPass, noSave, noData)
+
+    # print(encPass, saveDirectory, databasePaths)
+    databaseHeaderLine = 0
+    databaseSortBy = "ID"
+    # which column in the database file holds each piece of student info, e.g. "Last Name": "Student Last Name".
+    # Change the right-hand side to match the headers of the database file. Only these columns are loaded.
+    databaseColumns = {"ID": "ID", "Last Name": "Last Name", "First Name": "First Name", "Grade": "Grade"}
+    # any other columns to show on the confirmation screen to help confirm identity (e.g. "Homeroom")
+    databaseExtraColumns = []
+    # whether to read the database files in blocks instead of all at once (True, False, or "auto").
+    # "auto" only reads in blocks when a file is too big to load at once within databaseMemoryBudgetMB megabytes.
+    # Database files can also be gzip compressed (.csv.gz).
+    databaseChunkedIngest = "auto"
+    databaseMemoryBudgetMB = 256
+    # roster files that were already opened, so unchanged files aren't read again when the rosters are reloaded
+    rosterCache = {}
+    # compact mode: once the search indexes are built, keep the roster as plain columns instead of a pandas table
+    # (IDs in one number array, names shared between students, one byte per grade) to use less memory.
+    # The roster files opened last time aren't kept either, so reloading the rosters reads every file again.
+    # Run with --roster-rss-report to compare the memory used with and without it.
+    compactRosterMode = False
+    # memory-mapped roster mode, for very big roster files: at startup only the ID of each row and where the row starts
+    # in the file are read (and saved in rosterIndexCacheDirectory in the home folder, so the next start skips even that unless the file
+    # changed). A student's row is only read from the file when they're looked up, and only checked then, so there's
+    # no rejects file for blank names or bad grades. Name search isn't available in this mode (it needs every name),
+    # and compressed (.csv.gz) roster files are loaded normally.
+    mappedRosterMode = False
+    rosterIndexCacheDirectory = os.path.join(pathlib.Path.home(), "SH Roster Index Cache")
+    # how many duplicated IDs to list in the report before summarizing the rest
+    duplicateIDReportLimit = 20
+ 
+    # visual padding standard
+    pad = 15
+    
+    #### COMMAND LINE TOOLS                                        ####
+    #### RUN INSTEAD OF THE SIGN-IN WINDOW WHEN GIVEN AS AN OPTION  ####
+    # the save directory the reports are in (the home folder if none was picked yet)
+    reportDirectory = saveDirectory if saveDirectory else pathlib.Path.home()
+    # --roster-memory-report: print how much memory the rosters take
+    if("--roster-memory-report" in sys.argv):
+        reportDatabaseMemory(databasePaths, databaseHeaderLine, databaseSortBy)
+        sys.exit()
+    # --roster-rss-report [student counts...]: compare the memory used by made-up rosters as a table, compact, and memory-mapped
+    if("--roster-rss-report" in sys.argv):
+        reportRosterMemory([int(count) for count in sys.argv[sys.argv.index("--roster-rss-report") + 1:]] or [100000, 1000000])
+        sys.exit()
+    # (used by --roster-rss-report to measure each roster in its own process)
+    if("--roster-rss-child" in sys.argv):
+        childArguments = sys.argv[sys.argv.index("--roster-rss-child") + 1:]
+        measureRosterMemory(int(childArguments[0]), childArguments[1])
+        sys.exit()
+    # --analyze-reports: make attendance tables out of every exported report in the save directory
+    if("--analyze-reports" in sys.argv):
+        analyzeReports(reportDirectory)
+        sys.exit()
+    # --rebuild-manifest: remake the report manifest from the reports in the save directory
+    if("--rebuild-manifest" in sys.argv):
+        rebuildManifest(reportDirectory)
+        sys.exit()
+    # --archive-reports: roll up reports from past months into monthly compressed archives
+    if("--archive-reports" in sys.argv):
+        archiveOldReports(reportDirectory)
+        sys.exit()
+    # --benchmark-compression: compare report sizes and write times for each compression level
+    if("--benchmark-compression" in sys.argv):
+        benchmarkCompression(reportDirectory)
+        sys.exit()
+    # --show-report <report name>: print a saved report, even if it's compressed or in an archive
+    if("--show-report" in sys.argv):
+        print(readReportText(os.path.join(reportDirectory, " ".join(sys.argv[sys.argv.index("--show-report") + 1:]))))
+        sys.exit()
+    # --sync-test-server [port]: run a stand-in attendance server on this computer for testing the sync
+    if("--sync-test-server" in sys.argv):
+        portArguments = sys.argv[sys.argv.index("--sync-test-server") + 1:]
+        runSyncTestServer(int(portArguments[0]) if len(portArguments) > 0 else 8765, reportDirectory)
+        sys.exit()
+    # --query-load-test [clients] [queries per client] [sign-ins]: time the query server with many clients asking at once
+    if("--query-load-test" in sys.argv):
+        queryArguments = sys.argv[sys.argv.index("--query-load-test") + 1:] + [None, None, None]
+        runQueryLoadTest(int(queryArguments[0] or 50), int(queryArguments[1] or 200), int(queryArguments[2] or 2000))
+        sys.exit()
+    # --sync-status: print how many sign-ins are waiting to be sent to the attendance server
+    if("--sync-status" in sys.argv):
+        syncConnection = openSyncQueue(syncQueueFileName)
+        syncStatus = getSyncMetrics(syncConnection)
+        print(f"{syncStatus['queued']} sign-in(s) waiting, oldest waiting {syncStatus['oldestWait']:.0f} s")
+        sys.exit()
+    # --load-test [students] [seconds] [students per second]: run a made-up bell rush against a made-up roster
+    if("--load-test" in sys.argv):
+        loadTestArguments = sys.argv[sys.argv.index("--load-test") + 1:] + [None, None, None]
+        runLoadTestCommand(int(loadTestArguments[0] or 2000), float(loadTestArguments[1] or 600), float(loadTestArguments[2] or 0.3))
+        sys.exit()
+    # --benchmark-name-search [students] [searches]: time the name search on a made-up roster
+    if("--benchmark-name-search" in sys.argv):
+        searchArguments = sys.argv[sys.argv.index("--benchmark-name-search") + 1:] + [None, None]
+        benchmarkNameSearch(int(searchArguments[0] or 500000), int(searchArguments[1] or 200))
+        sys.exit()
+    # --benchmark-grouped-export [records]: time saving a made-up day as one report and split up by each kind of group
+    if("--benchmark-grouped-export" in sys.argv):
+        groupArguments = sys.argv[sys.argv.index("--benchmark-grouped-export") + 1:] + [None]
+        benchmarkGroupedExport(int(groupArguments[0] or 50000))
+        sys.exit()
+    # --find-reports <Student ID or date>: list the reports with that student or from that day
+    if("--find-reports" in sys.argv):
+        (studentID, day) = parseReportQuery(" ".join(sys.argv[sys.argv.index("--find-reports") + 1:]))
+        if(studentID is None and day is None):
+            print(reportSearchInvalidText)
+        for reportName in queryManifest(reportDirectory, studentID, day):
+            print(reportName)
+        sys.exit()
+
+    # get data from all the files needed (student database and preferences file)
+    if(len(databasePaths) > 0 and not noData and not initialSetup ):
+        (database, databaseReportLines) = loadDatabases(databasePaths)
+    else:
+        database = None
+        databaseReportLines = []
+    markStartupPhase("roster load")
+  
+    # the whole roster is only written out when logging at the DEBUG level
+    logger.debug("Roster:\n%s", database)
+    markStartupPhase("roster log")
+
+    # build the ID and name search indexes from the student database
+    databaseIDs = buildIDIndex(database)
+    (nameIndexKeys, nameIndexRows, nameIndexUnique, nameIndexRowNames) = buildNameIndex(database)
+    candidateIDs = []
+    markStartupPhase("search indexes")
+    # in compact mode, the pandas table isn't needed anymore once the indexes are built
+    if(compactRosterMode):
+        database = compactRoster(database, databaseIDs)
+        rosterCache.clear()
+        markStartupPhase("compact roster")
+ 
+    # if there's nothing recorded for the save directory, set it to the user's Desktop by default
+    if(saveDirectory == ""):
+        #set default to desktop
+        # saveDirectory = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
+        saveDirectory = pathlib.Path.home()
+        updateDirectoryInFile()
+
+    # roll up reports from past months in the background so the sign-in window doesn't have to wait
+    if(archiveReportsOnStartup and not initialSetup):
+        threading.Thread(target=archiveOldReports, args=(saveDirectory,), daemon=True).start()
+ 
+    # initialize the sign-in record list with a report timestamp
+    bootupDateTime = datetime.now()
+    bootupDateTimeFormatted = bootupDateTime.strftime("%m/%d/%y at %I:%M %p")
+    initRecordText = f"{reportStartProgramText}{bootupDateTimeFormatted}."
+    # print(initRecordText)
+    currentRecords = [initRecordText]
+    # note any rejected roster rows and any student IDs that were in more than one roster file
+    currentRecords.extend(databaseReportLines)
+ 
+    # reformat the program startup time to be shorter and used for the default report file name 
+    bootupTimeFormat2 = bootupDateTime.strftime("%m-%d ")
+    saveFileName = f"{defaultFileNameStart}{bootupTimeFormat2}Period _"
+ 
+    # variables used for displaying the name of the user signing in
+    currentFName = ""
+    currentLName = ""
+    currentSID = 0
+    currentGrade = 0
+    currentExtras = []
+    
+
+
+    markStartupPhase("records setup")
+
+    # INITIALIZE THE WINDOW
+    root = tk.Tk()
+    root.wm_geometry(f"{windowWidth}x{windowHeight}")
+    root.title(windowTitle)
+    root.columnconfigure(2, weight=10)
+
+    # every screen in the window and the method that builds it (see the SCREEN BUILDERS section).
+    # A screen is only built the first time it's shown, so the error and setup screens are never built on a normal start.
+    screenBuilders = {
+        "signin": buildSigninScreen,
+        "confirm": buildConfirmScreen,
+        "passwd": buildPasswdScreen,
+        "saveReport": buildSaveReportScreen,
+        "passwdCreate": buildPasswdCreateScreen,
+        "initSetup": buildInitSetupScreen,
+        "error": buildErrorScreen,
+    }
+    builtScreens = {}
+    
     #### STARTUP SCREEN SETUP ####
     if(initialSetup):
         # if this is the first time starting up the program, display the initial setup screen
-        frame_initSetup.tkraise()
+        showScreen("initSetup")
     elif(noPass):
-        frame_error.tkraise()
+        showScreen("error")
         lbl_errorInstructions.config(text=errorDescPasswordText)
         hide_widget(lbl_errDir)
         hide_widget(btn_errDirChange)
@@ -969,7 +4128,7 @@ if __name__ == "__main__":
         hide_widget(btn_errFixSave)
         hide_widget(btn_errFixData)
     elif(noSave):
-        frame_error.tkraise()
+        showScreen("error")
         lbl_errorInstructions.config(text=errorDescSaveText)
         hide_widget(lbl_passError)
         hide_widget(ent_passError1)
@@ -979,7 +4138,7 @@ if __name__ == "__main__":
         hide_widget(btn_errFixPass)
         hide_widget(btn_errFixData)
     elif(noData):
-        frame_error.tkraise()
+        showScreen("error")
         lbl_errorInstructions.config(text=errorDescDatabaseText)
         hide_widget(lbl_passError)
         hide_widget(ent_passError1)
@@ -990,7 +4149,36 @@ if __name__ == "__main__":
         hide_widget(btn_errFixPass)
     else:
         # open to the sign-in screen
-        frame_signin.tkraise()
+        showScreen("signin")
+
+    markStartupPhase("GUI build")
+
+    # start adding sign-ins to the shared log, continuing this kiosk's numbers from the last time it ran today
+    if(sharedLogEnabled and not initialSetup and not noSave):
+        kioskNumber = findLastKioskNumber(getSharedLogPath(datetime.now()), kioskName)
+        root.after(sharedLogFlushDelay, scheduleSharedLogFlush)
+
+    # keep trying to copy reports that couldn't be saved everywhere last time
+    pendingExports = loadPendingExports()
+    root.after(0, scheduleExportRetries)
+
+    # start sending sign-ins to the attendance server in the background
+    if(syncEnabled):
+        syncThread = threading.Thread(target=runSyncWorker, daemon=True)
+        syncThread.start()
+
+    # answer the front office's questions about who's signed in
+    if(queryServerEnabled):
+        startQueryServer(queryHost, queryPort)
+
+    # start watching for the window freezing up
+    if(watchdogEnabled):
+        watchdogState["expected"] = time.perf_counter() + watchdogInterval / 1000
+        root.after(watchdogInterval, watchdogHeartbeat, watchdogState["expected"])
+        threading.Thread(target=runWatchdogMonitor, daemon=True).start()
+
+    # print how long it took from starting the program until the window could be used
+    root.after_idle(finishStartupProfile)
     
     # begin the window loop to keep the window open
     root.mainloop()
@@ -1000,5 +4188,20 @@ if __name__ == "__main__":
     # (aka it has more than just the Log Start time inside it.) 
     if(len(currentRecords) > 1):
         saveFile(True)
+    if(watchdogEnabled):
+        writeHealthFile(closing=True)
+    # give the hooks a little while to finish with the last events (like the report saved above), then
+    # stop the sync thread, letting it save any sign-ins that haven't gone into the queue file yet
+    cancelPhotoReads()
+    waitForHooks(hookShutdownTimeout)
+    if(syncEnabled):
+        syncStopEvent.set()
+        syncThread.join(syncTimeout + 1)
+    # write any sign-ins still waiting to the shared log, waiting for the other kiosks if needed
+    # (a few tries, in case they are from more than one day or the folder drops out for a moment)
+    if(sharedLogEnabled):
+        for attempt in range(5):
+            if(runSharedLogFlush(wait=True)):
+                break
  
 
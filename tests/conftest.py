@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# the program is one file at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import library
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    # the settings the program sets up when it starts (see the bottom of library.py), for the methods that use them
+    values = {
+        "databaseColumns": {"ID": "ID", "Last Name": "Last Name", "First Name": "First Name", "Grade": "Grade"},
+        "databaseExtraColumns": [],
+        "databaseChunkedIngest": False,
+        "databaseMemoryBudgetMB": 256,
+        "minDigits": 4,
+        "maxDigits": 7,
+        "minGrade": 0,
+        "maxGrade": 12,
+        "duplicateIDProblemText": "ID is already used by an earlier row",
+        "rejectsFileEnding": " REJECTED ROWS.csv",
+        "reportRejectedRowsText": "Student Database check: ",
+        "reportStartProgramText": "Report START from PROGRAM START on ",
+        "reportStartExportText": "Report START from PREVIOUS REPORT EXPORT on ",
+        "reportExportStart": "Report exported ",
+        "manifestFileName": "SH Report Manifest.jsonl",
+        "manifestLock": threading.Lock(),
+        "rosterCache": {},
+    }
+    for (name, value) in values.items():
+        monkeypatch.setattr(library, name, value, raising=False)
+    return library
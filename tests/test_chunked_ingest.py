@@ -0,0 +1,75 @@
+import random
+import shutil
+
+import pandas as pd
+
+
+def writeRoster(path, rows):
+    pd.DataFrame(rows, columns=["ID", "Last Name", "First Name", "Grade"]).to_csv(path, index=False)
+    return str(path)
+
+
+def makeRows(count, seed):
+    # count students in a random order (so every block of 1,000 rows is out of order with the others),
+    # plus some IDs repeated far apart in the file so the repeats land in different blocks
+    generator = random.Random(seed)
+    ids = generator.sample(range(100000, 999999), count)
+    rows = [(studentID, f"Last{studentID}", f"First{studentID}", generator.randint(0, 12)) for studentID in ids]
+    repeats = [(rows[position][0], "Repeat", f"Copy{position}", 5) for position in range(0, count, 97)]
+    return rows + repeats
+
+
+def loadBothWays(settings, monkeypatch, tmp_path, rows):
+    runs = []
+    saveRun = settings.saveRun
+    monkeypatch.setattr(settings, "saveRun", lambda runFolder, chunk: runs.append(len(chunk)) or saveRun(runFolder, chunk))
+    chunkedName = writeRoster(tmp_path / "chunked.csv", rows)
+    wholeName = str(tmp_path / "whole.csv")
+    shutil.copyfile(chunkedName, wholeName)
+    monkeypatch.setattr(settings, "databaseChunkedIngest", True)
+    # a tiny memory budget makes the blocks as small as they go (1,000 rows)
+    monkeypatch.setattr(settings, "databaseMemoryBudgetMB", 0.001)
+    chunked = settings.openDatabase(chunkedName, 0, "ID")
+    monkeypatch.setattr(settings, "databaseChunkedIngest", False)
+    whole = settings.openDatabase(wholeName, 0, "ID")
+    return (chunked, whole, runs)
+
+
+def test_unsorted_file_is_merged_in_id_order(settings, monkeypatch, tmp_path):
+    rows = makeRows(3500, 1)
+    ((roster, summary), whole, runs) = loadBothWays(settings, monkeypatch, tmp_path, rows)
+
+    assert len(runs) == 4
+    assert roster["ID"].is_monotonic_increasing
+    assert roster["ID"].is_unique
+    assert sorted(roster["ID"].tolist()) == sorted(set(row[0] for row in rows))
+
+
+def test_repeated_ids_across_blocks_keep_the_first_row(settings, monkeypatch, tmp_path):
+    rows = makeRows(3500, 2)
+    ((roster, summary), whole, runs) = loadBothWays(settings, monkeypatch, tmp_path, rows)
+
+    assert "Repeat" not in roster["Last Name"].tolist()
+    repeatCount = len(rows) - 3500
+    assert summary is not None
+    assert f"{settings.duplicateIDProblemText}: {repeatCount}" in summary
+    rejects = pd.read_csv(tmp_path / "chunked REJECTED ROWS.csv")
+    assert len(rejects) == repeatCount
+    assert set(rejects["Last Name"]) == {"Repeat"}
+
+
+def test_chunked_and_whole_file_loads_match(settings, monkeypatch, tmp_path):
+    rows = makeRows(3500, 3)
+    ((roster, summary), (wholeRoster, wholeSummary), runs) = loadBothWays(settings, monkeypatch, tmp_path, rows)
+
+    pd.testing.assert_frame_equal(roster.reset_index(drop=True), wholeRoster.reset_index(drop=True), check_dtype=False)
+    assert summary.replace("chunked", "whole") == wholeSummary
+
+
+def test_sorted_file_is_read_straight_through(settings, monkeypatch, tmp_path):
+    rows = sorted(makeRows(2500, 4)[:2500])
+    ((roster, summary), whole, runs) = loadBothWays(settings, monkeypatch, tmp_path, rows)
+
+    assert runs == []
+    assert roster["ID"].tolist() == [row[0] for row in rows]
+    assert summary is None
@@ -0,0 +1,85 @@
+import base64
+import json
+import logging
+import random
+
+import pytest
+
+import library
+
+
+@pytest.mark.parametrize("studentIDs", [
+    [],
+    [0],
+    [1001],
+    [1001, 1004, 1010],
+    [5, 5, 5, 1003, 1003],
+    [1, 128, 129, 16383, 16384, 16385, 2097152, 9999999],
+    [127, 255, 16511],
+])
+def test_round_trip(studentIDs):
+    assert library.decodeStudentIDs(library.encodeStudentIDs(studentIDs)) == sorted(set(studentIDs))
+
+
+def test_round_trip_random():
+    generator = random.Random(5)
+    for trial in range(200):
+        studentIDs = [generator.randint(0, 10 ** generator.randint(1, 9)) for count in range(generator.randint(0, 50))]
+        assert library.decodeStudentIDs(library.encodeStudentIDs(studentIDs)) == sorted(set(studentIDs))
+
+
+def test_unsorted_input_is_stored_sorted():
+    assert library.decodeStudentIDs(library.encodeStudentIDs([1010, 1001, 1004])) == [1001, 1004, 1010]
+
+
+def test_large_gaps_use_more_bytes():
+    # 127 fits in one byte, 128 needs two and 16384 needs three
+    assert len(base64.b64decode(library.encodeStudentIDs([127]))) == 1
+    assert len(base64.b64decode(library.encodeStudentIDs([128]))) == 2
+    assert len(base64.b64decode(library.encodeStudentIDs([16384]))) == 3
+
+
+def test_truncated_list_raises():
+    encoded = base64.b64decode(library.encodeStudentIDs([1001, 99999]))
+    # drop the last byte, so the last ID ends partway through
+    damaged = base64.b64encode(encoded[:-1]).decode("ascii")
+    with pytest.raises(ValueError):
+        library.decodeStudentIDs(damaged)
+
+
+def test_invalid_base64_raises():
+    with pytest.raises(ValueError):
+        library.decodeStudentIDs("not base64!")
+    with pytest.raises(ValueError):
+        library.decodeStudentIDs("abc")
+
+
+def writeManifest(directory, entries):
+    with open(directory / "SH Report Manifest.jsonl", "w") as file:
+        for entry in entries:
+            file.write(f"{json.dumps(entry)}\n")
+
+
+def makeEntry(filename, studentIDs):
+    return {"file": filename, "start": "2026-03-14T08:00:00", "end": "2026-03-14T15:00:00",
+        "records": len(studentIDs), "minID": min(studentIDs), "maxID": max(studentIDs),
+        "ids": library.encodeStudentIDs(studentIDs)}
+
+
+def test_query_finds_the_student(settings, tmp_path):
+    writeManifest(tmp_path, [makeEntry("a.txt", [1001, 1005]), makeEntry("b.txt", [1002, 1003]),
+        makeEntry("c.txt", [1001, 1200])])
+
+    assert settings.queryManifest(str(tmp_path), 1001) == ["a.txt", "c.txt"]
+    assert settings.queryManifest(str(tmp_path), 1004) == []
+
+
+def test_query_skips_a_damaged_entry(settings, tmp_path, caplog):
+    damaged = makeEntry("b.txt", [1001, 1005])
+    damaged["ids"] = damaged["ids"][:-4] + "!!!!"
+    writeManifest(tmp_path, [makeEntry("a.txt", [1001, 1005]), damaged, makeEntry("c.txt", [1001])])
+
+    with caplog.at_level(logging.WARNING, logger="library"):
+        assert settings.queryManifest(str(tmp_path), 1001) == ["a.txt", "c.txt"]
+    assert "b.txt" in caplog.text
+
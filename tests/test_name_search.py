@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+import library
+
+
+def fullEditDistance(query, name):
+    # the edit distance from the query to the closest start of the name, worked out the slow way
+    best = len(query)
+    for end in range(len(name) + 1):
+        prefix = name[:end]
+        row = list(range(len(prefix) + 1))
+        for i in range(1, len(query) + 1):
+            previous = row
+            row = [i] + [0] * len(prefix)
+            for j in range(1, len(prefix) + 1):
+                row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (query[i - 1] != prefix[j - 1]))
+        best = min(best, row[-1])
+    return best
+
+
+@pytest.mark.parametrize("query, name, limit, distance", [
+    ("magn", "magnus", 2, 0),
+    ("magnus", "magnus", 2, 0),
+    ("mgnus", "magnus", 2, 1),
+    ("amgnus", "magnus", 2, 2),
+    ("", "magnus", 2, 0),
+])
+def test_bounded_edit_distance_within_limit(query, name, limit, distance):
+    assert library.boundedEditDistance(query, name, limit) == distance
+
+
+def test_bounded_edit_distance_gives_up_over_limit():
+    # anything over the limit comes back as limit + 1, however far off it really is
+    assert library.boundedEditDistance("zzzzzz", "magnus", 1) == 2
+    assert library.boundedEditDistance("zzzzzz", "magnus", 0) == 1
+
+
+def test_bounded_edit_distance_matches_full_search():
+    generator = random.Random(1)
+    for attempt in range(300):
+        query = "".join(generator.choice("abc") for i in range(generator.randint(1, 5)))
+        name = "".join(generator.choice("abc") for i in range(generator.randint(1, 7)))
+        limit = generator.randint(0, 2)
+        expected = fullEditDistance(query, name)
+        assert library.boundedEditDistance(query, name, limit) == (expected if expected <= limit else limit + 1)
+
+
+def test_find_close_names_matches_every_name_checked_one_at_a_time(monkeypatch):
+    generator = random.Random(2)
+    names = sorted(set("".join(generator.choice("abcde") for i in range(generator.randint(2, 6))) for j in range(400)))
+    monkeypatch.setattr(library, "nameIndexUnique", names, raising=False)
+    for token in ["abc", "ddea", "ba", "eeeee", "cab"]:
+        limit = min(2, len(token) // 3)
+        (matches, rowsLeft) = library.findCloseNames(token, limit, 0, len(names), 10 ** 9)
+        expected = [(fullEditDistance(token, name), name) for name in names if fullEditDistance(token, name) <= limit]
+        assert sorted(matches) == sorted(expected)
+        assert rowsLeft > 0
+
+
+def test_find_close_names_stops_when_out_of_rows(monkeypatch):
+    names = sorted(f"{a}{b}{c}" for a in "abcdef" for b in "abcdef" for c in "abcdef")
+    monkeypatch.setattr(library, "nameIndexUnique", names, raising=False)
+    (allMatches, rowsLeft) = library.findCloseNames("abc", 1, 0, len(names), 10 ** 9)
+    (someMatches, noRowsLeft) = library.findCloseNames("abc", 1, 0, len(names), 20)
+    assert noRowsLeft <= 0
+    assert set(someMatches) < set(allMatches)
+
+
+def test_find_close_names_only_walks_the_range(monkeypatch):
+    names = ["abby", "abel", "bob", "bobby", "cab"]
+    monkeypatch.setattr(library, "nameIndexUnique", names, raising=False)
+    (matches, rowsLeft) = library.findCloseNames("bob", 1, 2, 4, 10 ** 9)
+    assert sorted(name for (distance, name) in matches) == ["bob", "bobby"]
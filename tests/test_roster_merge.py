@@ -0,0 +1,54 @@
+import pandas as pd
+
+
+def writeRoster(path, rows):
+    pd.DataFrame(rows, columns=["ID", "Last Name", "First Name", "Grade"]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_files_are_merged_in_id_order(settings, tmp_path):
+    first = writeRoster(tmp_path / "a.csv", [(1003, "Cole", "Ann", 9), (1001, "Abe", "Bo", 10), (1007, "Dunn", "Cy", 11)])
+    second = writeRoster(tmp_path / "b.csv", [(1002, "Eve", "Di", 12), (1008, "Fox", "Ed", 9)])
+    third = writeRoster(tmp_path / "c.csv", [(1005, "Gil", "Fa", 10), (1000, "Ho", "Gu", 11)])
+
+    (combined, duplicates, summaries) = settings.openDatabases([first, second, third], 0, "ID")
+
+    assert combined["ID"].tolist() == [1000, 1001, 1002, 1003, 1005, 1007, 1008]
+    assert combined["Last Name"].tolist() == ["Ho", "Abe", "Eve", "Cole", "Gil", "Dunn", "Fox"]
+    assert duplicates == []
+    assert summaries == []
+
+
+def test_repeated_id_keeps_the_first_files_student(settings, tmp_path):
+    first = writeRoster(tmp_path / "a.csv", [(1001, "Abe", "Bo", 10), (1004, "First", "Copy", 9)])
+    second = writeRoster(tmp_path / "b.csv", [(1004, "Second", "Copy", 11), (1006, "Cole", "Ann", 12)])
+    third = writeRoster(tmp_path / "c.csv", [(1004, "Third", "Copy", 12)])
+
+    (combined, duplicates, summaries) = settings.openDatabases([first, second, third], 0, "ID")
+
+    assert combined["ID"].tolist() == [1001, 1004, 1006]
+    row = combined[combined["ID"] == 1004].iloc[0]
+    assert (row["Last Name"], row["Grade"]) == ("First", 9)
+    assert duplicates == [(1004, [first, second, third])]
+
+
+def test_file_order_decides_which_student_is_kept(settings, tmp_path):
+    first = writeRoster(tmp_path / "a.csv", [(1004, "From A", "X", 9)])
+    second = writeRoster(tmp_path / "b.csv", [(1004, "From B", "X", 10)])
+
+    (combined, duplicates, summaries) = settings.openDatabases([second, first], 0, "ID")
+
+    assert combined["Last Name"].tolist() == ["From B"]
+    assert duplicates == [(1004, [second, first])]
+
+
+def test_rejected_rows_are_summarized_per_file(settings, tmp_path):
+    first = writeRoster(tmp_path / "a.csv", [(1001, "Abe", "Bo", 10), (12, "Short", "Id", 9)])
+    second = writeRoster(tmp_path / "b.csv", [(1002, "Cole", "Ann", 12)])
+
+    (combined, duplicates, summaries) = settings.openDatabases([first, second], 0, "ID")
+
+    assert combined["ID"].tolist() == [1001, 1002]
+    assert len(summaries) == 1
+    assert "a.csv" in summaries[0]
+    assert (tmp_path / "a REJECTED ROWS.csv").is_file()